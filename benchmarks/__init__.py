@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`benchmarks` -- Performance benchmarks
+===========================================
+
+.. module:: benchmarks
+    :platform: Unix, Windows
+    :synopsis: Performance benchmarks with synthetic data at production scale.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+"""
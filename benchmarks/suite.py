@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`suite` -- Performance benchmarks
+======================================
+
+.. module:: suite
+    :platform: Unix, Windows
+    :synopsis: Wall time, peak memory and bytes read of the main operations, against a baseline.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+
+Run from the repository root:
+
+> python -m benchmarks.suite --scale small --output results.json --baseline baseline.json
+
+Each benchmark runs in a new process, so the peak memory is just from that benchmark.
+The package import time, `rocha.import`, is measured by `python -X importtime`.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+
+from . import synthetic
+
+# Synthetic data sizes
+SCALES = {'tiny': {'height': 512, 'width': 512, 'rasters': 2, 'features': 16,
+                   'depth': 2, 'fanout': 2, 'files': 2},
+          'small': {'height': 2048, 'width': 2048, 'rasters': 4, 'features': 400,
+                    'depth': 3, 'fanout': 4, 'files': 10},
+          'large': {'height': 16384, 'width': 16384, 'rasters': 16, 'features': 5000,
+                    'depth': 4, 'fanout': 8, 'files': 20}}
+
+# Metrics compared with the baseline, lower is better
+METRICS = ['wall', 'rss', 'read']
+
+# Repository root, to import the package in a new interpreter
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def prepare(directory, scale = 'small'):
+    """
+    Synthetic data of a scale, generated once.
+
+    Parameters
+    ----------
+    directory : str
+        Data directory. The data is generated again if the scale parameters changed.
+    scale : str
+        Scale name from :data:`SCALES` (the default is small).
+
+    Returns
+    -------
+    data : dict
+        Rasters path, rasters filenames, vector filename, tree path and scratch output path.
+    """
+    parameters = SCALES[scale]
+    marker = os.path.join(directory, 'parameters.json')
+
+    data = {'rasters_path': os.path.join(directory, 'rasters'),
+            'rasters': [os.path.join(directory, 'rasters', f'forest_{index}.tif')
+                        for index in range(parameters['rasters'])],
+            'vector': os.path.join(directory, 'regions.shp'),
+            'tree': os.path.join(directory, 'tree'),
+            'output_path': os.path.join(directory, 'output')}
+
+    if os.path.exists(marker):
+        with open(marker) as source:
+            if json.load(source) == parameters:
+                return data
+
+    os.makedirs(data['rasters_path'], exist_ok = True)
+
+    for seed, filename in enumerate(data['rasters']):
+        # Tiled and striped rasters, like in the archives
+        synthetic.raster(filename, parameters['height'], parameters['width'], tiled = seed % 2 == 0, seed = seed)
+
+    synthetic.polygons(data['vector'], parameters['features'])
+    synthetic.tree(data['tree'], parameters['depth'], parameters['fanout'], parameters['files'])
+
+    with open(marker, 'w') as destiny:
+        json.dump(parameters, destiny)
+
+    return data
+
+# Each benchmark is a setup, importing the modules and their lazy dependencies out of the
+# measures, which returns the callable measured. The callable may return its own measures.
+
+def importtime(module):
+    """
+    Cumulative import time of a module in a new interpreter, by `python -X importtime`.
+
+    Parameters
+    ----------
+    module : str
+        Module name.
+
+    Returns
+    -------
+    time : float
+        Cumulative import time in seconds.
+
+    Raises
+    ------
+    ValueError
+        If the module import time isn't reported.
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                             cwd = ROOT, capture_output = True, text = True, check = True)
+
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        _, cumulative, name = line[len('import time:'):].split('|')
+
+        if name.strip() == module:
+            return int(cumulative) / 10 ** 6
+
+    message = 'Module import time not reported.'
+    raise ValueError(message, module)
+
+def _rocha_import(data):
+    def run():
+        # Just the import time, the best of a few interpreters, as it is small and noisy
+        wall = min(importtime('src.rocha') for _ in range(5))
+
+        return {'wall': wall, 'rss': None, 'read': None}
+
+    return run
+
+
+def _crop_multiples(data):
+    import fiona
+    from src.rocha import crop
+    from src.rocha import drivers
+
+    drivers.registry()
+
+    def run():
+        for _ in crop.multiples(data['vector'], 'REGION', '*.tif', data['rasters_path'], data['output_path']):
+            pass
+
+    return run
+
+def _extremes_total(data):
+    from src.rocha import extremes
+
+    def run():
+        for raster in data['rasters']:
+            extremes.total(raster)
+
+    return run
+
+def _extremes_min_max(data):
+    from src.rocha import extremes
+
+    def run():
+        extremes.min_max(data['rasters'])
+
+    return run
+
+def _extremes_hotspots(data):
+    import rasterio
+    from src.rocha import extremes
+
+    def run():
+        for raster in data['rasters']:
+            with rasterio.open(raster) as source:
+                dataset = source.read(masked = True)
+
+            extremes.hotspots(dataset, '>', 60, source.nodata)
+
+    return run
+
+def _paths_find(data):
+    from src.rocha import paths
+
+    def run():
+        for _ in paths.find(data['tree'], '*.tif'):
+            pass
+
+    return run
+
+def _plots_maps(data):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import rasterio.plot
+    from src.rocha import plots
+
+    rasters = (data['rasters'] * 4)[:4]
+
+    def run():
+        figure = plots.maps(rasters, 2, 2, 'Forest', ['1', '2'], ['1', '2'], 'viridis', 'last')
+        figure.canvas.draw()
+        plt.close(figure)
+
+    return run
+
+# Benchmarks setups by name
+BENCHMARKS = {'rocha.import': _rocha_import,
+              'crop.multiples': _crop_multiples,
+              'extremes.total': _extremes_total,
+              'extremes.min_max': _extremes_min_max,
+              'extremes.hotspots': _extremes_hotspots,
+              'paths.find': _paths_find,
+              'plots.maps': _plots_maps}
+
+def _read():
+    """
+    Bytes read by the current process, None if unavailable.
+    """
+    try:
+        with open('/proc/self/io') as source:
+            counters = dict(line.split(': ') for line in source.read().splitlines())
+    except OSError:
+        return None
+
+    return int(counters['rchar'])
+
+def _peak():
+    """
+    Peak resident set size of the current process in bytes, None if unavailable.
+    """
+    # High water mark of this process memory, ru_maxrss keeps the parent peak across exec on Linux
+    try:
+        with open('/proc/self/status') as source:
+            for line in source:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def _child(name, data, results):
+    """
+    Benchmark process, sends the measures to the parent.
+    """
+    try:
+        # Imports out of the measures
+        run = BENCHMARKS[name](data)
+
+        before = _read()
+        start = time.perf_counter()
+
+        measures = run()
+
+        wall = time.perf_counter() - start
+        after = _read()
+
+        results.put({'wall': wall,
+                     'rss': _peak(),
+                     'read': None if before is None else after - before,
+                     **(measures or {})})
+    except BaseException as error:
+        results.put({'error': repr(error)})
+
+def measure(name, data, repeat = 1):
+    """
+    Benchmark measures, each run in a new process.
+
+    Parameters
+    ----------
+    name : str
+        Benchmark name from :data:`BENCHMARKS`.
+    data : dict
+        Synthetic data from :func:`prepare`.
+    repeat : int
+        Runs quantity, the best of each measure is kept (the default is 1).
+
+    Returns
+    -------
+    measures : dict of {str : float}
+        Wall time in seconds, peak resident set size in bytes and bytes read.
+
+    Raises
+    ------
+    RuntimeError
+        If the benchmark fails.
+    """
+    context = multiprocessing.get_context('spawn')
+    runs = []
+
+    for _ in range(repeat):
+        results = context.Queue()
+        process = context.Process(target = _child, args = (name, data, results))
+        process.start()
+        process.join()
+
+        # A crashed process doesn't send the measures
+        result = results.get() if not results.empty() else {'error': f'exit code {process.exitcode}'}
+
+        if 'error' in result:
+            message = 'Benchmark failed.'
+            raise RuntimeError(message, name, result['error'])
+
+        runs.append(result)
+
+    return {metric: min((run[metric] for run in runs if run[metric] is not None), default = None)
+            for metric in METRICS}
+
+def compare(results, baseline, tolerance = 0.2):
+    """
+    Compare the measures with the baseline.
+
+    Parameters
+    ----------
+    results : dict of {str : dict}
+        Measures by benchmark name.
+    baseline : dict of {str : dict}
+        Baseline measures by benchmark name.
+    tolerance : float
+        Relative increase accepted, 0.2 for 20% (the default is 0.2).
+
+    Returns
+    -------
+    rows : list of tuple
+        (benchmark, metric, baseline, current, ratio, regression) by measure in both.
+    """
+    rows = []
+
+    for name, measures in results.items():
+        for metric in METRICS:
+            current = measures.get(metric)
+            previous = baseline.get(name, {}).get(metric)
+
+            if current is None or not previous:
+                continue
+
+            ratio = current / previous
+            rows.append((name, metric, previous, current, ratio, ratio > 1 + tolerance))
+
+    return rows
+
+def main(arguments = None):
+    """
+    Run the benchmarks from the command line.
+
+    Returns
+    -------
+    status : int
+        0 without regressions, 1 with regressions.
+    """
+    parser = argparse.ArgumentParser(description = 'Rocha performance benchmarks.')
+    parser.add_argument('--scale', choices = sorted(SCALES), default = 'small')
+    parser.add_argument('--data', help = 'Synthetic data directory.')
+    parser.add_argument('--only', nargs = '+', choices = sorted(BENCHMARKS), help = 'Benchmarks names.')
+    parser.add_argument('--repeat', type = int, default = 1, help = 'Runs by benchmark, the best is kept.')
+    parser.add_argument('--output', help = 'Results filename (JSON).')
+    parser.add_argument('--baseline', help = 'Baseline results filename (JSON), to compare.')
+    parser.add_argument('--tolerance', type = float, default = 0.2, help = 'Relative increase accepted.')
+    options = parser.parse_args(arguments)
+
+    directory = options.data or os.path.join(tempfile.gettempdir(), 'rocha-benchmarks', options.scale)
+    data = prepare(directory, options.scale)
+
+    results = {}
+
+    for name in options.only or BENCHMARKS:
+        results[name] = measure(name, data, options.repeat)
+        measures = results[name]
+
+        print(f'{name:20} wall {measures["wall"]:9.3f} s'
+              f'  rss {(measures["rss"] or 0) / 2 ** 20:9.1f} MiB'
+              f'  read {(measures["read"] or 0) / 2 ** 20:9.1f} MiB')
+
+    if options.output:
+        with open(options.output, 'w') as destiny:
+            json.dump(results, destiny, indent = 2)
+
+    if not options.baseline:
+        return 0
+
+    with open(options.baseline) as source:
+        baseline = json.load(source)
+
+    rows = compare(results, baseline, options.tolerance)
+
+    for name, metric, previous, current, ratio, regression in rows:
+        flag = 'REGRESSION' if regression else ''
+        print(f'{name:20} {metric:5} {previous:14.3f} -> {current:14.3f}  x{ratio:5.2f} {flag}')
+
+    return 1 if any(row[-1] for row in rows) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`synthetic` -- Synthetic benchmark data
+============================================
+
+.. module:: synthetic
+    :platform: Unix, Windows
+    :synopsis: Deterministic rasters, polygons and directory trees at production scale.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+"""
+import os
+import numpy as np
+import rasterio
+import rasterio.windows
+from rasterio.transform import from_bounds
+
+# Brazil bounds, as (left, bottom, right, top) in degrees
+BOUNDS = (-74.0, -34.0, -34.0, 6.0)
+
+def raster(filename, height, width, dtype = 'float32', tiled = True, block = 256, nodata = -9999,
+           fraction = 0.1, bounds = BOUNDS, crs = 'EPSG:4674', seed = 0):
+    """
+    Synthetic raster, written by blocks.
+
+    The values are a smooth field plus noise, and a fraction of the pixels are nodata.
+    The same arguments give the same file content.
+
+    Parameters
+    ----------
+    filename : str
+        Raster output filename (GeoTIFF).
+    height : int
+        Rows quantity.
+    width : int
+        Columns quantity.
+    dtype : str
+        Data type (the default is float32).
+    tiled : bool
+        Tiled layout. False: striped, True: tiled (default).
+    block : int
+        Block size of the tiled layout (the default is 256).
+    nodata : int or float
+        Nodata value (the default is -9999).
+    fraction : float
+        Nodata pixels fraction (the default is 0.1).
+    bounds : tuple of float
+        Raster bounds as (left, bottom, right, top) (the default is :data:`BOUNDS`).
+    crs : str
+        Coordinate reference system code (the default is EPSG:4674).
+    seed : int
+        Random seed (the default is 0).
+
+    Returns
+    -------
+    filename : str
+        Raster output filename.
+    """
+    profile = {'driver': 'GTiff',
+               'height': height,
+               'width': width,
+               'count': 1,
+               'dtype': dtype,
+               'crs': crs,
+               'transform': from_bounds(*bounds, width, height),
+               'nodata': nodata}
+
+    if tiled:
+        profile.update({'tiled': True, 'blockxsize': block, 'blockysize': block})
+
+    rows = block if tiled else 256
+
+    with rasterio.open(filename, 'w', **profile) as destiny:
+        for row in range(0, height, rows):
+            window = rasterio.windows.Window(0, row, width, min(rows, height - row))
+
+            # Generator by window, so the content doesn't depend on the memory available
+            generator = np.random.default_rng([seed, row])
+            y, x = np.mgrid[row:row + window.height, 0:width]
+
+            values = 50 + 40 * np.sin(x / 97.0) * np.cos(y / 89.0) + generator.normal(0, 5, x.shape)
+            values = values.astype(dtype)
+            values[generator.random(x.shape) < fraction] = nodata
+
+            destiny.write(values, 1, window = window)
+
+    return filename
+
+def polygons(filename, count, bounds = BOUNDS, crs = 'EPSG:4674', seed = 0):
+    """
+    Synthetic polygons layer, as a jittered grid of quadrilaterals.
+
+    Parameters
+    ----------
+    filename : str
+        Vector output filename (ESRI Shapefile).
+    count : int
+        Features quantity, rounded down to a grid.
+    bounds : tuple of float
+        Layer bounds as (left, bottom, right, top) (the default is :data:`BOUNDS`).
+    crs : str
+        Coordinate reference system code (the default is EPSG:4674).
+    seed : int
+        Random seed (the default is 0).
+
+    Returns
+    -------
+    filename : str
+        Vector output filename.
+    """
+    import fiona
+
+    generator = np.random.default_rng(seed)
+
+    left, bottom, right, top = bounds
+    side = max(1, int(np.sqrt(count)))
+    xres = (right - left) / side
+    yres = (top - bottom) / side
+
+    schema = {'geometry': 'Polygon', 'properties': {'REGION': 'str:16', 'ID': 'int'}}
+
+    with fiona.open(filename, 'w', driver = 'ESRI Shapefile', crs = crs, schema = schema) as destiny:
+        for index in range(side * side):
+            row, col = divmod(index, side)
+            x0 = left + col * xres
+            y0 = bottom + row * yres
+
+            # Corners jittered inside the cell, so the polygons don't touch
+            jitter = generator.uniform(0.05, 0.25, 4)
+            ring = [(x0 + jitter[0] * xres, y0 + jitter[1] * yres),
+                    (x0 + (1 - jitter[2]) * xres, y0 + jitter[1] * yres),
+                    (x0 + (1 - jitter[2]) * xres, y0 + (1 - jitter[3]) * yres),
+                    (x0 + jitter[0] * xres, y0 + (1 - jitter[3]) * yres)]
+            ring.append(ring[0])
+
+            destiny.write({'geometry': {'type': 'Polygon', 'coordinates': [ring]},
+                           'properties': {'REGION': f'zone_{index}', 'ID': index}})
+
+    return filename
+
+def tree(path, depth, fanout, files, extensions = ('tif', 'shp', 'xml')):
+    """
+    Synthetic directory tree, with empty files.
+
+    Parameters
+    ----------
+    path : str
+        Tree root path.
+    depth : int
+        Directories levels below the root.
+    fanout : int
+        Subdirectories quantity by directory.
+    files : int
+        Files quantity by directory, for each extension.
+    extensions : tuple of str
+        Files extensions (the default is tif, shp and xml).
+
+    Returns
+    -------
+    quantity : int
+        Files quantity created.
+    """
+    quantity = 0
+    level = [path]
+
+    for current in range(depth + 1):
+        following = []
+
+        for directory in level:
+            os.makedirs(directory, exist_ok = True)
+
+            for index in range(files):
+                for extension in extensions:
+                    open(os.path.join(directory, f'forest_{current}_{index}.{extension}'), 'w').close()
+                    quantity += 1
+
+            if current < depth:
+                following.extend(os.path.join(directory, f'level_{current}_{branch}') for branch in range(fanout))
+
+        level = following
+
+    return quantity
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`rocha` -- Raster and vector manipulation
+==============================================
+
+.. module:: rocha
+    :platform: Unix, Windows
+    :synopsis: Manipulation of the raster datasets and vector geometries.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+
+The submodules are imported on the first access, like ``rocha.paths``, so importing
+the package doesn't load the heavy dependencies.
+"""
+import importlib
+
+__all__ = ['caches', 'catalogs', 'crop', 'drivers', 'extremes', 'instruments', 'manifests', 'memmaps', 'paths',
+           'plots', 'streams', 'windowed', 'zonal']
+
+def __getattr__(name):
+    """
+    Import the submodule on the first access.
+
+    Parameters
+    ----------
+    name : str
+        Submodule name.
+
+    Returns
+    -------
+    module : module
+        Submodule.
+    """
+    if name in __all__:
+        return importlib.import_module(f'.{name}', __name__)
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+def __dir__():
+    return sorted([*globals(), *__all__])
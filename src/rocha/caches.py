@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`caches` -- Persistent caches
+==================================
+
+.. module:: caches
+    :platform: Unix, Windows
+    :synopsis: Persistent cache of the raster results, keyed by the raster fingerprint.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+"""
+import os
+import json
+import time
+import sqlite3
+import contextlib
+import xml.etree.ElementTree as ElementTree
+
+from . import paths
+
+@contextlib.contextmanager
+def connect(database, capacity = 100000):
+    """
+    Connection to the cache database.
+
+    The entries are evicted by the least recently used, when the connection is closed.
+
+    Parameters
+    ----------
+    database : str
+        Cache database filename (SQLite). None to disable the cache.
+    capacity : int
+        Maximum entries quantity in the cache (the default is 100000).
+
+    Yields
+    ------
+    connection : :class:`sqlite3.Connection` object
+        Cache connection, None if the cache is disabled.
+    """
+    if database is None:
+        yield None
+        return
+
+    connection = sqlite3.connect(database, timeout = 60)
+
+    connection.execute('CREATE TABLE IF NOT EXISTS entries '
+                       '(key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed REAL NOT NULL)')
+    connection.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+
+    try:
+        yield connection
+    finally:
+        # The cached entries are kept, even if the caller stops early
+        evict(connection, capacity)
+        connection.commit()
+        connection.close()
+
+def key(raster, name, band = None, crs = None):
+    """
+    Cache key from the raster fingerprint.
+
+    Parameters
+    ----------
+    raster : str
+        Raster filename.
+    name : str
+        Result name.
+    band : int
+        Raster band (the default is None, for all bands).
+    crs : str
+        Coordinate reference system code (the default is None, for the raster system).
+
+    Returns
+    -------
+    key : str
+        Cache key by raster path, size, modification time, band and coordinate reference system.
+    """
+    size, mtime = paths.fingerprint(raster)
+
+    return json.dumps([os.path.abspath(raster), size, mtime, band, crs, name])
+
+def get(connection, raster, name, band = None, crs = None):
+    """
+    Cached result of the raster.
+
+    Parameters
+    ----------
+    connection : :class:`sqlite3.Connection` object
+        Cache connection from :func:`connect`.
+    raster : str
+        Raster filename. The rasters not stored as files, like in memory, aren't cached.
+    name : str
+        Result name.
+    band : int
+        Raster band (the default is None, for all bands).
+    crs : str
+        Coordinate reference system code (the default is None, for the raster system).
+
+    Returns
+    -------
+    value : object
+        Cached result, None if it isn't cached.
+    """
+    if connection is None or not os.path.isfile(raster):
+        return None
+
+    entry = key(raster, name, band, crs)
+    row = connection.execute('SELECT value FROM entries WHERE key = ?', (entry,)).fetchone()
+
+    if row is None:
+        return None
+
+    connection.execute('UPDATE entries SET accessed = ? WHERE key = ?', (time.time(), entry))
+
+    return json.loads(row[0])
+
+def put(connection, raster, name, value, band = None, crs = None):
+    """
+    Cache the raster result.
+
+    Parameters
+    ----------
+    connection : :class:`sqlite3.Connection` object
+        Cache connection from :func:`connect`.
+    raster : str
+        Raster filename.
+    name : str
+        Result name.
+    value : object
+        Result, serializable as JSON.
+    band : int
+        Raster band (the default is None, for all bands).
+    crs : str
+        Coordinate reference system code (the default is None, for the raster system).
+    """
+    if connection is None or not os.path.isfile(raster):
+        return
+
+    entry = key(raster, name, band, crs)
+    connection.execute('INSERT OR REPLACE INTO entries (key, value, accessed) VALUES (?, ?, ?)',
+                       (entry, json.dumps(value), time.time()))
+
+def evict(connection, capacity):
+    """
+    Evict the least recently used entries over the capacity.
+
+    Parameters
+    ----------
+    connection : :class:`sqlite3.Connection` object
+        Cache connection from :func:`connect`.
+    capacity : int
+        Maximum entries quantity in the cache.
+    """
+    connection.execute('DELETE FROM entries WHERE key IN '
+                       '(SELECT key FROM entries ORDER BY accessed DESC LIMIT -1 OFFSET ?)', (capacity,))
+
+def auxiliary(raster, band = 1):
+    """
+    Raster statistics from the GDAL auxiliary file.
+
+    The statistics are used only if the auxiliary file is newer than the raster, and the statistics
+    aren't approximate.
+
+    Parameters
+    ----------
+    raster : str
+        Raster filename.
+    band : int
+        Raster band.
+
+    Returns
+    -------
+    value_min : float
+        Raster minimum value.
+    value_max : float
+        Raster maximum value.
+
+    Notes
+    -----
+    GDAL keeps the statistics in the auxiliary file with 14 significant digits.
+    Returns None if there are no valid statistics.
+    """
+    sidecar = f'{raster}.aux.xml'
+
+    if not os.path.exists(sidecar) or os.stat(sidecar).st_mtime_ns < os.stat(raster).st_mtime_ns:
+        return None
+
+    try:
+        root = ElementTree.parse(sidecar).getroot()
+    except ElementTree.ParseError:
+        return None
+
+    for element in root.iter('PAMRasterBand'):
+        if element.get('band') != str(band):
+            continue
+
+        metadata = {item.get('key'): item.text for item in element.iter('MDI')}
+
+        if metadata.get('STATISTICS_APPROXIMATE', 'NO').upper() == 'YES':
+            return None
+
+        if 'STATISTICS_MINIMUM' in metadata and 'STATISTICS_MAXIMUM' in metadata:
+            return float(metadata['STATISTICS_MINIMUM']), float(metadata['STATISTICS_MAXIMUM'])
+
+    return None
@@ -0,0 +1,372 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`catalogs` -- Files discovery index
+========================================
+
+.. module:: catalogs
+    :platform: Unix, Windows
+    :synopsis: Persistent index of the files, with the raster headers, refreshed incrementally.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+"""
+import os
+import re
+import fnmatch
+import sqlite3
+import contextlib
+import collections
+
+Entry = collections.namedtuple('Entry', ['path', 'size', 'mtime', 'crs', 'dtype', 'bounds'])
+Entry.__doc__ = """
+Indexed file.
+
+Attributes
+----------
+path : str
+    File path, relative or absolute like the query.
+size : int
+    File size in bytes.
+mtime : int
+    Modification time in nanoseconds.
+crs : str
+    Raster coordinate reference system, None if the header isn't indexed.
+dtype : str
+    Raster data type, None if the header isn't indexed.
+bounds : tuple of float
+    Raster bounds as (left, bottom, right, top), None if the header isn't indexed.
+"""
+
+@contextlib.contextmanager
+def connect(database):
+    """
+    Connection to the index database.
+
+    Parameters
+    ----------
+    database : str
+        Index database filename (SQLite).
+
+    Yields
+    ------
+    connection : :class:`sqlite3.Connection` object
+        Index connection.
+    """
+    connection = sqlite3.connect(database, timeout = 60)
+
+    connection.execute('CREATE TABLE IF NOT EXISTS directories '
+                       '(path TEXT PRIMARY KEY, parent TEXT, mtime INTEGER NOT NULL)')
+    connection.execute('CREATE INDEX IF NOT EXISTS directories_parent ON directories (parent)')
+    connection.execute('CREATE TABLE IF NOT EXISTS files '
+                       '(path TEXT PRIMARY KEY, directory TEXT NOT NULL, name TEXT NOT NULL, '
+                       'size INTEGER NOT NULL, mtime INTEGER NOT NULL, crs TEXT, dtype TEXT, '
+                       'left REAL, bottom REAL, right REAL, top REAL)')
+    connection.execute('CREATE INDEX IF NOT EXISTS files_directory ON files (directory)')
+
+    try:
+        yield connection
+    finally:
+        connection.commit()
+        connection.close()
+
+def _compile(patterns):
+    """
+    Match function of the shell-style wildcards patterns.
+
+    Parameters
+    ----------
+    patterns : str or list of str
+        Patterns like unix shell-style wildcards.
+
+    Returns
+    -------
+    match : callable
+        Match function of the patterns.
+    """
+    if isinstance(patterns, str):
+        patterns = [patterns]
+
+    expression = '|'.join(f'(?:{fnmatch.translate(os.path.normcase(pattern))})' for pattern in patterns)
+
+    return re.compile(expression).match
+
+def _subtree(path):
+    """
+    Paths range inside a directory, to the SQL comparison `lower <= path < upper`.
+
+    The comparison is by the binary collation, so it's case sensitive and without wildcards,
+    unlike the SQL LIKE.
+
+    Parameters
+    ----------
+    path : str
+        Directory path.
+
+    Returns
+    -------
+    lower : str
+        Directory path with the separator, the first path inside.
+    upper : str
+        Directory path with the separator incremented, after all paths inside.
+    """
+    if not path.endswith(os.sep):
+        path = f'{path}{os.sep}'
+
+    return path, f'{path[:-1]}{chr(ord(os.sep) + 1)}'
+
+def _remove(connection, path):
+    """
+    Remove a directory, and its subdirectories and files, from the index.
+    """
+    lower, upper = _subtree(path)
+
+    connection.execute('DELETE FROM files WHERE directory = ? OR (directory >= ? AND directory < ?)',
+                       (path, lower, upper))
+    connection.execute('DELETE FROM directories WHERE path = ? OR (path >= ? AND path < ?)', (path, lower, upper))
+
+def _scan(connection, directory, parent, mtime):
+    """
+    Scan a directory and update its files in the index.
+
+    Parameters
+    ----------
+    connection : :class:`sqlite3.Connection` object
+        Index connection from :func:`connect`.
+    directory : str
+        Absolute directory path.
+    parent : str
+        Absolute parent directory path, None to the root directory.
+    mtime : int
+        Directory modification time in nanoseconds, before the scan.
+
+    Returns
+    -------
+    directories : list of str
+        Subdirectories paths, in the directory order.
+    """
+    files = {}
+    directories = []
+
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        # Symbolic links to directories aren't followed, like os.walk
+                        if not entry.is_symlink():
+                            directories.append(entry.path)
+                    else:
+                        status = entry.stat()
+                        files[entry.path] = (entry.name, status.st_size, status.st_mtime_ns)
+                except OSError:
+                    continue
+    except OSError:
+        _remove(connection, directory)
+        return []
+
+    indexed = {path: (size, mtime) for path, size, mtime in
+               connection.execute('SELECT path, size, mtime FROM files WHERE directory = ?', (directory,))}
+
+    removed = [(path,) for path in indexed if path not in files]
+    connection.executemany('DELETE FROM files WHERE path = ?', removed)
+
+    # New or changed files, the raster header is read again
+    changed = [(path, directory, name, size, modified) for path, (name, size, modified) in files.items()
+               if indexed.get(path) != (size, modified)]
+    connection.executemany('INSERT OR REPLACE INTO files (path, directory, name, size, mtime) '
+                           'VALUES (?, ?, ?, ?, ?)', changed)
+
+    for (path,) in connection.execute('SELECT path FROM directories WHERE parent = ?', (directory,)).fetchall():
+        if path not in directories:
+            _remove(connection, path)
+
+    connection.execute('INSERT OR REPLACE INTO directories (path, parent, mtime) VALUES (?, ?, ?)',
+                       (directory, parent, mtime))
+
+    return directories
+
+def _header(raster):
+    """
+    Raster header.
+
+    Parameters
+    ----------
+    raster : str
+        Raster filename.
+
+    Returns
+    -------
+    crs : str
+        Coordinate reference system, empty if the file isn't a raster.
+    dtype : str
+        Data type of the first band, empty if the file isn't a raster.
+    bounds : tuple of float
+        Bounds as (left, bottom, right, top), None if the file isn't a raster.
+    """
+    import rasterio
+    import rasterio.errors
+
+    try:
+        with rasterio.open(raster) as source:
+            crs = source.crs.to_string() if source.crs else ''
+
+            return crs, source.dtypes[0], tuple(source.bounds)
+    except (rasterio.errors.RasterioError, OSError):
+        return '', '', None
+
+def refresh(connection, path, headers = None):
+    """
+    Refresh the index of a directory tree, incrementally.
+
+    Only the directories with a new modification time are scanned again, so the files
+    added, removed or renamed since the last refresh are found without listing the whole tree.
+
+    Parameters
+    ----------
+    connection : :class:`sqlite3.Connection` object
+        Index connection from :func:`connect`.
+    path : str
+        Pathname root.
+    headers : str or list of str
+        Patterns of the files whose raster header (coordinate reference system, data type and bounds)
+        is indexed (the default is None, no headers).
+
+    Notes
+    -----
+    A file rewritten in place doesn't change its directory modification time, so it isn't found
+    by the refresh. The index is meant for append-only archives.
+    """
+    root = os.path.abspath(path)
+    stack = [(root, None)]
+
+    # Indexed directories of the tree, loaded at once
+    indexed = {}
+    children = collections.defaultdict(list)
+
+    for directory, parent, mtime in connection.execute('SELECT path, parent, mtime FROM directories '
+                                                       'WHERE path = ? OR (path >= ? AND path < ?)',
+                                                       (root, *_subtree(root))):
+        indexed[directory] = parent, mtime
+        children[parent].append(directory)
+
+    while stack:
+        directory, parent = stack.pop()
+
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            _remove(connection, directory)
+            continue
+
+        entry = indexed.get(directory)
+
+        if entry is not None and entry[1] == mtime:
+            # Unchanged directory, only its subdirectories are checked
+            if parent is not None and entry[0] != parent:
+                connection.execute('UPDATE directories SET parent = ? WHERE path = ?', (parent, directory))
+
+            directories = children[directory]
+        else:
+            directories = _scan(connection, directory, parent, mtime)
+
+        stack.extend((subdirectory, directory) for subdirectory in reversed(directories))
+
+    if headers is not None:
+        match = _compile(headers)
+        pending = connection.execute('SELECT path, name FROM files WHERE dtype IS NULL '
+                                     'AND (directory = ? OR (directory >= ? AND directory < ?))',
+                                     (root, *_subtree(root))).fetchall()
+
+        for filename, name in pending:
+            if not match(os.path.normcase(name)):
+                continue
+
+            crs, dtype, bounds = _header(filename)
+            left, bottom, right, top = bounds if bounds else (None, None, None, None)
+
+            connection.execute('UPDATE files SET crs = ?, dtype = ?, left = ?, bottom = ?, right = ?, top = ? '
+                               'WHERE path = ?', (crs, dtype, left, bottom, right, top, filename))
+
+    connection.commit()
+
+def search(connection, path, pattern, relative = True, bounds = None, update = True, headers = None):
+    """
+    Indexed files like pattern.
+
+    Parameters
+    ----------
+    connection : :class:`sqlite3.Connection` object
+        Index connection from :func:`connect`.
+    path : str
+        Pathname root.
+    pattern : str or list of str
+        Pattern like unix shell-style wildcards, or list of patterns.
+    relative : bool
+        Absolute or relative path. False: absolute path, True: relative path.
+    bounds : tuple of float
+        Bounds as (left, bottom, right, top) intersecting the raster bounds (the default is None,
+        all files). The files without indexed header are kept.
+    update : bool
+        Refresh the index before the query, see :func:`refresh` (the default is True).
+    headers : str or list of str
+        Patterns of the files whose raster header is indexed, in the refresh (the default is None, no headers).
+
+    Yields
+    ------
+    entry : :class:`Entry`
+        Indexed file, in the path order.
+    """
+    root = os.path.abspath(path)
+
+    if update:
+        refresh(connection, path, headers)
+
+    match = _compile(pattern)
+
+    query = ("SELECT path, name, size, mtime, crs, dtype, left, bottom, right, top FROM files "
+             'WHERE (directory = ? OR (directory >= ? AND directory < ?))')
+    parameters = [root, *_subtree(root)]
+
+    if bounds is not None:
+        left, bottom, right, top = bounds
+
+        query += ' AND (left IS NULL OR (left < ? AND right > ? AND bottom < ? AND top > ?))'
+        parameters += [right, left, top, bottom]
+
+    rows = connection.execute(f'{query} ORDER BY path', parameters).fetchall()
+
+    for filename, name, size, mtime, crs, dtype, *box in rows:
+        if not match(os.path.normcase(name)):
+            continue
+
+        if relative:
+            filename = os.path.join(path, os.path.relpath(filename, root))
+
+        yield Entry(filename, size, mtime, crs or None, dtype or None, None if box[0] is None else tuple(box))
+
+def find(connection, path, pattern, relative = True, bounds = None, update = True):
+    """
+    Path from the indexed files like pattern.
+
+    The indexed alternative to :func:`rocha.paths.find`, without walking the tree.
+
+    Parameters
+    ----------
+    connection : :class:`sqlite3.Connection` object
+        Index connection from :func:`connect`.
+    path : str
+        Pathname root.
+    pattern : str or list of str
+        Pattern like unix shell-style wildcards, or list of patterns.
+    relative : bool
+        Absolute or relative path. False: absolute path, True: relative path.
+    bounds : tuple of float
+        Bounds as (left, bottom, right, top) intersecting the raster bounds (the default is None, all files).
+    update : bool
+        Refresh the index before the query (the default is True).
+
+    Yields
+    ------
+    list of str
+        List of file path, in the path order.
+    """
+    for entry in search(connection, path, pattern, relative, bounds, update):
+        yield entry.path
@@ -8,13 +8,31 @@
     :synopsis: Crop the raster datasets by vector geometries.
 .. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
 """
+import os
+import json
+import math
+import queue
+import hashlib
+import threading
+import collections
+import concurrent.futures
 import affine
-import fiona
+import numpy as np
 import rasterio
+import rasterio.io
 import rasterio.mask
+import rasterio.enums
+import rasterio.shutil
+import rasterio.errors
+import rasterio.windows
+import rasterio.features
 
 from . import paths
 from . import drivers
+from . import catalogs
+from . import manifests
+from . import windowed
+from . import instruments
 
 def properties(vector, layer = 0):
     """
@@ -34,6 +52,8 @@ def properties(vector, layer = 0):
     values : dict of {str : int, float, str or date}
         Feature properties from all column.
     """
+    import fiona
+
     with fiona.open(vector, layer = layer) as source:
         for feature in source:
             values = feature["properties"]
@@ -58,12 +78,436 @@ def geometries(vector, layer = 0):
     geometries : dict
         Geometries as type and coordinates.
     """
+    import fiona
+
     with fiona.open(vector, layer = layer) as source:
         for feature in source:
             geometry = feature["geometry"]
 
             yield geometry
 
+def features(vector, columns = None, layer = 0, where = None, bbox = None):
+    """
+    Vector spatial and property data, in a single pass.
+
+    Parameters
+    ----------
+    vector : str
+        Vector filename.
+    columns : list of str
+        Columns names to load (the default is None, for all columns).
+    layer : int or str
+        Vector layer index or layer name (the default is 0 for the first layer).
+    where : str
+        Attribute filter as a SQL WHERE clause, in the OGR SQL dialect
+        (the default is None, for all features).
+    bbox : tuple of float
+        Spatial filter as (left, bottom, right, top), in the vector coordinate reference system
+        (the default is None, for all features).
+
+    Returns
+    -------
+    geometries : list of dict
+        Geometries as type and coordinates.
+    columns : dict of {str : array}
+        Property values by column name, an array by column in the features order.
+
+    Notes
+    -----
+    The filters are evaluated by OGR, so the filtered features aren't loaded.
+    """
+    import fiona
+
+    with fiona.open(vector, layer = layer) as source:
+        schema = list(source.schema['properties'])
+
+        if columns is None:
+            columns = schema
+
+        for column in columns:
+            if column not in schema:
+                message = 'Invalid column name.'
+                raise ValueError(message, column, schema)
+
+        geometries = []
+        values = {column: [] for column in columns}
+
+        for feature in source.filter(bbox = bbox, where = where):
+            geometries.append(feature['geometry'])
+            properties = feature['properties']
+
+            for column in columns:
+                values[column].append(properties[column])
+
+    columns = {column: np.array(items) for column, items in values.items()}
+
+    return geometries, columns
+
+def bounds(geometries):
+    """
+    Bounding box index of the vector geometries.
+
+    The bounding boxes are packed in an array, to query all features against a raster bounds at once.
+
+    Parameters
+    ----------
+    geometries : iterable of dict
+        Vector geometries.
+
+    Returns
+    -------
+    index : array
+        Geometries bounding boxes, as rows of (left, bottom, right, top) values.
+
+    See Also
+    --------
+    intersects : Features indexes intersecting the bounds.
+    """
+    boxes = [rasterio.features.bounds(geometry) for geometry in geometries]
+    index = np.array(boxes, dtype = float).reshape(-1, 4)
+
+    return index
+
+def intersects(index, bounds):
+    """
+    Features indexes with bounding box intersecting the bounds.
+
+    Parameters
+    ----------
+    index : array
+        Geometries bounding boxes from :func:`bounds`.
+    bounds : tuple of float
+        Bounds as (left, bottom, right, top), like the raster bounds.
+
+    Returns
+    -------
+    selection : array of int
+        Features indexes, in the features order.
+    """
+    left, bottom, right, top = bounds
+
+    selection = ((index[:, 0] < right) & (index[:, 2] > left) &
+                 (index[:, 1] < top) & (index[:, 3] > bottom))
+
+    return np.flatnonzero(selection)
+
+def window(geometries, source, box = None):
+    """
+    Window and mask of the vector geometries over the raster dataset.
+
+    The window is computed from the geometries bounds and the raster affine transform,
+    and the geometries are rasterized just inside this window.
+
+    Parameters
+    ----------
+    geometries : list of dict
+        Vector geometries.
+    source : :class:`rasterio.io.DatasetReader` object
+        Raster dataset opened in read mode.
+    box : tuple of float
+        Geometries bounding box as (left, bottom, right, top), like a row from :func:`bounds`
+        (the default is None, to compute it from the geometries).
+
+    Returns
+    -------
+    shape_mask : array of bool
+        Geometries mask in the window. True: outside the geometries, False: inside.
+    transform : affine
+        Window affine transform.
+    region : :class:`rasterio.windows.Window` object
+        Raster window covered by the geometries.
+
+    Raises
+    ------
+    ValueError
+        If the geometries don't overlap the raster.
+    """
+    transform = source.transform
+
+    # Rotated rasters, the window from all geometries coordinates
+    if transform.b != 0 or transform.d != 0:
+        return rasterio.mask.raster_geometry_mask(source, geometries, crop = True)
+
+    if box is None:
+        index = bounds(geometries)
+        box = (*index[:, :2].min(axis = 0), *index[:, 2:].max(axis = 0))
+
+    left, bottom, right, top = box
+
+    # Bounding box corners in pixel coordinates
+    inverse = ~transform
+    cols, rows = zip(inverse * (left, top), inverse * (right, bottom))
+
+    row_start, row_stop = math.floor(min(rows)), math.ceil(max(rows))
+    col_start, col_stop = math.floor(min(cols)), math.ceil(max(cols))
+
+    region = rasterio.windows.Window(col_off = col_start,
+                                     row_off = row_start,
+                                     width = max(col_stop - col_start, 0),
+                                     height = max(row_stop - row_start, 0))
+
+    try:
+        region = region.intersection(rasterio.windows.Window(0, 0, source.width, source.height))
+    except rasterio.errors.WindowError:
+        raise ValueError('Input shapes do not overlap raster.')
+
+    transform = source.window_transform(region)
+    shape = (int(region.height), int(region.width))
+
+    shape_mask = rasterio.features.geometry_mask(geometries, out_shape = shape, transform = transform)
+
+    return shape_mask, transform, region
+
+def signature(source):
+    """
+    Raster grid signature.
+
+    The rasters with the same signature share the pixels grid, so a geometries mask
+    computed for one of them is valid for all.
+
+    Parameters
+    ----------
+    source : :class:`rasterio.io.DatasetReader` object
+        Raster dataset opened in read mode.
+
+    Returns
+    -------
+    signature : tuple
+        Coordinate reference system, affine transform coefficients, width and height.
+    """
+    crs = source.crs.to_string() if source.crs else None
+
+    return crs, tuple(source.transform)[:6], source.width, source.height
+
+# Feature masks capacity in memory by crops call, in bytes, split by the worker processes
+MASKS_CAPACITY = 1 << 26
+
+class Masks:
+    """
+    Feature masks in memory by (key, grid signature), least recently used evicted over the capacity.
+
+    Parameters
+    ----------
+    capacity : int
+        Masks capacity in bytes, 0 to keep none (the default is :data:`MASKS_CAPACITY`).
+
+    Attributes
+    ----------
+    capacity : int
+        Masks capacity in bytes.
+    size : int
+        Masks size in bytes.
+    """
+    def __init__(self, capacity = MASKS_CAPACITY):
+        self.capacity = capacity
+        self.size = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, entry):
+        return entry in self._entries
+
+    def get(self, entry):
+        """
+        Feature mask by entry, as the most recently used.
+
+        Parameters
+        ----------
+        entry : tuple
+            Geometries key and grid signature.
+
+        Returns
+        -------
+        result : tuple
+            Feature mask, transform and window, or None if missing.
+        """
+        with self._lock:
+            if entry not in self._entries:
+                return None
+
+            self._entries.move_to_end(entry)
+
+            return self._entries[entry]
+
+    def put(self, entry, result):
+        """
+        Keep a feature mask, evicting the least recently used over the capacity.
+
+        Parameters
+        ----------
+        entry : tuple
+            Geometries key and grid signature.
+        result : tuple
+            Feature mask, transform and window.
+        """
+        with self._lock:
+            if entry not in self._entries:
+                self._entries[entry] = result
+                self.size += result[0].nbytes
+
+            while self.size > self.capacity and self._entries:
+                _, (shape_mask, _, _) = self._entries.popitem(last = False)
+                self.size -= shape_mask.nbytes
+
+    def clear(self):
+        """
+        Release all feature masks.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+def _stored(entry, directory):
+    """
+    Persisted feature mask filename.
+    """
+    name = hashlib.sha256(json.dumps(entry).encode()).hexdigest()
+
+    return os.path.join(directory, f'{name}.npz')
+
+def masked(geometries, source, key, box = None, directory = None, cache = None):
+    """
+    Window and mask of the vector geometries, cached by the raster grid.
+
+    The mask is computed once by key and grid signature, and reused by all the rasters on
+    the same grid. See :func:`window`.
+
+    Parameters
+    ----------
+    geometries : list of dict
+        Vector geometries.
+    source : :class:`rasterio.io.DatasetReader` object
+        Raster dataset opened in read mode.
+    key : tuple
+        Geometries identification, serializable as JSON, like the vector fingerprint
+        and the feature index.
+    box : tuple of float
+        Geometries bounding box as (left, bottom, right, top) (the default is None,
+        to compute it from the geometries).
+    directory : str
+        Directory to persist the masks as compressed `.npz` files, shared by the runs
+        (the default is None, without persistence).
+    cache : :class:`Masks` object
+        Feature masks in memory (the default is None, without reuse in memory).
+
+    Returns
+    -------
+    shape_mask : array of bool
+        Geometries mask in the window, read only. True: outside the geometries, False: inside.
+    transform : affine
+        Window affine transform.
+    region : :class:`rasterio.windows.Window` object
+        Raster window covered by the geometries.
+    """
+    entry = (key, signature(source))
+    result = None if cache is None else cache.get(entry)
+
+    if result is not None:
+        return result
+
+    filename = None if directory is None else _stored(entry, directory)
+
+    if filename is not None and os.path.exists(filename):
+        with np.load(filename) as stored:
+            region = rasterio.windows.Window(*stored['region'])
+            result = stored['mask'], affine.Affine(*stored['transform']), region
+
+    if result is None:
+        result = window(geometries, source, box)
+
+        if filename is not None:
+            shape_mask, transform, region = result
+            temporary = f'{filename}.{os.getpid()}.{threading.get_ident()}.npz'
+
+            os.makedirs(directory, exist_ok = True)
+            np.savez_compressed(temporary, mask = shape_mask, transform = tuple(transform)[:6],
+                                region = region.flatten())
+            # Atomic rename, for the concurrent workers
+            os.replace(temporary, filename)
+
+    result[0].flags.writeable = False
+
+    if cache is not None:
+        cache.put(entry, result)
+
+    return result
+
+def extract(geometries, source, profile = None, box = None, key = None, directory = None, indexes = None,
+            cache = None):
+    """
+    Mask an opened raster dataset by vector geometries.
+
+    Just the geometries window is read from the raster dataset.
+
+    Parameters
+    ----------
+    geometries : list of dict
+        Vector geometries.
+    source : :class:`rasterio.io.DatasetReader` object
+        Raster dataset opened in read mode.
+    profile : dict
+        Raster source profile, to avoid rebuild it for each geometries (the default is None,
+        for the source profile).
+    box : tuple of float
+        Geometries bounding box as (left, bottom, right, top), like a row from :func:`bounds`
+        (the default is None, to compute it from the geometries).
+    key : tuple
+        Geometries identification, to reuse the mask on the rasters with the same grid
+        (the default is None, to compute the mask). See :func:`masked`.
+    directory : str
+        Directory of the persisted masks, with key (the default is None, without persistence).
+    indexes : list of int
+        Raster bands read (the default is None, to all bands).
+    cache : :class:`Masks` object
+        Feature masks in memory, with key (the default is None, without reuse in memory).
+
+    Returns
+    -------
+    data : array
+        Raster data.
+    profile : dict
+        Raster profile.
+    """
+    if profile is None:
+        profile = source.profile
+
+    with instruments.stage('crop.window', source.name):
+        if key is None:
+            shape_mask, transform, region = window(geometries, source, box)
+        else:
+            shape_mask, transform, region = masked(geometries, source, key, box, directory, cache)
+
+    with instruments.stage('crop.read', source.name) as fields:
+        data = source.read(indexes, window = region, masked = True)
+        fields.update(pixels = data.size, nbytes = data.nbytes)
+
+    with instruments.stage('crop.remask', source.name) as fields:
+        data.mask = data.mask | shape_mask
+
+        # Update the mask
+        data.mask = (data == source.nodata) | data.mask
+        fields.update(pixels = data.size)
+
+    # Profile for cropped raster
+    profile = dict(profile)
+    profile.update({'count': data.shape[0],
+                    'height': data.shape[1],
+                    'width': data.shape[2],
+                    'transform': transform,
+                    'affine': transform})
+
+    return data, profile
+
+def _open(raster):
+    """
+    Open the raster dataset in read mode, as the `crop.open` stage.
+    """
+    with instruments.stage('crop.open', raster):
+        return rasterio.open(raster)
+
 def mask(geometries, raster):
     """
     Mask raster dataset by vector geometries.
@@ -72,8 +516,9 @@ def mask(geometries, raster):
     ----------
     geometries : str
         Vector geometries.
-    raster : str
-        Raster filename.
+    raster : str or :class:`rocha.windowed.Raster` object
+        Raster filename, or lazy raster kept open. Just the geometries window is read, and
+        just the lazy raster band if it has a band.
 
     Returns
     -------
@@ -82,18 +527,13 @@ def mask(geometries, raster):
     profile : dict
         Raster profile.
     """
-    with rasterio.open(raster) as source:
-        data, transform = rasterio.mask.mask(source, geometries, crop = True)
+    if isinstance(raster, windowed.Raster):
+        indexes = None if raster.band is None else [raster.band]
 
-        # Update the mask
-        data.mask = (data == source.nodata) | data.mask
+        return extract(geometries, raster.dataset, indexes = indexes)
 
-        # Profile for cropped raster
-        profile = source.profile.copy()
-        profile.update({'height': data.shape[1],
-                        'width': data.shape[2],
-                        'transform': transform,
-                        'affine': transform})
+    with _open(raster) as source:
+        data, profile = extract(geometries, source)
 
     return data, profile
 
@@ -101,6 +541,8 @@ def crop(geometries, raster, features = False):
     """
     Crop raster dataset by vector geometries.
 
+    The raster file is opened once, and for each crop just the geometries window is read.
+
     Parameters
     ----------
     geometries : str
@@ -123,19 +565,158 @@ def crop(geometries, raster, features = False):
     meta : metadata
         Raster metadata.
     """
-    if features:
-        for geometry in geometries:
-            shapes = [geometry]
-            dataset = mask(shapes, raster)
+    with _open(raster) as source:
+        profile = source.profile
+
+        if features:
+            for geometry in geometries:
+                shapes = [geometry]
+                dataset = extract(shapes, source, profile)
+
+                yield dataset
+        else:
+            shapes = [geometry for geometry in geometries]
+            dataset = extract(shapes, source, profile)
 
             yield dataset
-    else:
-        shapes = [geometry for geometry in geometries]
-        dataset = mask(shapes, raster)
 
-        yield dataset
+# Worker process state: the geometries and the bounding box index sent once, and the last raster opened.
+_geometries = None
+_index = None
+_source = None
+_vector = None
+_directory = None
+_cache = None
+
+def _initialize(geometries, index, vector = None, directory = None, capacity = 0):
+    """
+    Worker process initializer, keeps the vector geometries for all work units.
+
+    Parameters
+    ----------
+    geometries : list of dict
+        Vector geometries.
+    index : array
+        Geometries bounding boxes from :func:`bounds`.
+    vector : tuple
+        Vector identification, to reuse the features masks (the default is None, without reuse).
+    directory : str
+        Directory of the persisted masks (the default is None, without persistence).
+    capacity : int
+        Features masks capacity in memory of the worker process, in bytes (the default is 0,
+        without reuse in memory). See :class:`Masks`.
+    """
+    global _geometries, _index, _vector, _directory, _cache
+
+    _geometries = geometries
+    _index = index
+    _vector = vector
+    _directory = directory
+    _cache = Masks(capacity)
+
+def _work(raster, index):
+    """
+    Worker process crop of a raster by one feature.
+
+    The raster stay opened in the worker process while the next work units are from the same raster.
+
+    Parameters
+    ----------
+    raster : str
+        Raster filename.
+    index : int
+        Feature index.
+
+    Returns
+    -------
+    data : array
+        Raster data.
+    profile : dict
+        Raster profile.
+    """
+    global _source
+
+    if _source is None or _source.name != raster:
+        if _source is not None:
+            _source.close()
+
+        _source = _open(raster)
+
+    shapes = [_geometries[index]]
+    key = None if _vector is None else (*_vector, int(index))
+
+    return extract(shapes, _source, box = _index[index], key = key, directory = _directory, cache = _cache)
+
+def _parallel(units, geometries, index, workers, ordered = True, vector = None, directory = None, capacity = 0):
+    """
+    Crop the work units over a process pool.
+
+    The geometries are sent once to each worker, and at most two work units for each worker are in flight.
+
+    Parameters
+    ----------
+    units : iterable of tuple
+        Work units as (raster, feature index, extra) tuples.
+    geometries : list of dict
+        Vector geometries.
+    index : array
+        Geometries bounding boxes from :func:`bounds`.
+    workers : int
+        Number of worker processes.
+    ordered : bool
+        Results order. False: as soon as completed, True: the same order as the work units (default).
+    vector : tuple
+        Vector identification, to reuse the features masks (the default is None, without reuse).
+    directory : str
+        Directory of the persisted masks (the default is None, without persistence).
+    capacity : int
+        Features masks capacity in memory of each worker process, in bytes (the default is 0,
+        without reuse in memory).
 
-def multiples(vector, column, pattern, input_path, output_path, driver = 'GTiff'):
+    Yields
+    ------
+    data : array
+        Raster data.
+    profile : dict
+        Raster profile.
+    extra : object
+        Work unit extra value.
+    """
+    backlog = 2 * workers
+    units = iter(units)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers = workers,
+                                                initializer = _initialize,
+                                                initargs = (geometries, index, vector, directory, capacity)) as executor:
+        pending = collections.OrderedDict()
+
+        def submit():
+            for raster, index, extra in units:
+                future = executor.submit(_work, raster, index)
+                pending[future] = extra
+
+                if len(pending) >= backlog:
+                    break
+
+        submit()
+
+        while pending:
+            if ordered:
+                future = next(iter(pending))
+                future.result()
+            else:
+                done, _ = concurrent.futures.wait(pending, return_when = concurrent.futures.FIRST_COMPLETED)
+                future = next(iter(done))
+
+            extra = pending.pop(future)
+            data, profile = future.result()
+
+            submit()
+
+            yield data, profile, extra
+
+def multiples(vector, column, pattern, input_path, output_path, driver = 'GTiff', workers = None, ordered = True,
+              skipped = None, manifest = None, catalog = None, masks = None, capacity = MASKS_CAPACITY):
     """
     Crop the multiples rasters for each vector features.
 
@@ -158,6 +739,29 @@ def multiples(vector, column, pattern, input_path, output_path, driver = 'GTiff'
     driver : str
         Driver code. Default GeoTIFF file format (GTiff).
         Code to output raster format.
+    workers : int
+        Number of worker processes to crop the (raster, feature) work units in parallel
+        (the default is None, to crop sequentially in the current process).
+    ordered : bool
+        Results order with workers. False: as soon as completed, True: the same order as sequentially (default).
+    skipped : list
+        List to receive the (raster, output_file) pairs skipped, because the feature bounds don't
+        intersect the raster bounds (the default is None, to don't report).
+    manifest : str
+        Completion manifest filename, to skip the work units with current outputs, recorded from
+        the same raster, vector and driver (the default is None, to crop all work units).
+        See :mod:`manifests`.
+    catalog : str
+        Files discovery index filename, to find the rasters without walking the input path. The
+        rasters whose indexed bounds don't intersect any feature aren't opened (the default is None,
+        to find the rasters by :func:`paths.find`). See :mod:`catalogs`.
+    masks : str
+        Directory to persist the features masks, reused by the next runs (the default is None,
+        without persistence). See :func:`masked`.
+    capacity : int
+        Features masks capacity in memory, in bytes, reused by the rasters on the same grid and
+        released at the end of the crops. It is split by the worker processes, 0 to don't keep the
+        masks in memory (the default is :data:`MASKS_CAPACITY`). See :class:`Masks`.
 
     Yields
     ------
@@ -173,25 +777,442 @@ def multiples(vector, column, pattern, input_path, output_path, driver = 'GTiff'
         The information of the GDAL raster formats, including the drivers codes,
         are available in: http://www.gdal.org/formats_list.html
     """
-    # Vector geometries and properties as lists
-    geoms = [geometry for geometry in geometries(vector)]
-    props = [property for property in properties(vector)]
+    results = _multiples(vector, column, pattern, input_path, output_path, driver, workers, ordered,
+                         skipped, manifest, catalog, masks, capacity)
 
-    # Raster files like pattern
-    rasters = paths.find(input_path, pattern)
+    for _, data, profile, output_file in results:
+        yield data, profile, output_file
 
-    for raster in rasters:
-        dataset = crop(geoms, raster, features = True)
+async def amultiples(vector, column, pattern, input_path, output_path, driver = 'GTiff', workers = None,
+                     ordered = True, skipped = None, manifest = None, catalog = None, masks = None,
+                     capacity = MASKS_CAPACITY, executor = None):
+    """
+    Crop the multiples rasters for each vector features, asynchronously.
 
-        for property, (data, profile) in zip(props, dataset):
+    The crops run in the executor, so the event loop isn't blocked, and each crop is yielded as
+    soon as it is ready. The next crop is computed while the current one is consumed, and no
+    further. Stopping the iteration, or cancelling the task, stops the crops.
+    See :func:`multiples` and :func:`rocha.streams.iterate`.
 
-            # Update the driver and file extension
-            profile.update({'driver': driver})
-            extension = f'.{drivers.extension(driver)}'
+    Parameters
+    ----------
+    vector : str
+        Vector filename.
+    column : str
+        Column name.
+    pattern : str
+        Pattern like unix shell-style wildcards.
+    input_path : str
+        Path from raster input files.
+    output_path : str
+        Path to cropped raster output files.
+    driver : str
+        Driver code. Default GeoTIFF file format (GTiff).
+    workers : int
+        Number of worker processes to crop in parallel (the default is None, to crop sequentially
+        in the executor).
+    ordered : bool
+        Results order with workers. False: as soon as completed, True: the same order as sequentially (default).
+    skipped : list
+        List to receive the (raster, output_file) pairs skipped (the default is None, to don't report).
+    manifest : str
+        Completion manifest filename (the default is None, to crop all work units).
+    catalog : str
+        Files discovery index filename (the default is None, to find the rasters by :func:`paths.find`).
+    masks : str
+        Directory to persist the features masks (the default is None, without persistence).
+    capacity : int
+        Features masks capacity in memory, in bytes (the default is :data:`MASKS_CAPACITY`).
+    executor : :class:`concurrent.futures.Executor` object
+        Executor to run the crops (the default is None, to a single thread).
 
-            # Vector column property as file label
-            label = f'_{property[column]}'.lower()
+    Yields
+    ------
+    data : array
+        Raster data.
+    profile : dict
+        Raster profile.
+    output_file : str
+        Raster output filename.
+    """
+    # Loaded on demand, asyncio is heavy to the synchronous use
+    from . import streams
+
+    results = multiples(vector, column, pattern, input_path, output_path, driver, workers, ordered,
+                        skipped, manifest, catalog, masks, capacity)
+
+    async for data, profile, output_file in streams.iterate(results, executor = executor):
+        yield data, profile, output_file
+
+def _multiples(vector, column, pattern, input_path, output_path, driver, workers, ordered, skipped, manifest,
+               catalog, masks, capacity = MASKS_CAPACITY):
+    """
+    Crop the multiples rasters for each vector features, with the raster filenames.
+
+    Yields
+    ------
+    raster : str
+        Raster input filename.
+    data : array
+        Raster data.
+    profile : dict
+        Raster profile.
+    output_file : str
+        Raster output filename.
 
+    See Also
+    --------
+    multiples : Crop the multiples rasters for each vector features.
+    """
+    # Vector geometries and the column values, read once
+    geoms, columns = features(vector, [column])
+
+    # Vector column property as file label
+    labels = [f'_{value}'.lower() for value in columns[column]]
+
+    # Vector bounding box index, built once
+    index = bounds(geoms)
+
+    # Vector identification, to reuse the features masks on the rasters with the same grid
+    identification = (os.path.abspath(vector), *paths.fingerprint(vector))
+
+    # Raster files like pattern, with the raster bounds if indexed
+    if catalog is None:
+        rasters = ((raster, None) for raster in paths.find(input_path, pattern))
+    else:
+        with catalogs.connect(catalog) as connection:
+            rasters = [(entry.path, entry.bounds)
+                       for entry in catalogs.search(connection, input_path, pattern, headers = pattern)]
+
+    # File extension from the driver
+    with instruments.stage('crop.extension', driver):
+        extension = f'.{drivers.extension(driver)}'
+
+    # Finished outputs from previous runs
+    records = {} if manifest is None else manifests.load(manifest)
+
+    def select(raster, region):
+        selection = set(intersects(index, region))
+
+        if records:
+            sources = manifests.sources(raster, vector, driver)
+
+        for feature, label in enumerate(labels):
             output_file = paths.output(raster, input_path, output_path, extra = label, output_extension = extension)
 
-            yield data, profile, output_file
\ No newline at end of file
+            if feature not in selection:
+                if skipped is not None:
+                    skipped.append((raster, output_file))
+            elif not records or not manifests.current(records, output_file, sources):
+                yield feature, output_file
+
+    def sequential():
+        for raster, region in rasters:
+            if region is not None:
+                # Indexed bounds, the raster is opened only with work units
+                selection = list(select(raster, region))
+
+                if not selection:
+                    continue
+
+            with _open(raster) as source:
+                profile = source.profile
+
+                if region is None:
+                    selection = select(raster, source.bounds)
+
+                for feature, output_file in selection:
+                    with instruments.stage('crop.extract', output_file):
+                        data, cropped = extract([geoms[feature]], source, profile, index[feature],
+                                                (*identification, int(feature)), masks, cache = cache)
+
+                    yield raster, data, cropped, output_file
+
+    def units():
+        for raster, region in rasters:
+            if region is None:
+                with _open(raster) as source:
+                    region = source.bounds
+
+            for feature, output_file in select(raster, region):
+                yield raster, feature, (raster, output_file)
+
+    # Features masks in memory just for these crops, the workers masks end with the pool
+    if workers is None:
+        cache = Masks(capacity)
+        results = sequential()
+    else:
+        cache = Masks(0)
+        crops = _parallel(units(), geoms, index, workers, ordered, identification, masks, capacity // workers)
+        results = ((raster, data, profile, output_file) for data, profile, (raster, output_file) in crops)
+
+    try:
+        for raster, data, profile, output_file in results:
+            # Update the driver
+            profile.update({'driver': driver})
+
+            yield raster, data, profile, output_file
+    finally:
+        cache.clear()
+
+def cog(dtype, compress = 'deflate'):
+    """
+    Cloud optimized GeoTIFF creation options by data type.
+
+    The block size keeps about the same bytes by block, bigger blocks to the one byte pixels.
+    The predictor is the horizontal differencing to the integers, and the floating point
+    predictor to the floats.
+
+    Parameters
+    ----------
+    dtype : str or :class:`numpy.dtype`
+        Raster data type.
+    compress : str
+        Compression algorithm, like `deflate` or `zstd` (the default is `deflate`).
+
+    Returns
+    -------
+    creation : dict
+        Tiled and compressed creation options.
+    """
+    dtype = np.dtype(dtype)
+    size = 512 if dtype.itemsize == 1 else 256
+
+    creation = {'tiled': True,
+                'blockxsize': size,
+                'blockysize': size,
+                'compress': compress}
+
+    if dtype.kind in 'iu':
+        creation['predictor'] = 2
+    elif dtype.kind == 'f':
+        creation['predictor'] = 3
+
+    return creation
+
+def overviews(height, width, size = 256):
+    """
+    Overviews decimation factors, until the overview fits in a block.
+
+    Parameters
+    ----------
+    height : int
+        Raster height.
+    width : int
+        Raster width.
+    size : int
+        Block size (the default is 256).
+
+    Returns
+    -------
+    factors : list of int
+        Decimation factors, as powers of 2.
+    """
+    factors = []
+    factor = 2
+
+    while max(height, width) / (factor // 2) > size:
+        factors.append(factor)
+        factor *= 2
+
+    return factors
+
+def save(data, profile, output_file, creation = None, optimized = False):
+    """
+    Save the raster data to file.
+
+    Parameters
+    ----------
+    data : array
+        Raster data.
+    profile : dict
+        Raster profile, with the driver code.
+    output_file : str
+        Raster output filename.
+    creation : dict
+        Creation options to update the profile, like tiling and compression
+        (the default is None, for the profile options). See :data:`TILED`.
+    optimized : bool
+        Cloud optimized GeoTIFF layout. False: the profile layout (default), True: tiled and
+        compressed by the data type (see :func:`cog`), with internal overviews before the data.
+        The creation options update these options.
+
+    Raises
+    ------
+    ValueError
+        If the cloud optimized layout isn't to the GeoTIFF driver.
+    """
+    profile = dict(profile)
+    profile.pop('affine', None)
+
+    if optimized:
+        if profile.get('driver') != 'GTiff':
+            message = 'Cloud optimized layout requires the GeoTIFF driver.'
+            raise ValueError(message, profile.get('driver'))
+
+        options = cog(profile['dtype'])
+        profile.update(options)
+
+    if creation is not None:
+        profile.update(creation)
+
+    nodata = profile.get('nodata')
+
+    if nodata is not None:
+        data = data.filled(nodata)
+
+    directory = os.path.dirname(output_file)
+
+    if directory:
+        os.makedirs(directory, exist_ok = True)
+
+    with instruments.stage('crop.write', output_file) as fields:
+        fields.update(pixels = data.size, nbytes = data.nbytes)
+
+        if not optimized:
+            with rasterio.open(output_file, 'w', **profile) as destiny:
+                destiny.write(data)
+
+            return
+
+        factors = overviews(profile['height'], profile['width'], profile['blockxsize'])
+        options = {key: value for key, value in profile.items() if key not in _COPIED}
+
+        # Overviews built in memory, then copied ahead of the data (COPY_SRC_OVERVIEWS)
+        with rasterio.io.MemoryFile() as memory:
+            layout = {key: value for key, value in profile.items() if key in _COPIED}
+
+            with memory.open(driver = 'GTiff', **layout) as dataset:
+                dataset.write(data)
+
+                if factors:
+                    dataset.build_overviews(factors, rasterio.enums.Resampling.nearest)
+                    dataset.update_tags(ns = 'rio_overview', resampling = 'nearest')
+
+            with memory.open() as dataset:
+                rasterio.shutil.copy(dataset, output_file, copy_src_overviews = True, **options)
+
+# Profile keys copied from the source dataset, not creation options
+_COPIED = ['height', 'width', 'count', 'dtype', 'crs', 'transform', 'nodata']
+
+# Tiled and compressed creation options
+TILED = {'tiled': True,
+         'blockxsize': 256,
+         'blockysize': 256,
+         'compress': 'deflate'}
+
+def export(vector, column, pattern, input_path, output_path, driver = 'GTiff', workers = None,
+           creation = None, background = True, skipped = None, manifest = None, catalog = None,
+           masks = None, optimized = False, capacity = MASKS_CAPACITY):
+    """
+    Crop the multiples rasters for each vector features and save these.
+
+    Each crop is written to the output filename as soon as it is available, so just a few crops are
+    kept in memory, no matter how many features there are.
+
+    Parameters
+    ----------
+    vector : str
+        Vector filename.
+    column : str
+        Column name.
+    pattern : str
+        Pattern like unix shell-style wildcards.
+    input_path : str
+        Path from raster input files.
+    output_path : str
+        Path to cropped raster output files.
+    driver : str
+        Driver code. Default GeoTIFF file format (GTiff).
+        Code to output raster format.
+    workers : int
+        Number of worker processes to crop in parallel (the default is None, to crop sequentially).
+    creation : dict
+        Creation options to update the profiles, like :data:`TILED` (the default is None, for the
+        source raster options).
+    background : bool
+        Write in a background thread, overlapping crop and disk writes. False: write in the
+        current thread, True: write in a background thread (default).
+    skipped : list
+        List to receive the (raster, output_file) pairs skipped, because the feature bounds don't
+        intersect the raster bounds (the default is None, to don't report).
+    manifest : str
+        Completion manifest filename. The work units with current outputs are skipped, and each
+        written output is recorded, to resume an interrupted run (the default is None, to crop and
+        write all work units). See :mod:`manifests`.
+    catalog : str
+        Files discovery index filename (the default is None, to find the rasters by :func:`paths.find`).
+        See :mod:`catalogs`.
+    masks : str
+        Directory to persist the features masks (the default is None, without persistence).
+        See :func:`masked`.
+    optimized : bool
+        Cloud optimized GeoTIFF outputs, tiled, compressed and with internal overviews
+        (the default is False, for the source raster layout). See :func:`save`.
+    capacity : int
+        Features masks capacity in memory, in bytes, split by the worker processes
+        (the default is :data:`MASKS_CAPACITY`). See :func:`multiples`.
+
+    Returns
+    -------
+    output_files : list of str
+        Raster output filenames written.
+
+    See Also
+    --------
+    multiples : Crop the multiples rasters for each vector features.
+    """
+    results = _multiples(vector, column, pattern, input_path, output_path, driver, workers, False,
+                         skipped, manifest, catalog, masks, capacity)
+    output_files = []
+
+    def write(raster, data, profile, output_file):
+        save(data, profile, output_file, creation, optimized)
+        output_files.append(output_file)
+
+        if manifest is not None:
+            sources = manifests.sources(raster, vector, driver)
+            manifests.record(manifest, output_file, sources)
+
+    if not background:
+        for result in results:
+            write(*result)
+
+        return output_files
+
+    # Bounded queue to the writer thread, one crop waits while another is written
+    pending = queue.Queue(maxsize = 1)
+    errors = []
+
+    def writer():
+        while True:
+            item = pending.get()
+
+            if item is None:
+                break
+
+            if errors:
+                continue
+
+            try:
+                write(*item)
+            except Exception as error:
+                errors.append(error)
+
+    thread = threading.Thread(target = writer, daemon = True)
+    thread.start()
+
+    try:
+        for result in results:
+            if errors:
+                break
+
+            pending.put(result)
+    finally:
+        pending.put(None)
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+    return output_files
@@ -8,7 +8,111 @@
     :synopsis: Handle the raster drivers informations.
 .. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
 """
-from osgeo import gdal
+import types
+import functools
+import collections
+import xml.etree.ElementTree as ElementTree
+
+Driver = collections.namedtuple('Driver', ['code', 'name', 'extension', 'extensions', 'help_topic',
+                                           'mime_type', 'raster', 'create', 'createcopy', 'options',
+                                           'compressions'])
+Driver.__doc__ = """
+GDAL driver metadata.
+
+Attributes
+----------
+code : str
+    Driver code.
+name : str
+    The descriptive name for the file format.
+extension : str
+    The main extension used for files of this type.
+extensions : tuple of str
+    The extensions used for files of this type.
+help_topic : str
+    The help topic for this driver.
+mime_type : str
+    The standard mime type for this file format.
+raster : bool
+    Driver handles raster data.
+create : bool
+    Driver writes files directly (Create).
+createcopy : bool
+    Driver writes files only by copy (CreateCopy).
+options : tuple of str
+    Creation options names.
+compressions : tuple of str
+    Compression algorithms of the COMPRESS creation option.
+"""
+
+def _options(creation):
+    """
+    Creation options from the driver options list.
+
+    Parameters
+    ----------
+    creation : str
+        Creation options list (XML), or None.
+
+    Returns
+    -------
+    options : tuple of str
+        Creation options names.
+    compressions : tuple of str
+        Compression algorithms of the COMPRESS creation option.
+    """
+    if not creation:
+        return (), ()
+
+    try:
+        root = ElementTree.fromstring(creation)
+    except ElementTree.ParseError:
+        return (), ()
+
+    options = tuple(option.get('name') for option in root.iter('Option'))
+    compressions = tuple(value.text for option in root.iter('Option') if option.get('name') == 'COMPRESS'
+                         for value in option.iter('Value'))
+
+    return options, compressions
+
+@functools.lru_cache(maxsize = None)
+def registry():
+    """
+    GDAL drivers registry.
+
+    The drivers are enumerated once, at the first call. The GDAL Python bindings are imported
+    only here, so importing this module doesn't load them.
+
+    Returns
+    -------
+    registry : :class:`types.MappingProxyType` of {str : :class:`Driver`}
+        Read only drivers metadata by driver code in upper case, like GDAL the codes are
+        case insensitive.
+    """
+    from osgeo import gdal
+
+    entries = {}
+
+    for index in range(gdal.GetDriverCount()):
+        driver = gdal.GetDriver(index)
+        item = driver.GetMetadataItem
+
+        extensions = tuple((item(gdal.DMD_EXTENSIONS) or '').split())
+        options, compressions = _options(item(gdal.DMD_CREATIONOPTIONLIST))
+
+        entries[driver.ShortName.upper()] = Driver(code = driver.ShortName,
+                                           name = item(gdal.DMD_LONGNAME),
+                                           extension = item(gdal.DMD_EXTENSION),
+                                           extensions = extensions,
+                                           help_topic = f'http://www.gdal.org/{item(gdal.DMD_HELPTOPIC)}',
+                                           mime_type = item(gdal.DMD_MIMETYPE),
+                                           raster = item(gdal.DCAP_RASTER) is not None,
+                                           create = item(gdal.DCAP_CREATE) is not None,
+                                           createcopy = item(gdal.DCAP_CREATECOPY) is not None,
+                                           options = options,
+                                           compressions = compressions)
+
+    return types.MappingProxyType(entries)
 
 def validate(code):
     """
@@ -17,24 +121,34 @@ def validate(code):
     Parameters
     ----------
     code : str
-        Driver code.
+        Driver code, case insensitive.
+
+    Returns
+    -------
+    driver : :class:`Driver`
+        Driver metadata from the registry. It isn't a GDAL driver object anymore, to the GDAL
+        driver use `osgeo.gdal.GetDriverByName(driver.code)`.
+
+    Raises
+    ------
+    ValueError
+        If the driver code is invalid, or the driver don't handles raster data.
 
     Notes
     -----
         The information of the GDAL raster formats, including the drivers codes,
         are available in: http://www.gdal.org/formats_list.html
     """
-    driver = gdal.GetDriverByName(code)
+    driver = registry().get(code.upper())
     notes = 'Checks the valid code for raster formats in: http://www.gdal.org/formats_list.html'
 
     if driver is None:
         message = 'Invalid driver code.'
         raise ValueError(message, code, notes)
 
-    if driver.GetMetadataItem(gdal.DCAP_RASTER) is None:
-        name = driver.GetMetadataItem(gdal.DMD_LONGNAME)
+    if not driver.raster:
         message = 'Driver don\'t handles raster data.'
-        raise ValueError(message, code, name, notes)
+        raise ValueError(message, code, driver.name, notes)
 
     return driver
 
@@ -56,20 +170,7 @@ def metadata(code):
     """
     driver = validate(code)
 
-    # The descriptive name for the file format
-    name = driver.GetMetadataItem(gdal.DMD_LONGNAME)
-
-    # The main extension used for files of this type
-    extension = driver.GetMetadataItem(gdal.DMD_EXTENSION)
-
-    # The help topic for this driver
-    topic = driver.GetMetadataItem(gdal.DMD_HELPTOPIC)
-    help_topic = f'http://www.gdal.org/{topic}'
-
-    # The standard mime type for this file format
-    mime_type = driver.GetMetadataItem(gdal.DMD_MIMETYPE)
-
-    return name, extension, help_topic, mime_type
+    return driver.name, driver.extension, driver.help_topic, driver.mime_type
 
 def extension(code, main = True):
     """
@@ -89,10 +190,7 @@ def extension(code, main = True):
     """
     driver = validate(code)
 
-    # The extensions used for files of this type
-    extensions = driver.GetMetadataItem(gdal.DMD_EXTENSIONS).split()
-
-    if main and len(extensions) > 0:
-        return extensions[0]
+    if main and len(driver.extensions) > 0:
+        return driver.extensions[0]
 
-    return extensions
\ No newline at end of file
+    return list(driver.extensions)
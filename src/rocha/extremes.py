@@ -8,26 +8,77 @@
     :synopsis: Extremes of the raster datasets.
 .. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
 """
+import os
 import operator
+import threading
+import functools
+import contextlib
+import collections
+import concurrent.futures
 import numpy as np
 import numpy.ma as ma
 import rasterio
 from rasterio.warp import calculate_default_transform
 
-def hotspots(dataset, relate, threshold, nodata):
+from . import paths
+from . import caches
+from . import memmaps
+from . import windowed
+from . import instruments
+
+# Raster band statistics from the valid values
+Statistics = collections.namedtuple('Statistics', ['minimum', 'maximum', 'count', 'size', 'sum', 'mean', 'variance'])
+Statistics.__doc__ = """
+Raster band statistics from the valid values.
+
+Attributes
+----------
+minimum : int or float
+    Minimum value, masked if there are no valid values.
+maximum : int or float
+    Maximum value, masked if there are no valid values.
+count : int
+    Valid values quantity.
+size : int
+    Values quantity, valid and invalid.
+sum : float
+    Valid values sum.
+mean : float
+    Valid values mean, NaN if there are no valid values.
+variance : float
+    Valid values population variance, NaN if there are no valid values.
+"""
+
+# Inverse operation, to masking data
+OPERATIONS_INVERSE = {
+    '>': operator.le,  # <=
+    '<': operator.ge,  # >=
+    '>=': operator.lt, # <
+    '<=': operator.gt, # >
+    '==': operator.ne,  # !=
+    '!=': operator.eq  # ==
+}
+
+def hotspots(dataset, relate, threshold, nodata, copy = True, out = None):
     """
     Hotspots by comparation with threshold value.
 
     Parameters
     ----------
-    dataset : array
-        Raster data.
+    dataset : array or :class:`rocha.windowed.Raster` object
+        Raster data, or lazy raster read by chunks into the hotspot raster data.
     relate : str
         Symbol to compare the data with threshold value.
     threshold : int or float
         Threshold value.
     nodata : int or float
         Nodata value.
+    copy : bool
+        Keep the raster data. False: fill out the raster data in place, True: fill out a copy (default).
+    out : masked array
+        Masked array with the raster data shape, to receive the hotspot raster data, instead of a
+        new array (the default is None). A plain array is wrapped as the masked array data, so it
+        receives the filled values.
 
     Returns
     -------
@@ -37,44 +88,296 @@ def hotspots(dataset, relate, threshold, nodata):
     Notes
     -----
     To save the hotspot raster data is necessary to updating the profile nodata value before to save.
+
+    See Also
+    --------
+    classify : Hotspots levels for multiples thresholds.
+    sweep : Hotspots quantities for multiples thresholds.
     """
-    # Inverse operation, to masking data
-    operations_inverse = {
-        '>': operator.le,  # <=
-        '<': operator.ge,  # >=
-        '>=': operator.lt, # <
-        '<=': operator.gt, # >
-        '==': operator.ne,  # !=
-        '!=': operator.eq  # ==
-    }
-
-    if relate not in operations_inverse:
+    if relate not in OPERATIONS_INVERSE:
         return None
 
-    # Define the compare inverse operation
-    compare = operations_inverse[relate]
+    # Plain output array, as the data of the hotspot masked array
+    if out is not None and not isinstance(out, ma.MaskedArray):
+        out = ma.masked_array(out, copy = False)
+
+    # Lazy raster, the hotspots by chunks into the output array, without the whole raster data
+    if isinstance(dataset, windowed.Raster):
+        if out is None:
+            out = ma.masked_array(np.empty(dataset.shape, dtype = dataset.dtype), mask = False)
+
+        for window, chunk in dataset.chunks():
+            out[(Ellipsis, *window.toslices())] = hotspots(chunk, relate, threshold, nodata, copy = False)
+
+        out.fill_value = nodata
+
+        return out
 
-    # Define the selection data by comparison with threshold
-    selection = compare(dataset, threshold)
+    with instruments.stage('extremes.hotspots') as fields:
+        fields.update(pixels = dataset.size, nbytes = dataset.nbytes)
 
-    # Fill out the selected data with nodata value and mask the raster dataset
-    dataset[selection] = nodata
-    dataset.fill_value = nodata
-    data = ma.masked_where(selection, dataset)
+        # Define the compare inverse operation
+        compare = OPERATIONS_INVERSE[relate]
+
+        # Define the selection data by comparison with threshold
+        selection = compare(dataset, threshold)
+
+        if out is not None:
+            out[...] = dataset
+            dataset = out
+        elif copy:
+            dataset = dataset.copy()
+
+        # Fill out the selected data with nodata value and mask the raster dataset
+        dataset[selection] = nodata
+        dataset.fill_value = nodata
+        data = ma.masked_where(selection, dataset, copy = False)
 
     return data
 
+def _positions(dataset, thresholds):
+    """
+    Thresholds positions of the valid values, by binary search in the sorted thresholds.
+
+    Parameters
+    ----------
+    dataset : array
+        Raster data.
+    thresholds : array
+        Sorted thresholds values.
+
+    Returns
+    -------
+    lower : array of int
+        Thresholds quantity lower than each valid value.
+    upper : array of int
+        Thresholds quantity lower or equal to each valid value.
+    """
+    values = ma.getdata(dataset)[~ma.getmaskarray(dataset)]
+
+    lower = np.searchsorted(thresholds, values, side = 'left')
+    upper = np.searchsorted(thresholds, values, side = 'right')
+
+    return lower, upper
+
+def classify(dataset, thresholds, relate = '>'):
+    """
+    Hotspots levels by comparation with multiples thresholds values, in a single pass.
+
+    The level is the quantity of thresholds satisfied by the value. With the thresholds in
+    ascending order, for the relations `>` and `>=` the value is a hotspot by the threshold `i`
+    if the level is greater than `i`, and for the relations `<` and `<=` if the level is greater
+    than the thresholds quantity minus one minus `i`.
+
+    Parameters
+    ----------
+    dataset : array
+        Raster data.
+    thresholds : list of int or float
+        Thresholds values.
+    relate : str
+        Symbol to compare the data with thresholds values, as `>`, `>=`, `<` or `<=`.
+
+    Returns
+    -------
+    levels : array of int
+        Hotspots levels, masked like the raster data.
+    """
+    if relate not in ('>', '>=', '<', '<='):
+        return None
+
+    thresholds = np.sort(np.asarray(thresholds))
+    quantity = len(thresholds)
+
+    if relate == '>':
+        levels = np.searchsorted(thresholds, ma.getdata(dataset), side = 'left')
+    elif relate == '>=':
+        levels = np.searchsorted(thresholds, ma.getdata(dataset), side = 'right')
+    elif relate == '<':
+        levels = quantity - np.searchsorted(thresholds, ma.getdata(dataset), side = 'right')
+    else:
+        levels = quantity - np.searchsorted(thresholds, ma.getdata(dataset), side = 'left')
+
+    dtype = np.min_scalar_type(quantity)
+    levels = ma.masked_array(levels.astype(dtype), mask = ma.getmaskarray(dataset))
+
+    return levels
+
+def sweep(dataset, thresholds, relate = '>', band = 1):
+    """
+    Hotspots quantities by comparation with multiples thresholds values, in a single pass.
+
+    Parameters
+    ----------
+    dataset : array, str or :class:`rasterio.io.DatasetReader` object
+        Raster data, raster filename or raster dataset opened in read mode. The raster files are
+        read by the internal blocks, so the memory is bounded by the block size.
+    thresholds : list of int or float
+        Thresholds values.
+    relate : str
+        Symbol to compare the data with thresholds values.
+    band : int
+        Raster band, for the raster files.
+
+    Returns
+    -------
+    counts : array of int
+        Hotspots quantities, valid values satisfying the relation, for each threshold in the
+        thresholds order.
+    """
+    if relate not in OPERATIONS_INVERSE:
+        return None
+
+    thresholds = np.asarray(thresholds)
+    order = np.argsort(thresholds, kind = 'stable')
+    ordered = thresholds[order]
+    quantity = len(thresholds)
+
+    if isinstance(dataset, np.ndarray):
+        blocks = [dataset]
+    else:
+        blocks = _read_blocks(dataset, band)
+
+    # Values quantities by thresholds positions
+    lowers = np.zeros(quantity + 1, dtype = np.int64)
+    uppers = np.zeros(quantity + 1, dtype = np.int64)
+
+    for values in blocks:
+        lower, upper = _positions(values, ordered)
+
+        lowers += np.bincount(lower, minlength = quantity + 1)
+        uppers += np.bincount(upper, minlength = quantity + 1)
+
+    valid = lowers.sum()
+
+    # Values lower than each threshold, and lower or equal to each threshold
+    lesser = np.cumsum(uppers)[:-1]
+    lesser_equal = np.cumsum(lowers)[:-1]
+
+    if relate == '>':
+        counts = valid - lesser_equal
+    elif relate == '>=':
+        counts = valid - lesser
+    elif relate == '<':
+        counts = lesser
+    elif relate == '<=':
+        counts = lesser_equal
+    elif relate == '==':
+        counts = lesser_equal - lesser
+    else:
+        counts = valid - (lesser_equal - lesser)
+
+    # Counts in the thresholds order
+    results = np.empty(quantity, dtype = np.int64)
+    results[order] = counts
+
+    return results
+
+def _read_blocks(raster, band = 1):
+    """
+    Raster band data by rows of the internal blocks. See :func:`rocha.windowed.windows`.
+
+    Parameters
+    ----------
+    raster : str or :class:`rasterio.io.DatasetReader` object
+        Raster filename or raster dataset opened in read mode.
+    band : int
+        Raster band.
+
+    Yields
+    ------
+    dataset : array
+        Raster masked data from each window.
+    """
+    with _dataset(raster) as source:
+        for window in windowed.windows(source, band):
+            yield source.read(band, window = window, masked = True)
+
+@contextlib.contextmanager
+def _dataset(raster):
+    """
+    Raster dataset from the raster filename or the opened raster dataset.
+
+    The raster dataset opened here is closed at the end, the opened by the caller is kept open.
+
+    Parameters
+    ----------
+    raster : str, :class:`rasterio.io.DatasetReader` or :class:`rocha.windowed.Raster` object
+        Raster filename, raster dataset opened in read mode or lazy raster.
+
+    Yields
+    ------
+    source : :class:`rasterio.io.DatasetReader` object
+        Raster dataset opened in read mode.
+    """
+    if isinstance(raster, str):
+        with rasterio.open(raster) as source:
+            yield source
+    elif isinstance(raster, windowed.Raster):
+        yield raster.dataset
+    else:
+        yield raster
+
+def _filename(raster):
+    """
+    Raster filename from the raster filename, the opened raster dataset or the lazy raster.
+    """
+    return raster if isinstance(raster, str) else raster.name
+
+def _band(raster, band = None):
+    """
+    Raster band from the lazy raster band, or the band argument.
+
+    Parameters
+    ----------
+    raster : str, :class:`rasterio.io.DatasetReader` or :class:`rocha.windowed.Raster` object
+        Raster filename, raster dataset opened in read mode or lazy raster.
+    band : int
+        Raster band (the default is None, to the lazy raster band or the first band).
+
+    Returns
+    -------
+    band : int
+        Raster band.
+
+    Raises
+    ------
+    ValueError
+        If the band argument isn't the lazy raster band.
+    """
+    lazy = raster.band if isinstance(raster, windowed.Raster) else None
+
+    if lazy is not None and band is not None and band != lazy:
+        message = 'Band different from the lazy raster band.'
+        raise ValueError(message, band, lazy)
+
+    return lazy or band or 1
+
+# Affine transformations memoized by (raster path, size, modification time, crs)
+_transforms = collections.OrderedDict()
+_transforms_lock = threading.Lock()
+_transforms_size = 4096
+
 def transform(raster, crs = None):
     """
     Affine transformation for the raster file by coordinate reference system code.
 
     Parameters
     ----------
-    raster : str
-        Raster filename
+    raster : str or :class:`rasterio.io.DatasetReader` object
+        Raster filename or raster dataset opened in read mode.
     crs : str
         Coordinate reference system code.
 
+    Returns
+    -------
+    transform : affine
+        Raster affine transform, reprojected to the coordinate reference system.
+    width : int
+        Reprojected raster width, None if it isn't reprojected.
+    height : int
+        Reprojected raster height, None if it isn't reprojected.
+
     Notes
     -----
     The CRS code can be accesible from:
@@ -95,19 +398,34 @@ def transform(raster, crs = None):
 
     EPSG:32601: WGS 84 / UTM zone 1N, ... , EPSG:32660: WGS 84 / UTM zone 60N
     EPSG:32701: WGS 84 / UTM zone 1S, ... , EPSG:32760: WGS 84 / UTM zone 60S
+
+    The results are memoized by the raster file (path, size and modification time) and the
+    coordinate reference system code.
     """
+    name = _filename(raster)
+    key = None
+
+    if os.path.isfile(name):
+        key = (os.path.abspath(name), *paths.fingerprint(name), crs)
+
+        with _transforms_lock:
+            if key in _transforms:
+                _transforms.move_to_end(key)
+
+                return _transforms[key]
+
     width = None
     height = None
 
-    with rasterio.open(raster) as source:
+    with _dataset(raster) as source:
         # Define the affine matrix transform
         if crs is None:
-            transform = source.profile['affine']
+            transform = source.transform
         else:
             destiny_crs = rasterio.crs.CRS({'init': crs})
 
             if destiny_crs == source.crs:
-                transform = source.profile['affine']
+                transform = source.transform
             else:
                 # Reproject
                 transform, width, height = calculate_default_transform(source.crs,
@@ -116,9 +434,16 @@ def transform(raster, crs = None):
                                                             source.height,
                                                             *source.bounds)
 
+    if key is not None:
+        with _transforms_lock:
+            _transforms[key] = transform, width, height
+
+            if len(_transforms) > _transforms_size:
+                _transforms.popitem(last = False)
+
     return transform, width, height
 
-def area(raster, crs = None, factor = 1):
+def area(raster, crs = None, factor = 1, cache = None):
     """"
     Calculate the raster valid area.
 
@@ -128,64 +453,321 @@ def area(raster, crs = None, factor = 1):
 
     Parameters
     ----------
-    raster : str
-        Raster filename
+    raster : str or :class:`rasterio.io.DatasetReader` object
+        Raster filename or raster dataset opened in read mode.
     crs : str
         Coordinate reference system code.
     factor : int or float
         Multiplicative factor to the area.
+    cache : str
+        Cache database filename, to reuse the results from unchanged rasters
+        (the default is None, to don't use the cache). See :mod:`caches`.
     """
-    affine, _, _ = transform(raster, crs)
+    name = _filename(raster)
+
+    with caches.connect(cache) as connection:
+        square = caches.get(connection, name, 'area', crs = crs)
+
+        if square is None:
+            affine, _, _ = transform(raster, crs)
+
+            # Pixel width (pixel resolution of the abscissa axis)
+            xres = affine[0]
 
-    # Pixel width (pixel resolution of the abscissa axis)
-    xres = affine[0]
+            # Pixel height (pixel resolution of the ordinate axis)
+            yres = affine[4]
 
-    # Pixel height (pixel resolution of the ordinate axis)
-    yres = affine[4]
+            square = abs(xres * yres)
+            caches.put(connection, name, 'area', square, crs = crs)
 
     # Area in square unit (approximate by reprojection)
-    area = abs(xres * yres) * factor
+    area = square * factor
 
     return round(area, 15)
 
-def total(raster, crs = None, factor = 1):
+def total(raster, crs = None, factor = 1, cache = None, decoded = None):
     """
     Calcule the total valid area.
 
+    The valid values are counted from the bands statistics, so a single scan of each band serves
+    the total and the limits, cached in the same entries. See :func:`summary`.
+
     Parameters
     ----------
-    raster : str
-        Raster filename
+    raster : str, :class:`rasterio.io.DatasetReader` or :class:`rocha.windowed.Raster` object
+        Raster filename, raster dataset opened in read mode or lazy raster, read by chunks.
+        The valid values of a lazy raster band are just from this band.
     crs : str
         Coordinate reference system code.
     factor : int or float
         Multiplicative factor to the area.
+    cache : str
+        Cache database filename, to reuse the results from unchanged rasters
+        (the default is None, to don't use the cache). See :mod:`caches`.
+    decoded : str
+        Decoded rasters cache directory, to count the bands decoded once (the default is None,
+        to decode the raster). See :mod:`memmaps`.
     """
-    square = area(raster, crs, factor)
+    with _dataset(raster) as source:
+        square = area(source, crs, factor, cache)
 
-    affine, width, height = transform(raster, crs)
-
-    with rasterio.open(raster) as source:
-        dataset = source.read(masked = True)
+        # Lazy raster of a band, just the band is counted
+        if isinstance(raster, windowed.Raster) and raster.band is not None:
+            indexes = [raster.band]
+        else:
+            indexes = source.indexes
 
-    # Raster valid values
-    data = dataset[~dataset.mask]
-    count = len(data)
+        # Raster valid values, from the statistics of each band
+        with instruments.stage('extremes.total', _filename(raster)):
+            count = sum(result.count for index in indexes
+                        for result in summary([raster], index, cache = cache, decoded = decoded))
 
     total = count * square
 
     return total
 
-def limits(rasters, band = 1):
+def combine(first, second):
+    """
+    Combine the statistics from two disjoint sets of values.
+
+    The mean and variance are combined by the parallel algorithm (Chan et al.), an extension of the
+    Welford algorithm, without revisit the values.
+
+    Parameters
+    ----------
+    first : :class:`Statistics`
+        Statistics from the first values.
+    second : :class:`Statistics`
+        Statistics from the second values.
+
+    Returns
+    -------
+    statistics : :class:`Statistics`
+        Statistics from all values.
+    """
+    size = first.size + second.size
+
+    if first.count == 0:
+        return second._replace(size = size)
+
+    if second.count == 0:
+        return first._replace(size = size)
+
+    count = first.count + second.count
+    delta = second.mean - first.mean
+
+    mean = first.mean + delta * second.count / count
+    squares = (first.variance * first.count + second.variance * second.count +
+               delta ** 2 * first.count * second.count / count)
+
+    statistics = Statistics(minimum = min(first.minimum, second.minimum),
+                            maximum = max(first.maximum, second.maximum),
+                            count = count,
+                            size = size,
+                            sum = first.sum + second.sum,
+                            mean = mean,
+                            variance = squares / count)
+
+    return statistics
+
+def block(dataset):
+    """
+    Statistics from the valid values of a masked array.
+
+    Parameters
+    ----------
+    dataset : array
+        Raster masked data.
+
+    Returns
+    -------
+    statistics : :class:`Statistics`
+        Statistics from the valid values.
+    """
+    count = int(dataset.count())
+
+    if count == 0:
+        return Statistics(ma.masked, ma.masked, 0, dataset.size, 0.0, np.nan, np.nan)
+
+    total = float(dataset.sum(dtype = np.float64))
+    mean = total / count
+
+    # Sum of squares of differences from the block mean, zero for the invalid values
+    values = dataset.filled(0).astype(np.float64, copy = False)
+    deviations = np.where(ma.getmaskarray(dataset), 0.0, values - mean).ravel()
+    squares = float(np.dot(deviations, deviations))
+
+    statistics = Statistics(minimum = dataset.min(),
+                            maximum = dataset.max(),
+                            count = count,
+                            size = dataset.size,
+                            sum = total,
+                            mean = mean,
+                            variance = squares / count)
+
+    return statistics
+
+def statistics(raster, band = None, decoded = None):
+    """
+    Raster band statistics in a single pass.
+
+    The raster is read by rows of the internal blocks, so the memory is bounded by a few blocks rows.
+
+    Parameters
+    ----------
+    raster : str or :class:`rocha.windowed.Raster` object
+        Raster filename or lazy raster.
+    band : int
+        Raster band (the default is None, to the lazy raster band or the first band).
+        See :class:`rocha.windowed.Raster`.
+    decoded : str
+        Decoded rasters cache directory, to read the band decoded once (the default is None,
+        to decode the raster). See :mod:`memmaps`.
+
+    Returns
+    -------
+    statistics : :class:`Statistics`
+        Raster band statistics.
+
+    Raises
+    ------
+    ValueError
+        If the band isn't the lazy raster band.
+    """
+    band = _band(raster, band)
+
+    with instruments.stage('extremes.statistics', _filename(raster)) as fields:
+        if decoded is None:
+            with _dataset(raster) as source:
+                # Rows of blocks, the striped rasters aren't read row by row
+                blocks = (block(source.read(band, window = window, masked = True))
+                          for window in windowed.windows(source, band))
+
+                result = functools.reduce(combine, blocks)
+        else:
+            data, _ = memmaps.read(_filename(raster), band, decoded)
+            result = functools.reduce(combine, (block(chunk) for chunk in memmaps.chunks(data)))
+
+        fields.update(pixels = result.size)
+
+    return result
+
+def summary(rasters, band = None, workers = None, cache = None, decoded = None):
+    """
+    Rasters band statistics, in a single pass for each raster.
+
+    Parameters
+    ----------
+    rasters : list
+        Raster filenames or lazy rasters (see :class:`rocha.windowed.Raster`).
+    band : int
+        Raster band (the default is None, to the lazy raster band or the first band).
+        See :class:`rocha.windowed.Raster`.
+    workers : int
+        Number of threads to read the rasters in parallel (the default is None, to read sequentially).
+    cache : str
+        Cache database filename, to reuse the results from unchanged rasters
+        (the default is None, to don't use the cache). See :mod:`caches`.
+    decoded : str
+        Decoded rasters cache directory (the default is None, to decode the rasters).
+        See :mod:`memmaps`.
+
+    Yields
+    ------
+    statistics : :class:`Statistics`
+        Raster band statistics, in the rasters order.
+
+    See Also
+    --------
+    reduce : Global statistics from all rasters.
+    """
+    def lookup(connection, raster):
+        value = caches.get(connection, _filename(raster), 'statistics', _band(raster, band))
+
+        # Entries without the extremes data type are from previous versions
+        if value is None or len(value) != len(Statistics._fields) + 1:
+            return None
+
+        # Masked extremes are cached as null values, the others restored to the raster data type
+        value_min, value_max, *others, dtype = value
+        value_min = ma.masked if value_min is None else np.dtype(dtype).type(value_min)
+        value_max = ma.masked if value_max is None else np.dtype(dtype).type(value_max)
+
+        return Statistics(value_min, value_max, *others)
+
+    def store(connection, raster, result):
+        value = [None if item is ma.masked else np.asarray(item).item() for item in result]
+        dtype = None if result.minimum is ma.masked else np.asarray(result.minimum).dtype.str
+
+        caches.put(connection, _filename(raster), 'statistics', [*value, dtype], _band(raster, band))
+
+    with caches.connect(cache) as connection:
+        if workers is None:
+            for raster in rasters:
+                result = lookup(connection, raster)
+
+                if result is None:
+                    result = statistics(raster, band, decoded)
+                    store(connection, raster, result)
+
+                yield result
+        else:
+            with concurrent.futures.ThreadPoolExecutor(max_workers = workers) as executor:
+                pending = []
+
+                # Just the rasters out of the cache are read
+                for raster in rasters:
+                    result = lookup(connection, raster)
+
+                    if result is None:
+                        result = executor.submit(statistics, raster, band, decoded)
+
+                    pending.append((raster, result))
+
+                for raster, result in pending:
+                    if isinstance(result, concurrent.futures.Future):
+                        result = result.result()
+                        store(connection, raster, result)
+
+                    yield result
+
+def reduce(results):
+    """
+    Global statistics from the statistics of all rasters.
+
+    Parameters
+    ----------
+    results : iterable of :class:`Statistics`
+        Rasters statistics, like from :func:`summary`.
+
+    Returns
+    -------
+    statistics : :class:`Statistics`
+        Global statistics.
+    """
+    return functools.reduce(combine, results)
+
+def limits(rasters, band = None, cache = None, decoded = None, auxiliary = False):
     """
     Rasters minimum and maximum individuals values.
 
     Parameters
     ----------
     rasters : list
-        Raster filenames.
+        Raster filenames or lazy rasters (see :class:`rocha.windowed.Raster`).
     band : int
-        Raster band.
+        Raster band (the default is None, to the lazy raster band or the first band).
+        See :class:`rocha.windowed.Raster`.
+    cache : str
+        Cache database filename, to reuse the results from unchanged rasters
+        (the default is None, to don't use the cache). See :mod:`caches`.
+    decoded : str
+        Decoded rasters cache directory (the default is None, to decode the rasters).
+        See :mod:`memmaps`.
+    auxiliary : bool
+        Reuse the statistics from the GDAL auxiliary files (.aux.xml) newer than the rasters.
+        These values are floats with 14 significant digits, not the exact raster values.
+        False: read the rasters (default), True: reuse the auxiliary statistics.
 
     Yields
     ------
@@ -194,26 +776,140 @@ def limits(rasters, band = 1):
     value_max : int or float
         Raster maximum value.
     """
-    for raster in rasters:
-        with rasterio.open(raster) as source:
-            dataset = source.read(band, masked = True)
+    if not auxiliary:
+        for result in summary(rasters, band, cache = cache, decoded = decoded):
+            yield result.minimum, result.maximum
 
-        value_min = np.min(dataset)
-        value_max = np.max(dataset)
+        return
 
-        yield value_min, value_max
+    rasters = list(rasters)
+    auxiliaries = [caches.auxiliary(_filename(raster), _band(raster, band)) for raster in rasters]
 
+    # Just the rasters without auxiliary statistics are read
+    missing = [raster for raster, values in zip(rasters, auxiliaries) if values is None]
+    results = summary(missing, band, cache = cache, decoded = decoded)
 
-def min_max(rasters, band = 1):
+    for values in auxiliaries:
+        if values is None:
+            result = next(results)
+            values = result.minimum, result.maximum
+
+        yield values
+
+def min_max(rasters, band = None, cache = None, decoded = None, auxiliary = False):
     """
     Rasters global minimum and maximum values.
 
+    Parameters
+    ----------
+    rasters : list
+        Raster filenames or lazy rasters (see :class:`rocha.windowed.Raster`).
+    band : int
+        Raster band (the default is None, to the lazy raster band or the first band).
+        See :class:`rocha.windowed.Raster`.
+    cache : str
+        Cache database filename, to reuse the results from unchanged rasters
+        (the default is None, to don't use the cache). See :mod:`caches`.
+    decoded : str
+        Decoded rasters cache directory (the default is None, to decode the rasters).
+        See :mod:`memmaps`.
+    auxiliary : bool
+        Reuse the statistics from the GDAL auxiliary files (.aux.xml), see :func:`limits`
+        (the default is False).
+
+    Returns
+    -------
+    result_min : int or float
+        Global rasters minimum value.
+    result_max : int or float
+        Global rasters maximum value.
+    """
+    if not auxiliary:
+        result = reduce(summary(rasters, band, cache = cache, decoded = decoded))
+
+        return result.minimum, result.maximum
+
+    # Rasters without valid values are ignored
+    values = [(value_min, value_max) for value_min, value_max in limits(rasters, band, cache, decoded, True)
+              if value_min is not ma.masked]
+
+    if not values:
+        return ma.masked, ma.masked
+
+    result_min, result_max = functools.reduce(lambda first, second: (min(first[0], second[0]),
+                                                                     max(first[1], second[1])), values)
+
+    return result_min, result_max
+
+def _limits(raster, band = None, cache = None, auxiliary = False):
+    """
+    Raster minimum and maximum values.
+    """
+    return next(limits([raster], band, cache, auxiliary = auxiliary))
+
+async def alimits(rasters, band = None, cache = None, concurrency = 4, executor = None, auxiliary = False):
+    """
+    Rasters minimum and maximum individuals values, asynchronously.
+
+    The rasters are read concurrently in the executor, and each result is yielded as soon as
+    it is ready, in any order. See :func:`limits` and :func:`rocha.streams.completed`.
+
     Parameters
     ----------
     rasters : list
         Raster filenames.
     band : int
-        Raster band.
+        Raster band (the default is None, to the lazy raster band or the first band).
+        See :class:`rocha.windowed.Raster`.
+    cache : str
+        Cache database filename, to reuse the results from unchanged rasters
+        (the default is None, to don't use the cache). See :mod:`caches`.
+    concurrency : int
+        Maximum rasters read at once (the default is 4).
+    executor : :class:`concurrent.futures.Executor` object
+        Executor to read the rasters (the default is None, to a threads pool).
+    auxiliary : bool
+        Reuse the statistics from the GDAL auxiliary files (.aux.xml), see :func:`limits`
+        (the default is False).
+
+    Yields
+    ------
+    raster : str
+        Raster filename.
+    value_min : int or float
+        Raster minimum value.
+    value_max : int or float
+        Raster maximum value.
+    """
+    # Loaded on demand, asyncio is heavy to the synchronous use
+    from . import streams
+
+    function = functools.partial(_limits, band = band, cache = cache, auxiliary = auxiliary)
+
+    async for raster, (value_min, value_max) in streams.completed(function, rasters, concurrency, executor):
+        yield raster, value_min, value_max
+
+async def amin_max(rasters, band = None, cache = None, concurrency = 4, executor = None, auxiliary = False):
+    """
+    Rasters global minimum and maximum values, asynchronously.
+
+    Parameters
+    ----------
+    rasters : list
+        Raster filenames.
+    band : int
+        Raster band (the default is None, to the lazy raster band or the first band).
+        See :class:`rocha.windowed.Raster`.
+    cache : str
+        Cache database filename, to reuse the results from unchanged rasters
+        (the default is None, to don't use the cache). See :mod:`caches`.
+    concurrency : int
+        Maximum rasters read at once (the default is 4).
+    executor : :class:`concurrent.futures.Executor` object
+        Executor to read the rasters (the default is None, to a threads pool).
+    auxiliary : bool
+        Reuse the statistics from the GDAL auxiliary files (.aux.xml), see :func:`limits`
+        (the default is False).
 
     Returns
     -------
@@ -222,11 +918,17 @@ def min_max(rasters, band = 1):
     result_max : int or float
         Global rasters maximum value.
     """
-    values = limits(rasters, band)
-    results = [(value_min, value_max) for value_min, value_max in values]
-    results_min, results_max = zip(*results)
+    result_min = ma.masked
+    result_max = ma.masked
 
-    result_min = min(results_min)
-    result_max = max(results_max)
+    async for _, value_min, value_max in alimits(rasters, band, cache, concurrency, executor, auxiliary):
+        # Rasters without valid values are ignored
+        if value_min is ma.masked:
+            continue
+
+        if result_min is ma.masked:
+            result_min, result_max = value_min, value_max
+        else:
+            result_min, result_max = min(result_min, value_min), max(result_max, value_max)
 
-    return result_min, result_max
\ No newline at end of file
+    return result_min, result_max
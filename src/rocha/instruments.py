@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`instruments` -- Hot path instrumentation
+==============================================
+
+.. module:: instruments
+    :platform: Unix, Windows
+    :synopsis: Timing, pixels, bytes and memory peaks by processing stage, for the observers.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+
+The stages are instrumented in :mod:`crop`, :mod:`extremes` and :mod:`plots`:
+
+- `crop.open`, `crop.window`, `crop.read`, `crop.remask`, `crop.extension`, `crop.extract`
+  and `crop.write`;
+- `extremes.hotspots`, `extremes.total` and `extremes.statistics`;
+- `plots.load` and `plots.render`.
+
+Without observers, a stage costs a global check and an empty context manager.
+
+>>> with instruments.observe() as recorder:
+...     crop.export(vector, column, pattern, input_path, output_path)
+>>> print(recorder.report())
+"""
+import time
+import threading
+import contextlib
+import collections
+import tracemalloc
+
+Event = collections.namedtuple('Event', ['stage', 'duration', 'unit', 'pixels', 'nbytes', 'peak'])
+Event.__doc__ = """
+Stage event.
+
+Attributes
+----------
+stage : str
+    Stage name, like `crop.read`.
+duration : float
+    Duration in seconds.
+unit : str
+    Work unit, like the raster or output filename, None if the stage isn't by work unit.
+pixels : int
+    Pixels processed, None if unknown.
+nbytes : int
+    Bytes processed, None if unknown.
+peak : int
+    Traced memory peak in bytes, None if the memory isn't traced.
+"""
+
+Summary = collections.namedtuple('Summary', ['count', 'total', 'mean', 'maximum', 'pixels', 'nbytes', 'peak'])
+Summary.__doc__ = """
+Stage events summary.
+
+Attributes
+----------
+count : int
+    Events quantity.
+total : float
+    Total duration in seconds.
+mean : float
+    Mean duration in seconds.
+maximum : float
+    Maximum duration in seconds.
+pixels : int
+    Total pixels processed.
+nbytes : int
+    Total bytes processed.
+peak : int
+    Maximum traced memory peak in bytes, None if the memory isn't traced.
+"""
+
+# Observers callbacks, empty when disabled
+_observers = []
+_memory = [0]
+_local = threading.local()
+
+class _Ignored(dict):
+    """
+    Stage fields ignored, when there are no observers.
+    """
+    def __setitem__(self, key, value):
+        pass
+
+    def update(self, *args, **kwargs):
+        pass
+
+class _Disabled:
+    """
+    Empty stage, when there are no observers.
+    """
+    fields = _Ignored()
+
+    def __enter__(self):
+        return self.fields
+
+    def __exit__(self, *exception):
+        return False
+
+_DISABLED = _Disabled()
+
+def stage(name, unit = None):
+    """
+    Instrumented stage.
+
+    Parameters
+    ----------
+    name : str
+        Stage name.
+    unit : str
+        Work unit (the default is None).
+
+    Returns
+    -------
+    context : context manager
+        Stage context, yields the fields dictionary to fill `pixels` and `nbytes`.
+    """
+    if not _observers:
+        return _DISABLED
+
+    return _stage(name, unit)
+
+@contextlib.contextmanager
+def _stage(name, unit):
+    """
+    Instrumented stage, with observers.
+    """
+    fields = {}
+    memory = _memory[0] > 0 and tracemalloc.is_tracing()
+    stack = getattr(_local, 'stack', None)
+
+    if stack is None:
+        stack = _local.stack = []
+
+    if memory:
+        if stack:
+            # Keep the enclosing stage peak, before the reset to this stage
+            stack[-1] = max(stack[-1], tracemalloc.get_traced_memory()[1])
+
+        tracemalloc.reset_peak()
+
+    stack.append(0)
+    start = time.perf_counter()
+
+    try:
+        yield fields
+    finally:
+        duration = time.perf_counter() - start
+        peak = stack.pop()
+
+        if memory:
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+
+            if stack:
+                stack[-1] = max(stack[-1], peak)
+        else:
+            peak = None
+
+        emit(Event(name, duration, unit, fields.get('pixels'), fields.get('nbytes'), peak))
+
+def emit(event):
+    """
+    Send an event to the observers.
+
+    Parameters
+    ----------
+    event : :class:`Event`
+        Stage event.
+    """
+    for observer in list(_observers):
+        observer(event)
+
+def enabled():
+    """
+    There are observers.
+
+    Returns
+    -------
+    bool
+        True if the stages are observed.
+    """
+    return bool(_observers)
+
+class Recorder:
+    """
+    Observer that keeps the events, and summarizes them by stage.
+
+    Attributes
+    ----------
+    events : list of :class:`Event`
+        Events received.
+    """
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    def summary(self):
+        """
+        Events summary by stage.
+
+        Returns
+        -------
+        summary : dict of {str : :class:`Summary`}
+            Summary by stage name, in the first event order.
+        """
+        stages = collections.OrderedDict()
+
+        with self._lock:
+            events = list(self.events)
+
+        for event in events:
+            stages.setdefault(event.stage, []).append(event)
+
+        summary = collections.OrderedDict()
+
+        for name, items in stages.items():
+            durations = [item.duration for item in items]
+            peaks = [item.peak for item in items if item.peak is not None]
+
+            summary[name] = Summary(count = len(items),
+                                    total = sum(durations),
+                                    mean = sum(durations) / len(items),
+                                    maximum = max(durations),
+                                    pixels = sum(item.pixels or 0 for item in items),
+                                    nbytes = sum(item.nbytes or 0 for item in items),
+                                    peak = max(peaks) if peaks else None)
+
+        return summary
+
+    def report(self):
+        """
+        Summary report as text table, by stage.
+
+        Returns
+        -------
+        report : str
+            Summary table.
+        """
+        lines = [f'{"stage":24} {"count":>7} {"total (s)":>10} {"mean (s)":>10} {"max (s)":>10} '
+                 f'{"pixels":>12} {"MiB":>9} {"peak MiB":>9}']
+
+        for name, item in self.summary().items():
+            peak = '' if item.peak is None else f'{item.peak / 2 ** 20:9.1f}'
+
+            lines.append(f'{name:24} {item.count:7d} {item.total:10.4f} {item.mean:10.4f} {item.maximum:10.4f} '
+                         f'{item.pixels:12d} {item.nbytes / 2 ** 20:9.1f} {peak:>9}')
+
+        return '\n'.join(lines)
+
+@contextlib.contextmanager
+def observe(observer = None, memory = False):
+    """
+    Observe the instrumented stages.
+
+    The stages in the worker processes aren't observed.
+
+    Parameters
+    ----------
+    observer : callable
+        Callback of each :class:`Event` (the default is None, to a new :class:`Recorder`).
+        Called from the thread running the stage.
+    memory : bool
+        Trace the memory peaks by stage with :mod:`tracemalloc`, slower (the default is False).
+
+    Yields
+    ------
+    observer : callable
+        Observer, the :class:`Recorder` by default.
+    """
+    if observer is None:
+        observer = Recorder()
+
+    started = memory and not tracemalloc.is_tracing()
+
+    if started:
+        tracemalloc.start()
+
+    if memory:
+        _memory[0] += 1
+
+    _observers.append(observer)
+
+    try:
+        yield observer
+    finally:
+        _observers.remove(observer)
+
+        if memory:
+            _memory[0] -= 1
+
+        if started:
+            tracemalloc.stop()
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`manifests` -- Completion manifests
+========================================
+
+.. module:: manifests
+    :platform: Unix, Windows
+    :synopsis: Record the finished output files, to resume the batch processing.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+"""
+import os
+import json
+import hashlib
+
+from . import paths
+
+def checksum(filename, size = 1 << 20):
+    """
+    File content checksum.
+
+    Parameters
+    ----------
+    filename : str
+        Filename.
+    size : int
+        Bytes quantity read at once (the default is 1 MiB).
+
+    Returns
+    -------
+    digest : str
+        SHA-256 hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+
+    with open(filename, 'rb') as source:
+        for chunk in iter(lambda: source.read(size), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+# Sidecar files extensions by vector extension, the other vectors are a single file
+SIDECARS = {'.shp': ['.cpg', '.dbf', '.prj', '.qix', '.qpj', '.sbn', '.sbx', '.shp', '.shx']}
+
+def sources(raster, vector, driver):
+    """
+    Sources fingerprints of an output file.
+
+    The vector fingerprint includes the sidecar files of the vector format, like the shapefile
+    attributes (see :data:`SIDECARS`). Other files with the same name aren't included.
+
+    Parameters
+    ----------
+    raster : str
+        Raster input filename.
+    vector : str
+        Vector filename.
+    driver : str
+        Driver code.
+
+    Returns
+    -------
+    sources : dict
+        Raster and vector fingerprints, and driver code.
+    """
+    name, extension = os.path.splitext(vector)
+
+    # Sidecar files in the vector extension case
+    extensions = [item.upper() if extension.isupper() else item for item in SIDECARS.get(extension.lower(), [])]
+    files = sorted({vector} | {f'{name}{item}' for item in extensions if os.path.isfile(f'{name}{item}')})
+
+    sources = {'raster': [raster, *paths.fingerprint(raster)],
+               'vector': [[file, *paths.fingerprint(file)] for file in files],
+               'driver': driver}
+
+    return sources
+
+def load(manifest):
+    """
+    Load the manifest records.
+
+    The manifest is a JSON Lines file, one record by finished output file.
+    For the same output file, the last record is kept.
+
+    Parameters
+    ----------
+    manifest : str
+        Manifest filename.
+
+    Returns
+    -------
+    records : dict of {str : dict}
+        Records by output filename, empty if the manifest file doesn't exist.
+    """
+    records = {}
+
+    if not os.path.exists(manifest):
+        return records
+
+    with open(manifest) as source:
+        for line in source:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Incomplete line from an interrupted run
+                continue
+
+            records[entry['output']] = entry
+
+    return records
+
+def record(manifest, output_file, sources):
+    """
+    Record a finished output file in the manifest.
+
+    The record is appended to the manifest file, so an interrupted run keeps the previous records.
+
+    Parameters
+    ----------
+    manifest : str
+        Manifest filename.
+    output_file : str
+        Output filename, already written.
+    sources : dict
+        Sources fingerprints from :func:`sources`.
+
+    Returns
+    -------
+    entry : dict
+        Manifest record.
+    """
+    entry = {'output': output_file,
+             'fingerprint': list(paths.fingerprint(output_file)),
+             'checksum': checksum(output_file),
+             'sources': sources}
+
+    with open(manifest, 'a') as destiny:
+        destiny.write(json.dumps(entry) + '\n')
+
+    return entry
+
+def current(records, output_file, sources, verify = False):
+    """
+    Output file is current by the manifest records.
+
+    Parameters
+    ----------
+    records : dict of {str : dict}
+        Manifest records from :func:`load`.
+    output_file : str
+        Output filename.
+    sources : dict
+        Sources fingerprints from :func:`sources`.
+    verify : bool
+        Verify the output content. False: compare the output fingerprint (default),
+        True: compare the output checksum.
+
+    Returns
+    -------
+    bool
+        True if the output file exists and was recorded from the same sources.
+    """
+    entry = records.get(output_file)
+
+    if entry is None or entry['sources'] != sources or not os.path.exists(output_file):
+        return False
+
+    if verify:
+        return entry['checksum'] == checksum(output_file)
+
+    return entry['fingerprint'] == list(paths.fingerprint(output_file))
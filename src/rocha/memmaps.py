@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`memmaps` -- Decoded rasters cache
+=======================================
+
+.. module:: memmaps
+    :platform: Unix, Windows
+    :synopsis: Raster bands decoded once to memory mapped files, for the repeated analysis.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+
+Each band is decoded once into `.npy` files (data and mask) next to a JSON sidecar with the
+profile and the source fingerprint. The later reads are masked arrays backed by
+:class:`numpy.memmap`, without decompression nor copies. The entries are decoded again when
+the source changes, and the least recently used are evicted over the capacity.
+
+>>> data, profile = memmaps.read('forest.tif', directory = 'decoded')
+>>> hotspots = extremes.hotspots(data, '>', 50, profile['nodata'])
+
+The arrays are read only, so in place operations like `hotspots(..., copy = False)` fail.
+"""
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+import numpy.ma as ma
+import affine
+import rasterio
+import rasterio.crs
+import rasterio.enums
+
+from . import paths
+from . import windowed
+
+# Decoded bytes kept in a directory, the least recently used evicted over it
+CAPACITY = 1 << 32
+
+def _base(raster, band, directory):
+    """
+    Entry filenames prefix, by the raster path and band.
+    """
+    name = hashlib.sha256(json.dumps([os.path.abspath(raster), band]).encode()).hexdigest()
+
+    return os.path.join(directory, name)
+
+def _load(base, fingerprint):
+    """
+    Entry data, mask and profile, None if it's missing or from another source version.
+    """
+    try:
+        with open(f'{base}.json') as source:
+            sidecar = json.load(source)
+    except (OSError, ValueError):
+        return None
+
+    if sidecar['fingerprint'] != list(fingerprint):
+        return None
+
+    try:
+        data = np.load(f'{base}.npy', mmap_mode = 'r')
+        mask = np.load(f'{base}.mask.npy', mmap_mode = 'r') if sidecar['masked'] else ma.nomask
+    except (OSError, ValueError):
+        return None
+
+    profile = dict(sidecar['profile'])
+    profile['crs'] = rasterio.crs.CRS.from_user_input(profile['crs']) if profile['crs'] else None
+    profile['transform'] = affine.Affine(*profile['transform'])
+
+    # Access time to the eviction, the file system atime isn't reliable
+    os.utime(f'{base}.json')
+
+    return ma.MaskedArray(data, mask = mask, copy = False, fill_value = profile['nodata']), profile
+
+def _decode(raster, band, base, fingerprint):
+    """
+    Decode the raster band by the internal blocks, to the entry files.
+    """
+    suffix = f'{os.getpid()}.{threading.get_ident()}'
+
+    with rasterio.open(raster) as source:
+        shape = (source.height, source.width)
+        flags = source.mask_flag_enums[band - 1]
+        masked = flags != [rasterio.enums.MaskFlags.all_valid]
+
+        data = np.lib.format.open_memmap(f'{base}.npy.{suffix}', mode = 'w+', dtype = source.dtypes[band - 1],
+                                         shape = shape)
+        mask = None
+
+        if masked:
+            mask = np.lib.format.open_memmap(f'{base}.mask.npy.{suffix}', mode = 'w+', dtype = bool,
+                                             shape = shape)
+
+        # Rows of blocks, the striped rasters aren't decoded row by row
+        for window in windowed.windows(source, band):
+            block = source.read(band, window = window, masked = True)
+            rows, cols = window.toslices()
+
+            data[rows, cols] = block.data
+
+            if masked:
+                mask[rows, cols] = ma.getmaskarray(block)
+
+        profile = {'driver': source.driver,
+                   'dtype': source.dtypes[band - 1],
+                   'nodata': source.nodata,
+                   'width': source.width,
+                   'height': source.height,
+                   'count': 1,
+                   'crs': source.crs.to_wkt() if source.crs else None,
+                   'transform': tuple(source.transform)[:6]}
+
+    data.flush()
+    del data
+    os.replace(f'{base}.npy.{suffix}', f'{base}.npy')
+
+    if masked:
+        mask.flush()
+        del mask
+        os.replace(f'{base}.mask.npy.{suffix}', f'{base}.mask.npy')
+
+    sidecar = {'raster': os.path.abspath(raster),
+               'band': band,
+               'fingerprint': list(fingerprint),
+               'masked': masked,
+               'profile': profile}
+
+    # The sidecar is the last, an entry without it isn't complete
+    with open(f'{base}.json.{suffix}', 'w') as destiny:
+        json.dump(sidecar, destiny)
+
+    os.replace(f'{base}.json.{suffix}', f'{base}.json')
+
+def read(raster, band = 1, directory = None, capacity = CAPACITY):
+    """
+    Raster band as masked array backed by memory mapped files, decoded once.
+
+    Parameters
+    ----------
+    raster : str
+        Raster filename.
+    band : int
+        Raster band.
+    directory : str
+        Cache directory, shared by the runs.
+    capacity : int
+        Decoded bytes kept in the directory, the least recently used entries are evicted
+        over it (the default is :data:`CAPACITY`).
+
+    Returns
+    -------
+    data : array
+        Raster band masked data, read only, with the shape (height, width).
+    profile : dict
+        Raster band profile, with a single band.
+
+    Raises
+    ------
+    ValueError
+        If there is no cache directory.
+    """
+    if directory is None:
+        message = 'Decoded rasters cache requires a directory.'
+        raise ValueError(message, raster)
+
+    base = _base(raster, band, directory)
+    fingerprint = paths.fingerprint(raster)
+    result = _load(base, fingerprint)
+
+    if result is not None:
+        return result
+
+    os.makedirs(directory, exist_ok = True)
+    _decode(raster, band, base, fingerprint)
+
+    # The new entry is the most recently used, it isn't evicted
+    evict(directory, capacity, keep = base)
+
+    return _load(base, fingerprint)
+
+def evict(directory, capacity = CAPACITY, keep = None):
+    """
+    Evict the least recently used entries over the capacity.
+
+    The files of an evicted entry still mapped stay valid on Unix, until unmapped.
+
+    Parameters
+    ----------
+    directory : str
+        Cache directory.
+    capacity : int
+        Decoded bytes kept in the directory (the default is :data:`CAPACITY`).
+    keep : str
+        Entry filenames prefix never evicted (the default is None).
+
+    Returns
+    -------
+    evicted : int
+        Entries quantity evicted.
+    """
+    entries = []
+
+    with os.scandir(directory) as items:
+        for item in items:
+            if not item.name.endswith('.json'):
+                continue
+
+            base = item.path[:-len('.json')]
+            files = [f'{base}.json', f'{base}.npy', f'{base}.mask.npy']
+            size = sum(os.path.getsize(filename) for filename in files if os.path.exists(filename))
+
+            entries.append((item.stat().st_mtime_ns, base, files, size))
+
+    stored = sum(entry[-1] for entry in entries)
+    evicted = 0
+
+    for _, base, files, size in sorted(entries):
+        if stored <= capacity:
+            break
+
+        if base == keep:
+            continue
+
+        try:
+            # The sidecar first, so a partial entry isn't loaded
+            for filename in files:
+                if os.path.exists(filename):
+                    os.remove(filename)
+        except OSError:
+            # Mapped files can't be removed on Windows
+            continue
+
+        stored -= size
+        evicted += 1
+
+    return evicted
+
+def chunks(data, size = 1 << 20):
+    """
+    Rows chunks of a memory mapped array, as views.
+
+    Parameters
+    ----------
+    data : array
+        Raster band data with the shape (height, width), like from :func:`read`.
+    size : int
+        Approximate pixels quantity by chunk (the default is 1048576).
+
+    Yields
+    ------
+    chunk : array
+        Rows view of the data, without copies.
+    """
+    height, width = data.shape
+    rows = max(1, size // max(width, 1))
+
+    for row in range(0, height, rows):
+        yield data[row:row + rows]
@@ -9,9 +9,97 @@
 .. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
 """
 import os
+import re
 import fnmatch
+import concurrent.futures
 
-def find(path, pattern, relative = True):
+def _compile(patterns):
+    """
+    Compile the shell-style wildcards patterns to a regular expression.
+
+    Parameters
+    ----------
+    patterns : str or list of str
+        Patterns like unix shell-style wildcards, or None.
+
+    Returns
+    -------
+    match : callable
+        Match function of the patterns, None if there are no patterns.
+    """
+    if patterns is None:
+        return None
+
+    if isinstance(patterns, str):
+        patterns = [patterns]
+
+    if len(patterns) == 0:
+        return None
+
+    expression = '|'.join(f'(?:{fnmatch.translate(os.path.normcase(pattern))})' for pattern in patterns)
+
+    return re.compile(expression).match
+
+def _scan(root, level, depth, include, exclude, prune):
+    """
+    Scan a directory, once.
+
+    Parameters
+    ----------
+    root : str
+        Directory path.
+    level : int
+        Directory depth from the pathname root.
+    depth : int
+        Maximum directory depth, None to unlimited.
+    include : callable
+        Match function of the included files.
+    exclude : callable
+        Match function of the excluded files, or None.
+    prune : callable
+        Match function of the pruned directories, or None.
+
+    Returns
+    -------
+    files : list of str
+        File paths matched, in the directory order.
+    directories : list of str
+        Subdirectories paths to walk, in the directory order.
+    """
+    files = []
+    directories = []
+
+    try:
+        entries = os.scandir(root)
+    except OSError:
+        # Unreadable directories are skipped, like os.walk
+        return files, directories
+
+    with entries:
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+
+            name = os.path.normcase(entry.name)
+
+            if is_dir:
+                if depth is not None and level >= depth:
+                    continue
+
+                if prune is not None and (prune(name) or prune(os.path.normcase(entry.path))):
+                    continue
+
+                # Symbolic links to directories aren't followed, like os.walk
+                if not entry.is_symlink():
+                    directories.append(entry.path)
+            elif include(name) and (exclude is None or not exclude(name)):
+                files.append(os.sep.join([root, entry.name]))
+
+    return files, directories
+
+def find(path, pattern, relative = True, exclude = None, prune = None, depth = None, workers = None):
     """
     Path from the files like pattern.
 
@@ -19,22 +107,125 @@ def find(path, pattern, relative = True):
     ----------
     path : str
         Pathname root.
-    pattern : str
-        Pattern like unix shell-style wildcards.
+    pattern : str or list of str
+        Pattern like unix shell-style wildcards, or list of patterns to include.
+    relative : bool
+        Absolute or relative path. False: absolute path, True: relative path.
+    exclude : str or list of str
+        Patterns of the excluded filenames (the default is None, no exclusion).
+    prune : str or list of str
+        Patterns of the directories not walked, matched with the directory name or
+        the directory path, like `.git` or `data/output*` (the default is None, walk all).
+    depth : int
+        Maximum directory depth, 0 to only the root files (the default is None, unlimited).
+    workers : int
+        Threads quantity to walk the subtrees (the default is None, walk sequentially).
+
+    Yields
+    ------
+    list of str
+        List of file path.
+
+    Notes
+    -----
+    Sequentially, the files are yielded in the same order as :func:`os.walk`.
+    With workers, the files are yielded as the directories are scanned, in any order.
+    """
+    include = _compile(pattern)
+    exclude = _compile(exclude)
+    prune = _compile(prune)
+
+    if include is None:
+        return
+
+    if workers is None:
+        names = _walk(path, depth, include, exclude, prune)
+    else:
+        names = _parallel(path, depth, include, exclude, prune, workers)
+
+    for name in names:
+        if relative:
+            yield name
+        else:
+            yield os.path.abspath(name)
+
+def _walk(path, depth, include, exclude, prune):
+    """
+    Walk the directories sequentially, top-down.
+    """
+    stack = [(path, 0)]
+
+    while stack:
+        root, level = stack.pop()
+        files, directories = _scan(root, level, depth, include, exclude, prune)
+
+        yield from files
+
+        stack.extend((directory, level + 1) for directory in reversed(directories))
+
+def _parallel(path, depth, include, exclude, prune, workers):
+    """
+    Walk the directories by a threads pool, yielding the files as they are found.
+    """
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers = workers)
+    pending = {executor.submit(_scan, path, 0, depth, include, exclude, prune): 0}
+
+    try:
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when = concurrent.futures.FIRST_COMPLETED)
+
+            for future in done:
+                level = pending.pop(future)
+                files, directories = future.result()
+
+                for directory in directories:
+                    task = executor.submit(_scan, directory, level + 1, depth, include, exclude, prune)
+                    pending[task] = level + 1
+
+                yield from files
+    finally:
+        # Stops the walk if the caller stops early
+        executor.shutdown(wait = True, cancel_futures = True)
+
+async def afind(path, pattern, relative = True, exclude = None, prune = None, depth = None, chunk = 1000,
+                executor = None):
+    """
+    Path from the files like pattern, asynchronously.
+
+    The directories are walked in the executor, yielding the paths by chunks, so the event loop
+    isn't blocked. See :func:`find` and :func:`rocha.streams.iterate`.
+
+    Parameters
+    ----------
+    path : str
+        Pathname root.
+    pattern : str or list of str
+        Pattern like unix shell-style wildcards, or list of patterns to include.
     relative : bool
         Absolute or relative path. False: absolute path, True: relative path.
+    exclude : str or list of str
+        Patterns of the excluded filenames (the default is None, no exclusion).
+    prune : str or list of str
+        Patterns of the directories not walked (the default is None, walk all).
+    depth : int
+        Maximum directory depth (the default is None, unlimited).
+    chunk : int
+        Paths quantity found at once in the executor (the default is 1000).
+    executor : :class:`concurrent.futures.Executor` object
+        Executor to walk the directories (the default is None, to a single thread).
 
     Yields
     ------
     list of str
         List of file path.
     """
-    for (root, _, files) in os.walk(path):
-        for name in fnmatch.filter(files, pattern):
-            if relative:
-                yield os.sep.join([root, name])
-            else:
-                yield os.path.abspath(os.sep.join([root, name]))
+    # Loaded on demand, asyncio is heavy to the light discovery
+    from . import streams
+
+    files = find(path, pattern, relative, exclude, prune, depth)
+
+    async for name in streams.iterate(files, chunk, executor):
+        yield name
 
 def output(input_file, input_path, output_path, change = True, extra = None, begin = False, output_extension = None):
     """
@@ -82,4 +273,24 @@ def output(input_file, input_path, output_path, change = True, extra = None, beg
         root = dirname.replace(input_path, output_path)
         output_file = os.sep.join([root, filename])
 
-    return output_file
\ No newline at end of file
+    return output_file
+
+def fingerprint(filename):
+    """
+    File fingerprint from the size and the modification time.
+
+    Parameters
+    ----------
+    filename : str
+        Filename.
+
+    Returns
+    -------
+    size : int
+        File size in bytes.
+    mtime : int
+        Modification time in nanoseconds.
+    """
+    status = os.stat(filename)
+
+    return status.st_size, status.st_mtime_ns
@@ -8,16 +8,19 @@
     :synopsis: Plots the raster datasets and the vector geometries.
 .. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
 """
-import rasterio
-from rasterio.plot import show
+import math
+import functools
+import concurrent.futures
 import numpy as np
-import matplotlib as mpl
-import matplotlib.pyplot as plt
-from mpl_toolkits.axes_grid1 import make_axes_locatable
+import numpy.ma as ma
+import rasterio
+import rasterio.enums
 
-from . import extremes
+from . import memmaps
+from . import instruments
 
-def maps(rasters, rows, cols, title, subtitles, labels, color, bar, band = 1, figsize = (12, 12)):
+def maps(rasters, rows, cols, title, subtitles, labels, color, bar, band = 1, figsize = (12, 12), workers = None,
+         decoded = None):
     """
     Plot the rasters files as image maps.
 
@@ -45,32 +48,215 @@ def maps(rasters, rows, cols, title, subtitles, labels, color, bar, band = 1, fi
 
     bar : str
         Colorbar position as `last`, `all` or `global`
+    workers : int
+        Number of threads to read the rasters (the default is None, for the
+        :class:`concurrent.futures.ThreadPoolExecutor` default).
+    decoded : str
+        Decoded rasters cache directory, to decimate the bands decoded once (the default is None,
+        to read the rasters). See :mod:`memmaps`.
 
     Returns
     -------
     figure : :class:`matplotlib.figure.Figure` object.
+
+    Raises
+    ------
+    ValueError
+        If there are no valid values in the rasters data read.
+
+    Notes
+    -----
+    Each raster is read once, decimated to the axis size, and the color scale is normalized
+    with the minimum and maximum values of the data read.
     """
+    # Plotting modules loaded on demand, to keep the package import light
+    import matplotlib as mpl
+    import matplotlib.pyplot as plt
+    from rasterio.plot import show
+
     figure, axes = plt.subplots(rows, cols, sharex = True, sharey = True, figsize = figsize)
 
+    # Axis to the subplot.
+    subplots = [axes[subplot // cols, subplot % cols] for subplot in range(len(rasters))]
+
+    # Rasters read once in parallel, the reads release the GIL
+    with concurrent.futures.ThreadPoolExecutor(max_workers = workers) as executor:
+        datasets = list(executor.map(functools.partial(load, figure, band = band, decoded = decoded), rasters, subplots))
+
     # Normalize scale color with the global minimum and maximun rasters values.
-    value_min, value_max = extremes.min_max(rasters, band)
+    value_min, value_max = limits(data for data, _ in datasets)
+
+    if value_min is ma.masked:
+        plt.close(figure)
+
+        message = 'Rasters without valid values.'
+        raise ValueError(message, rasters)
+
     bounds = np.linspace(value_min, value_max, num = 11)
     norm = mpl.colors.BoundaryNorm(boundaries = bounds, ncolors = 256)
 
-    for subplot, raster in enumerate(rasters):
-        with rasterio.open(raster) as source:
-            # Axis to the subplot.
-            row = subplot // cols
-            col = subplot % cols
-            axis = axes[row, col]
+    with instruments.stage('plots.render') as fields:
+        for axis, (data, transform) in zip(subplots, datasets):
+            show(data, ax = axis, transform = transform, cmap = color, norm = norm)
 
-            show(source, ax = axis, cmap = color, norm = norm)
+        fields.update(pixels = sum(data.size for data, _ in datasets))
 
     colorbar(figure, axes, bar)
     configuration(figure, axes, title, subtitles, labels)
 
     return figure
 
+def load(figure, raster, axis, band = 1, decoded = None):
+    """
+    Raster band data decimated to the axis size.
+
+    Parameters
+    ----------
+    figure : :class:`matplotlib.figure.Figure` object.
+
+    raster : str
+        Raster filename.
+    axis : :class:`matplotlib.axes.Axes` object.
+
+    band : int
+        Raster band.
+    decoded : str
+        Decoded rasters cache directory (the default is None, to read the raster).
+        See :mod:`memmaps`.
+
+    Returns
+    -------
+    data : array
+        Raster masked data.
+    transform : affine
+        Affine transform of the decimated data.
+    """
+    with instruments.stage('plots.load', raster) as fields, rasterio.open(raster) as source:
+        # Just the pixels shown in the axis are read
+        shape = resolution(figure, axis, source)
+
+        if decoded is None:
+            data, transform = decimate(source, band, shape)
+        else:
+            data, _ = memmaps.read(raster, band, decoded)
+            data, transform = stride(data, source.transform, shape)
+
+        fields.update(pixels = data.size, nbytes = data.nbytes)
+
+    return data, transform
+
+def limits(datasets):
+    """
+    Global minimum and maximum values of the masked arrays.
+
+    Parameters
+    ----------
+    datasets : iterable of array
+        Raster masked data.
+
+    Returns
+    -------
+    value_min : int or float
+        Minimum value, masked if there are no valid values.
+    value_max : int or float
+        Maximum value, masked if there are no valid values.
+    """
+    minimums = []
+    maximums = []
+
+    for data in datasets:
+        if data.count() > 0:
+            minimums.append(data.min())
+            maximums.append(data.max())
+
+    if not minimums:
+        return ma.masked, ma.masked
+
+    return min(minimums), max(maximums)
+
+def resolution(figure, axis, source):
+    """
+    Raster shape to fill the axis pixels, without upsampling.
+
+    Parameters
+    ----------
+    figure : :class:`matplotlib.figure.Figure` object.
+
+    axis : :class:`matplotlib.axes.Axes` object.
+
+    source : :class:`rasterio.io.DatasetReader` object
+        Raster dataset opened in read mode.
+
+    Returns
+    -------
+    shape : tuple of int
+        Raster shape as (height, width), with the raster aspect ratio.
+    """
+    position = axis.get_position()
+
+    # Axis size in display pixels
+    width = position.width * figure.get_figwidth() * figure.dpi
+    height = position.height * figure.get_figheight() * figure.dpi
+
+    scale = min(1.0, max(width / source.width, height / source.height))
+
+    return max(1, math.ceil(source.height * scale)), max(1, math.ceil(source.width * scale))
+
+def decimate(source, band, shape):
+    """
+    Raster band data decimated to a shape.
+
+    GDAL reads from the overviews of the raster when they exist, and resamples the
+    full resolution data otherwise.
+
+    Parameters
+    ----------
+    source : :class:`rasterio.io.DatasetReader` object
+        Raster dataset opened in read mode.
+    band : int
+        Raster band.
+    shape : tuple of int
+        Output shape as (height, width).
+
+    Returns
+    -------
+    data : array
+        Raster masked data.
+    transform : affine
+        Affine transform of the decimated data.
+    """
+    height, width = shape
+
+    data = source.read(band, out_shape = shape, masked = True, resampling = rasterio.enums.Resampling.nearest)
+    transform = source.transform * source.transform.scale(source.width / width, source.height / height)
+
+    return data, transform
+
+def stride(data, transform, shape):
+    """
+    Raster band data decimated to a shape by strides, as a view.
+
+    Parameters
+    ----------
+    data : array
+        Raster band data with the shape (height, width), like from :func:`rocha.memmaps.read`.
+    transform : affine
+        Affine transform of the data.
+    shape : tuple of int
+        Maximum output shape as (height, width).
+
+    Returns
+    -------
+    data : array
+        Raster masked data, a view of each step pixels.
+    transform : affine
+        Affine transform of the decimated data.
+    """
+    height, width = shape
+    rows = max(1, math.ceil(data.shape[0] / height))
+    cols = max(1, math.ceil(data.shape[1] / width))
+
+    return data[::rows, ::cols], transform * transform.scale(cols, rows)
 
 def colorbar(figure, axes, bar):
     """
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`streams` -- Asynchronous streams
+======================================
+
+.. module:: streams
+    :platform: Unix, Windows
+    :synopsis: Run the blocking raster and vector work from asyncio, on bounded executors.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+"""
+import asyncio
+import itertools
+import contextlib
+import concurrent.futures
+
+@contextlib.contextmanager
+def _executor(executor, workers):
+    """
+    Executor from the caller, or a new threads pool closed at the end.
+
+    Parameters
+    ----------
+    executor : :class:`concurrent.futures.Executor` object
+        Executor from the caller, kept open. None to a new threads pool.
+    workers : int
+        Number of threads to the new pool.
+
+    Yields
+    ------
+    executor : :class:`concurrent.futures.Executor` object
+        Executor.
+    """
+    if executor is not None:
+        yield executor
+        return
+
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers = workers)
+
+    try:
+        yield pool
+    finally:
+        # Running tasks can't be interrupted, the pending ones are cancelled
+        pool.shutdown(wait = False, cancel_futures = True)
+
+async def iterate(iterable, chunk = 1, executor = None):
+    """
+    Asynchronous iteration of a blocking iterable.
+
+    The iterable is advanced in the executor, so the event loop isn't blocked. The next
+    chunk is computed while the current one is consumed, and no further (backpressure).
+    If the consumer stops, or is cancelled, the iterable is closed.
+
+    Parameters
+    ----------
+    iterable : iterable
+        Blocking iterable, like a generator.
+    chunk : int
+        Items quantity advanced at once in the executor, to amortize the cheap items
+        (the default is 1).
+    executor : :class:`concurrent.futures.Executor` object
+        Executor to advance the iterable (the default is None, to a single thread).
+
+    Yields
+    ------
+    item : object
+        Iterable item, as soon as it is ready.
+    """
+    loop = asyncio.get_running_loop()
+    iterator = iter(iterable)
+
+    def advance():
+        return list(itertools.islice(iterator, chunk))
+
+    with _executor(executor, 1) as pool:
+        pending = loop.run_in_executor(pool, advance)
+
+        try:
+            while True:
+                items = await pending
+
+                if not items:
+                    break
+
+                # Prefetch the next chunk while this one is consumed
+                pending = loop.run_in_executor(pool, advance)
+
+                for item in items:
+                    yield item
+        finally:
+            if not pending.done():
+                # The iterable can't be closed while it is advanced
+                await asyncio.wait([pending])
+
+            close = getattr(iterator, 'close', None)
+
+            if close is not None:
+                await loop.run_in_executor(pool, close)
+
+async def completed(function, items, concurrency = 4, executor = None):
+    """
+    Apply a blocking function to the items concurrently, as soon as completed.
+
+    At most `concurrency` calls are in flight; a new call starts just when a result
+    is consumed (backpressure). If the consumer stops, or is cancelled, the calls not
+    started are cancelled.
+
+    Parameters
+    ----------
+    function : callable
+        Blocking function of one item.
+    items : iterable
+        Function arguments.
+    concurrency : int
+        Maximum calls in flight (the default is 4).
+    executor : :class:`concurrent.futures.Executor` object
+        Executor to call the function (the default is None, to a threads pool with
+        `concurrency` threads).
+
+    Yields
+    ------
+    item : object
+        Function argument.
+    result : object
+        Function result.
+    """
+    loop = asyncio.get_running_loop()
+    items = iter(items)
+    pending = {}
+
+    def submit():
+        for item in itertools.islice(items, concurrency - len(pending)):
+            pending[loop.run_in_executor(pool, function, item)] = item
+
+    with _executor(executor, concurrency) as pool:
+        try:
+            submit()
+
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when = asyncio.FIRST_COMPLETED)
+
+                for future in done:
+                    item = pending.pop(future)
+
+                    yield item, future.result()
+
+                submit()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`windowed` -- Lazy windowed rasters
+========================================
+
+.. module:: windowed
+    :platform: Unix, Windows
+    :synopsis: Raster as a lazy array, the slices are windowed reads.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+
+>>> with windowed.Raster('forest.tif', band = 1) as raster:
+...     corner = raster[:256, :256]
+...     count = sum(int(data.count()) for _, data in raster.chunks())
+
+:func:`rocha.extremes.hotspots`, :func:`rocha.extremes.total`, :func:`rocha.extremes.limits`
+and :func:`rocha.crop.mask` accept a :class:`Raster`, and read it by chunks or windows.
+"""
+import numpy as np
+import rasterio
+import rasterio.windows
+
+def windows(source, band = 1, size = 1 << 20):
+    """
+    Raster windows aligned with the internal blocks.
+
+    The windows span the raster width, and stack as many blocks rows as needed to
+    hold about `size` pixels, so the striped rasters aren't processed row by row.
+
+    Parameters
+    ----------
+    source : :class:`rasterio.io.DatasetReader` object
+        Raster dataset opened in read mode.
+    band : int
+        Raster band.
+    size : int
+        Approximate pixels quantity by window (the default is 1048576).
+
+    Yields
+    ------
+    window : :class:`rasterio.windows.Window` object
+        Raster window.
+    """
+    block_height, _ = source.block_shapes[band - 1]
+    rows = max(block_height, size // max(source.width, 1) // block_height * block_height)
+
+    for row in range(0, source.height, rows):
+        yield rasterio.windows.Window(0, row, source.width, min(rows, source.height - row))
+
+class Raster:
+    """
+    Raster as a lazy masked array, nothing is read until sliced.
+
+    Parameters
+    ----------
+    raster : str or :class:`rasterio.io.DatasetReader` object
+        Raster filename, opened on the first access, or raster dataset opened in read mode,
+        kept open.
+    band : int
+        Raster band, to a two dimensional array (the default is None, to all bands as a
+        three dimensional array).
+
+    Attributes
+    ----------
+    name : str
+        Raster filename.
+    band : int
+        Raster band, None to all bands.
+    """
+    def __init__(self, raster, band = None):
+        self.band = band
+
+        if isinstance(raster, str):
+            self.name = raster
+            self._source = None
+            self._owned = True
+        else:
+            self.name = raster.name
+            self._source = raster
+            self._owned = False
+
+    def __repr__(self):
+        return f'Raster({self.name!r}, band = {self.band!r})'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+        return False
+
+    def close(self):
+        """
+        Close the raster dataset, if opened here.
+        """
+        if self._owned and self._source is not None:
+            self._source.close()
+            self._source = None
+
+    @property
+    def dataset(self):
+        """
+        Raster dataset opened in read mode.
+        """
+        if self._source is None:
+            self._source = rasterio.open(self.name)
+
+        return self._source
+
+    @property
+    def indexes(self):
+        """
+        Raster bands read.
+        """
+        return self.dataset.indexes if self.band is None else [self.band]
+
+    @property
+    def shape(self):
+        """
+        Array shape, as (height, width) to a band or (count, height, width).
+        """
+        shape = (self.dataset.height, self.dataset.width)
+
+        return shape if self.band is not None else (self.dataset.count, *shape)
+
+    @property
+    def ndim(self):
+        """
+        Array dimensions quantity.
+        """
+        return len(self.shape)
+
+    @property
+    def size(self):
+        """
+        Array pixels quantity.
+        """
+        return int(np.prod(self.shape))
+
+    @property
+    def dtype(self):
+        """
+        Array data type.
+        """
+        return np.dtype(self.dataset.dtypes[self.indexes[0] - 1])
+
+    @property
+    def transform(self):
+        """
+        Raster affine transform.
+        """
+        return self.dataset.transform
+
+    @property
+    def crs(self):
+        """
+        Raster coordinate reference system.
+        """
+        return self.dataset.crs
+
+    @property
+    def nodata(self):
+        """
+        Raster nodata value.
+        """
+        return self.dataset.nodata
+
+    @property
+    def profile(self):
+        """
+        Raster profile, with the bands read.
+        """
+        profile = self.dataset.profile
+        profile['count'] = len(self.indexes)
+
+        return profile
+
+    def read(self, window = None):
+        """
+        Raster masked data in a window.
+
+        Parameters
+        ----------
+        window : :class:`rasterio.windows.Window` object
+            Raster window (the default is None, to the whole raster).
+
+        Returns
+        -------
+        data : array
+            Raster masked data, with the array dimensions.
+        """
+        return self.dataset.read(self.band, window = window, masked = True)
+
+    def windows(self):
+        """
+        Raster windows aligned with the internal blocks, as rows of blocks. See :func:`windows`.
+
+        Yields
+        ------
+        window : :class:`rasterio.windows.Window` object
+            Raster window.
+        """
+        yield from windows(self.dataset, self.indexes[0])
+
+    def chunks(self):
+        """
+        Raster data by rows of the internal blocks, so the memory is bounded by a few blocks rows.
+
+        Yields
+        ------
+        window : :class:`rasterio.windows.Window` object
+            Raster window.
+        data : array
+            Raster masked data in the window.
+        """
+        for window in self.windows():
+            yield window, self.read(window)
+
+    def __array__(self, dtype = None, copy = None):
+        data = self.read()
+
+        return data if dtype is None else data.astype(dtype)
+
+    def __getitem__(self, key):
+        """
+        Windowed read of the slices, the bands dimension first to all bands.
+
+        Just the window covering the slices is read, and the steps are taken from it.
+
+        Parameters
+        ----------
+        key : int, slice or tuple of int and slice
+            Array index.
+
+        Returns
+        -------
+        data : array or scalar
+            Raster masked data, a scalar or :data:`numpy.ma.masked` to integers on all axes.
+
+        Raises
+        ------
+        IndexError
+            If the index isn't of integers and slices, or is out of the array.
+        """
+        shape = self.shape
+        key = key if isinstance(key, tuple) else (key,)
+
+        if len(key) > len(shape):
+            message = 'Too many indices for the raster.'
+            raise IndexError(message, key)
+
+        key = key + (slice(None),) * (len(shape) - len(key))
+        ranges = []
+        squeezed = []
+
+        for axis, (item, length) in enumerate(zip(key, shape)):
+            if isinstance(item, slice):
+                ranges.append(range(*item.indices(length)))
+            elif isinstance(item, (int, np.integer)):
+                position = int(item) + length if item < 0 else int(item)
+
+                if not 0 <= position < length:
+                    message = 'Index out of the raster.'
+                    raise IndexError(message, item, axis)
+
+                ranges.append(range(position, position + 1))
+                squeezed.append(axis)
+            else:
+                message = 'Invalid raster index, just integers and slices.'
+                raise IndexError(message, item)
+
+        *bands, rows, cols = ranges
+
+        if not len(rows) or not len(cols) or (bands and not len(bands[0])):
+            empty = tuple(len(item) for item in ranges)
+
+            return np.ma.masked_array(np.empty(empty, dtype = self.dtype)).squeeze(axis = tuple(squeezed))
+
+        window = rasterio.windows.Window.from_slices((min(rows), max(rows) + 1), (min(cols), max(cols) + 1))
+        indexes = self.band if not bands else [self.dataset.indexes[band] for band in bands[0]]
+        data = self.dataset.read(indexes, window = window, masked = True)
+
+        # Steps, and reversed slices, from the window read
+        for axis, items in ((-2, rows), (-1, cols)):
+            if items.step != 1:
+                data = data.take(np.asarray(items) - min(items), axis = axis)
+
+        data = data.squeeze(axis = tuple(squeezed)) if squeezed else data
+
+        # Scalar like numpy to a pixel, masked as :data:`numpy.ma.masked`
+        return data[()] if data.ndim == 0 else data
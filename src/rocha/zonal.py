@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`zonal` -- Zonal statistics
+================================
+
+.. module:: zonal
+    :platform: Unix, Windows
+    :synopsis: Raster statistics by the vector features, in a single pass over the raster.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+"""
+import collections
+import numpy as np
+import numpy.ma as ma
+import rasterio
+import rasterio.features
+import rasterio.windows
+
+from . import crop
+from . import paths
+from . import extremes
+from . import windowed
+
+# Raster statistics of a zone
+Zone = collections.namedtuple('Zone', ['count', 'sum', 'mean', 'minimum', 'maximum', 'area'])
+Zone.__doc__ = """
+Raster statistics from the valid values inside a zone.
+
+Attributes
+----------
+count : int
+    Valid values quantity.
+sum : float
+    Valid values sum.
+mean : float
+    Valid values mean, NaN if there are no valid values.
+minimum : int or float
+    Minimum value, masked if there are no valid values.
+maximum : int or float
+    Maximum value, masked if there are no valid values.
+area : float
+    Valid area, in the unit of :func:`rocha.extremes.area`.
+"""
+
+def zones(column):
+    """
+    Zones from the vector column values.
+
+    The features with the same value are the same zone.
+
+    Parameters
+    ----------
+    column : array
+        Column values, in the features order.
+
+    Returns
+    -------
+    keys : array
+        Zones keys, the distinct column values.
+    labels : array of int
+        Zone label by feature, from 1 (0 is outside all zones).
+    """
+    keys, inverse = np.unique(column, return_inverse = True)
+
+    return keys, inverse.ravel() + 1
+
+def windows(source, band = 1, size = 1 << 20):
+    """
+    Raster windows aligned with the internal blocks, as rows of blocks.
+
+    See :func:`rocha.windowed.windows`.
+    """
+    return windowed.windows(source, band, size)
+
+def rasterize(geometries, labels, index, source, window):
+    """
+    Label image of the features, in a raster window.
+
+    Parameters
+    ----------
+    geometries : list of dict
+        Vector geometries.
+    labels : array of int
+        Zone label by feature, from :func:`zones`.
+    index : array
+        Geometries bounding boxes from :func:`rocha.crop.bounds`.
+    source : :class:`rasterio.io.DatasetReader` object
+        Raster dataset opened in read mode.
+    window : :class:`rasterio.windows.Window` object
+        Raster window.
+
+    Returns
+    -------
+    image : array of int
+        Zone label by pixel, 0 outside all zones.
+
+    Notes
+    -----
+    Just the features intersecting the window are rasterized. A pixel inside overlapped
+    features has the label of the last feature.
+    """
+    shape = (int(window.height), int(window.width))
+    region = rasterio.windows.bounds(window, source.transform)
+    selection = crop.intersects(index, region)
+
+    if len(selection) == 0:
+        return np.zeros(shape, dtype = np.int32)
+
+    shapes = ((geometries[feature], int(labels[feature])) for feature in selection)
+
+    return rasterio.features.rasterize(shapes, out_shape = shape, transform = source.window_transform(window),
+                                       fill = 0, dtype = np.int32)
+
+# Label images kept by run, in bytes
+IMAGES_CAPACITY = 1 << 28
+
+def statistics(geometries, column, raster, band = 1, crs = None, factor = 1, index = None, images = None):
+    """
+    Raster statistics by zone, in a single pass over the raster.
+
+    The features are rasterized as labels by raster window, and the valid values are
+    reduced by label, so the cropped arrays aren't built.
+
+    Parameters
+    ----------
+    geometries : list of dict
+        Vector geometries.
+    column : array
+        Column values, in the features order. The features with the same value are the same zone.
+    raster : str
+        Raster filename.
+    band : int
+        Raster band.
+    crs : str
+        Coordinate reference system code, to the area unit.
+    factor : int or float
+        Multiplicative factor to the area.
+    index : array
+        Geometries bounding boxes from :func:`rocha.crop.bounds` (the default is None, to compute it).
+    images : dict
+        Label images by grid signature and window, shared by the rasters on the same grid
+        of the same geometries, up to :data:`IMAGES_CAPACITY` bytes (the default is None,
+        to rasterize the labels for each raster).
+
+    Returns
+    -------
+    table : dict of {object : :class:`Zone`}
+        Zone statistics by column value.
+    """
+    if index is None:
+        index = crop.bounds(geometries)
+
+    keys, labels = zones(column)
+    length = len(keys) + 1
+
+    count = np.zeros(length, dtype = np.int64)
+    total = np.zeros(length, dtype = np.float64)
+    minimum = np.full(length, np.inf)
+    maximum = np.full(length, -np.inf)
+
+    with rasterio.open(raster) as source:
+        dtype = np.dtype(source.dtypes[band - 1])
+        grid = crop.signature(source)
+
+        for window in windows(source, band):
+            entry = (grid, window.flatten())
+
+            if images is not None and entry in images:
+                image = images[entry]
+            else:
+                image = rasterize(geometries, labels, index, source, window)
+
+                if images is not None:
+                    stored = sum(item.nbytes for item in images.values())
+
+                    if stored + image.nbytes <= IMAGES_CAPACITY:
+                        images[entry] = image
+
+            if not image.any():
+                continue
+
+            data = source.read(band, window = window, masked = True)
+
+            # Valid pixels inside the zones
+            valid = ~ma.getmaskarray(data) & (image > 0)
+            label = image[valid]
+            values = data.data[valid].astype(np.float64, copy = False)
+
+            count += np.bincount(label, minlength = length)
+            total += np.bincount(label, weights = values, minlength = length)
+            np.minimum.at(minimum, label, values)
+            np.maximum.at(maximum, label, values)
+
+    square = extremes.area(raster, crs, factor)
+
+    table = {}
+
+    for label, key in enumerate(keys, start = 1):
+        quantity = int(count[label])
+
+        if quantity == 0:
+            table[key] = Zone(0, 0.0, np.nan, ma.masked, ma.masked, 0.0)
+            continue
+
+        table[key] = Zone(count = quantity,
+                          sum = float(total[label]),
+                          mean = float(total[label]) / quantity,
+                          minimum = dtype.type(minimum[label]),
+                          maximum = dtype.type(maximum[label]),
+                          area = quantity * square)
+
+    return table
+
+def multiples(vector, column, pattern, input_path, band = 1, crs = None, factor = 1):
+    """
+    Raster statistics by the vector features, for the multiples rasters.
+
+    Find the rasters files by pattern, and reduces each raster by the zones of the vector
+    column, in a single pass over the raster. The vector is read once.
+
+    Parameters
+    ----------
+    vector : str
+        Vector filename.
+    column : str
+        Column name, the features with the same value are the same zone.
+    pattern : str
+        Pattern like unix shell-style wildcards.
+    input_path : str
+        Path from raster input files.
+    band : int
+        Raster band.
+    crs : str
+        Coordinate reference system code, to the area unit.
+    factor : int or float
+        Multiplicative factor to the area.
+
+    Yields
+    ------
+    raster : str
+        Raster filename.
+    table : dict of {object : :class:`Zone`}
+        Zone statistics by column value.
+    """
+    geometries, columns = crop.features(vector, [column])
+    index = crop.bounds(geometries)
+
+    # Label images reused by the rasters on the same grid
+    images = {}
+
+    for raster in paths.find(input_path, pattern):
+        yield raster, statistics(geometries, columns[column], raster, band, crs, factor, index, images)
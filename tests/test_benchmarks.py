@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`benchmarks` -- Tests performance benchmarks
+=================================================
+
+.. module:: benchmarks
+    :platform: Unix, Windows
+    :synopsis: Tests of the synthetic data and the baseline comparison.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+"""
+import os
+import sys
+import fiona
+import rasterio
+
+from benchmarks import suite
+from benchmarks import synthetic
+
+def test_raster_deterministic(tmp_path):
+    """
+    Test synthetic raster with the same content from the same arguments, tiled and striped.
+    """
+    first = synthetic.raster(str(tmp_path / 'first.tif'), 300, 200, tiled = True, fraction = 0.25, seed = 7)
+    second = synthetic.raster(str(tmp_path / 'second.tif'), 300, 200, tiled = False, fraction = 0.25, seed = 7)
+
+    with rasterio.open(first) as source:
+        tiled = source.read(1, masked = True)
+        blocks = source.block_shapes
+
+    with rasterio.open(second) as source:
+        striped = source.read(1, masked = True)
+
+    assert blocks == [(256, 256)]
+    assert (tiled.mask == striped.mask).all()
+    assert (tiled == striped).all()
+    assert 0.2 < tiled.mask.mean() < 0.3
+
+def test_polygons(tmp_path):
+    """
+    Test synthetic polygons layer with the features quantity and the labels column.
+    """
+    vector = synthetic.polygons(str(tmp_path / 'regions.shp'), 100)
+
+    with fiona.open(vector) as source:
+        regions = [feature['properties']['REGION'] for feature in source]
+
+    assert len(regions) == 100
+    assert len(set(regions)) == 100
+
+def test_tree(tmp_path):
+    """
+    Test synthetic directory tree with the files quantity.
+    """
+    path = str(tmp_path / 'tree')
+
+    quantity = synthetic.tree(path, depth = 2, fanout = 3, files = 2)
+    files = [name for _, _, names in os.walk(path) for name in names]
+
+    assert quantity == (1 + 3 + 9) * 2 * 3
+    assert len(files) == quantity
+
+def test_compare():
+    """
+    Test the measures comparison with the baseline, over the tolerance.
+    """
+    baseline = {'paths.find': {'wall': 1.0, 'rss': 100, 'read': None}}
+    results = {'paths.find': {'wall': 1.5, 'rss': 110, 'read': 10},
+               'plots.maps': {'wall': 2.0, 'rss': 100, 'read': 10}}
+
+    rows = suite.compare(results, baseline, tolerance = 0.2)
+
+    assert [(name, metric, regression) for name, metric, _, _, _, regression in rows] == \
+           [('paths.find', 'wall', True), ('paths.find', 'rss', False)]
+
+def test_measure(tmp_path):
+    """
+    Test a benchmark measured in a new process.
+    """
+    data = suite.prepare(str(tmp_path), 'tiny')
+
+    measures = suite.measure('paths.find', data)
+
+    assert measures['wall'] > 0
+    assert set(measures) == set(suite.METRICS)
+
+def test_setup(tmp_path):
+    """
+    Test the benchmarks setups import the modules, and return the callable measured.
+    """
+    data = suite.prepare(str(tmp_path), 'tiny')
+
+    run = suite.BENCHMARKS['paths.find'](data)
+
+    assert callable(run)
+    assert 'src.rocha.paths' in sys.modules
+
+def test_import(tmp_path):
+    """
+    Test the package import time measured in a new interpreter, just the import time.
+    """
+    data = suite.prepare(str(tmp_path), 'tiny')
+
+    measures = suite.measure('rocha.import', data)
+
+    assert 0 < measures['wall'] < 10
+    assert measures['rss'] is None
+    assert measures['read'] is None
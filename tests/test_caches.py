@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`caches` -- Tests persistent caches
+========================================
+
+.. module:: caches
+    :platform: Unix, Windows
+    :synopsis: Tests of the persistent cache of the raster results.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+"""
+import os
+import shutil
+
+from src.rocha import caches
+
+def test_disabled():
+    """
+    Test cache disabled without database.
+    """
+    raster = 'data/forest.tif'
+
+    with caches.connect(None) as connection:
+        caches.put(connection, raster, 'count', 1)
+        result = caches.get(connection, raster, 'count')
+
+    assert connection is None
+    assert result is None
+
+def test_put_get(tmp_path):
+    """
+    Test cached result by name, band and coordinate reference system.
+    """
+    database = str(tmp_path / 'cache.db')
+    raster = 'data/forest.tif'
+
+    with caches.connect(database) as connection:
+        caches.put(connection, raster, 'area', 0.25)
+        caches.put(connection, raster, 'area', 2970864583.066144, crs = 'EPSG:31983')
+
+    with caches.connect(database) as connection:
+        result = caches.get(connection, raster, 'area')
+        reprojected = caches.get(connection, raster, 'area', crs = 'EPSG:31983')
+        missing = caches.get(connection, raster, 'area', band = 1)
+
+    assert result == 0.25
+    assert reprojected == 2970864583.066144
+    assert missing is None
+
+def test_changed(tmp_path):
+    """
+    Test cached result invalidated by the raster changes.
+    """
+    database = str(tmp_path / 'cache.db')
+    raster = str(tmp_path / 'forest.tif')
+    shutil.copy('data/forest.tif', raster)
+
+    with caches.connect(database) as connection:
+        caches.put(connection, raster, 'count', 1)
+
+    status = os.stat(raster)
+    os.utime(raster, ns = (status.st_atime_ns, status.st_mtime_ns + 1000000000))
+
+    with caches.connect(database) as connection:
+        result = caches.get(connection, raster, 'count')
+
+    assert result is None
+
+def test_evict(tmp_path):
+    """
+    Test the least recently used entries evicted over the capacity.
+    """
+    database = str(tmp_path / 'cache.db')
+    rasters = ['data/relatives/forest_111.tif',
+               'data/relatives/forest_112.tif',
+               'data/relatives/forest_113.tif']
+
+    with caches.connect(database, capacity = 2) as connection:
+        for value, raster in enumerate(rasters):
+            caches.put(connection, raster, 'count', value)
+
+    with caches.connect(database) as connection:
+        results = [caches.get(connection, raster, 'count') for raster in rasters]
+
+    assert results == [None, 1, 2]
+
+def test_auxiliary():
+    """
+    Test raster statistics from the GDAL auxiliary file.
+    """
+    raster = 'data/forest.tif'
+    value_min = 0.23859654543018
+    value_max = 1.0
+
+    result = caches.auxiliary(raster)
+
+    assert result == (value_min, value_max)
+
+def test_auxiliary_missing():
+    """
+    Test raster without GDAL auxiliary file.
+    """
+    raster = 'data/geographic.tif'
+
+    result = caches.auxiliary(raster)
+
+    assert result is None
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`catalogs` -- Tests files discovery index
+==============================================
+
+.. module:: catalogs
+    :platform: Unix, Windows
+    :synopsis: Tests of the persistent index of the files, refreshed incrementally.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+"""
+import os
+import shutil
+
+import rasterio
+
+from src.rocha import paths
+from src.rocha import catalogs
+
+def test_find(tmp_path):
+    """
+    Test indexed files like pattern, the same files as the directory walk.
+    """
+    database = str(tmp_path / 'catalog.db')
+    path = 'data'
+    pattern = '*.tif'
+
+    with catalogs.connect(database) as connection:
+        results = list(catalogs.find(connection, path, pattern))
+        absolutes = list(catalogs.find(connection, path, pattern, relative = False))
+
+    assert results == sorted(paths.find(path, pattern))
+    assert absolutes == sorted(paths.find(path, pattern, relative = False))
+
+def test_refresh(tmp_path):
+    """
+    Test index refreshed with the files added and the directories removed.
+    """
+    database = str(tmp_path / 'catalog.db')
+    path = str(tmp_path / 'data')
+    pattern = '*.tif'
+    shutil.copytree('data/relatives', os.path.join(path, 'relatives'))
+
+    with catalogs.connect(database) as connection:
+        before = list(catalogs.find(connection, path, pattern))
+
+        os.makedirs(os.path.join(path, 'new'))
+        shutil.copy('data/forest.tif', os.path.join(path, 'new', 'forest.tif'))
+        shutil.rmtree(os.path.join(path, 'relatives'))
+
+        after = list(catalogs.find(connection, path, pattern))
+
+    assert len(before) > 0
+    assert after == [os.path.join(path, 'new', 'forest.tif')]
+
+def test_unchanged(tmp_path):
+    """
+    Test index without refresh, the directories aren't walked.
+    """
+    database = str(tmp_path / 'catalog.db')
+    path = str(tmp_path / 'data')
+    pattern = '*.tif'
+    shutil.copytree('data/relatives', path)
+
+    with catalogs.connect(database) as connection:
+        expected = list(catalogs.find(connection, path, pattern))
+
+    shutil.rmtree(path)
+
+    with catalogs.connect(database) as connection:
+        results = list(catalogs.find(connection, path, pattern, update = False))
+
+    assert results == expected
+
+def test_siblings(tmp_path):
+    """
+    Test the subtree of a directory, without the siblings different by case or wildcards.
+    """
+    database = str(tmp_path / 'catalog.db')
+    path = str(tmp_path / 'data')
+    names = ['a', 'A', 'a_b', 'axb', 'a%']
+
+    # Nested directories, inside the subtree patterns
+    for name in names:
+        os.makedirs(os.path.join(path, name, 'nested'))
+        shutil.copy('data/forest.tif', os.path.join(path, name, 'nested', 'forest.tif'))
+
+    with catalogs.connect(database) as connection:
+        list(catalogs.find(connection, path, '*.tif', relative = False))
+
+        for name in names:
+            results = list(catalogs.find(connection, os.path.join(path, name), '*.tif', relative = False))
+
+            assert results == [os.path.join(path, name, 'nested', 'forest.tif')]
+
+        # The removed directory is refreshed alone
+        shutil.rmtree(os.path.join(path, 'a'))
+        list(catalogs.find(connection, os.path.join(path, 'a'), '*.tif'))
+
+        results = list(catalogs.find(connection, path, '*.tif', relative = False, update = False))
+
+    assert results == sorted(os.path.join(path, name, 'nested', 'forest.tif') for name in names if name != 'a')
+
+def test_headers(tmp_path):
+    """
+    Test indexed raster headers and the spatial query by bounds.
+    """
+    database = str(tmp_path / 'catalog.db')
+    path = 'data'
+    pattern = ['*.tif', '*.shp']
+    raster = 'data/forest.tif'
+
+    with rasterio.open(raster) as source:
+        crs = source.crs.to_string()
+        dtype = source.dtypes[0]
+        bounds = tuple(source.bounds)
+
+    with catalogs.connect(database) as connection:
+        entries = {entry.path: entry for entry in catalogs.search(connection, path, pattern, headers = '*.tif')}
+        outside = list(catalogs.find(connection, path, '*.tif', bounds = (0, 0, 1, 1), update = False))
+
+    assert entries[raster].crs == crs
+    assert entries[raster].dtype == dtype
+    assert entries[raster].bounds == bounds
+    assert entries['data/output/region_south.shp'].bounds is None
+    assert raster not in outside
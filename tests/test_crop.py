@@ -8,9 +8,13 @@
     :synopsis: Tests of the crop the raster datasets for vector geometries.
 .. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
 """
+import os
+import asyncio
+import pytest
 import affine
 import fiona
 import rasterio
+import numpy as np
 
 from src.rocha import crop
 
@@ -84,6 +88,85 @@ def test_mask():
     assert result.all() == data.all()
     assert profile == metadata
 
+def test_bounds():
+    """
+    Test vector geometries bounding box index.
+    """
+    vector = "data/regions.shp"
+
+    geometries = [geometry for geometry in crop.geometries(vector)]
+    index = crop.bounds(geometries)
+
+    for geometry, bounds in zip(geometries, index):
+        if geometry["type"] == "Polygon":
+            polygons = [geometry["coordinates"]]
+        else:
+            polygons = geometry["coordinates"]
+
+        coordinates = np.array([point for polygon in polygons for ring in polygon for point in ring])
+        expected = [*coordinates.min(axis = 0), *coordinates.max(axis = 0)]
+
+        np.testing.assert_allclose(bounds, expected)
+
+def test_intersects():
+    """
+    Test features indexes intersecting the bounds.
+    """
+    vector = "data/regions.shp"
+    bounds = (-50.0, -20.0, -40.0, -10.0)
+
+    # Mid-west, northeast and southeast
+    features = [0, 1, 2]
+
+    geometries = crop.geometries(vector)
+    index = crop.bounds(geometries)
+
+    results = crop.intersects(index, bounds)
+
+    assert list(results) == features
+
+def test_window():
+    """
+    Test raster window for each vector feature boundary.
+    """
+    vector = "data/regions.shp"
+    raster = "data/forest.tif"
+    subrasters = ["data/output/forest_mid-west.tif",
+                  "data/output/forest_northeast.tif",
+                  "data/output/forest_southeast.tif",
+                  "data/output/forest_south.tif"]
+
+    geometries = crop.geometries(vector)
+
+    with rasterio.open(raster) as source:
+        results = [crop.window([geometry], source) for geometry in geometries]
+
+    for subraster, (shape_mask, transform, region) in zip(subrasters, results):
+        with rasterio.open(subraster) as source:
+            shape = (source.height, source.width)
+
+        assert shape_mask.shape == shape
+        assert (region.height, region.width) == shape
+
+def test_extract():
+    """
+    Test crop an opened raster for each vector feature boundary, equals to the raster filename crop.
+    """
+    vector = "data/regions.shp"
+    raster = "data/forest.tif"
+
+    geometries = [geometry for geometry in crop.geometries(vector)]
+
+    with rasterio.open(raster) as source:
+        results = [crop.extract([geometry], source) for geometry in geometries]
+
+    for geometry, (result, profile) in zip(geometries, results):
+        data, metadata = crop.mask([geometry], raster)
+
+        assert (result.mask == data.mask).all()
+        assert (result == data).all()
+        assert profile == metadata
+
 def test_crop_global():
     """
     Test crop raster for vector extern boundary.
@@ -175,4 +258,360 @@ def test_multiples():
 
         assert result.all() == data.all()
         assert profile == metadata
-        assert filename == subraster
\ No newline at end of file
+        assert filename == subraster
+
+def test_multiples_workers():
+    """
+    Test the multiples crops in parallel, equals to the sequential crops.
+    """
+    input_path = 'data/relatives'
+    output_path = 'data/output'
+    pattern = '*.tif'
+    vector = 'data/regions.shp'
+    driver = 'GTiff'
+    column = 'REGION'
+
+    expected = crop.multiples(vector, column, pattern, input_path, output_path, driver)
+    results = crop.multiples(vector, column, pattern, input_path, output_path, driver, workers = 2)
+
+    for (data, metadata, subraster), (result, profile, filename) in zip(expected, results):
+        assert (result.mask == data.mask).all()
+        assert (result == data).all()
+        assert profile == metadata
+        assert filename == subraster
+
+def test_multiples_unordered():
+    """
+    Test the multiples crops in parallel as soon as completed.
+    """
+    input_path = 'data/relatives'
+    output_path = 'data/output'
+    pattern = '*.tif'
+    vector = 'data/regions.shp'
+    driver = 'GTiff'
+    column = 'REGION'
+
+    expected = crop.multiples(vector, column, pattern, input_path, output_path, driver)
+    results = crop.multiples(vector, column, pattern, input_path, output_path, driver, workers = 2, ordered = False)
+
+    filenames = sorted(filename for _, _, filename in expected)
+    results = sorted(filename for _, _, filename in results)
+
+    assert results == filenames
+
+def test_export(tmp_path):
+    """
+    Test the multiples crops saved to the output files.
+    """
+    input_path = 'data/relatives'
+    output_path = str(tmp_path)
+    pattern = '*.tif'
+    vector = 'data/regions.shp'
+    driver = 'GTiff'
+    column = 'REGION'
+
+    filenames = crop.export(vector, column, pattern, input_path, output_path, driver)
+    results = crop.multiples(vector, column, pattern, input_path, output_path, driver)
+
+    for result, profile, filename in results:
+        with rasterio.open(filename) as source:
+            data = source.read(masked = True)
+
+        assert filename in filenames
+        assert (result.mask == data.mask).all()
+        assert (result == data).all()
+
+def test_export_tiled(tmp_path):
+    """
+    Test the multiples crops saved as tiled and compressed files.
+    """
+    input_path = 'data/relatives'
+    output_path = str(tmp_path)
+    pattern = '*.tif'
+    vector = 'data/regions.shp'
+    driver = 'GTiff'
+    column = 'REGION'
+
+    filenames = crop.export(vector, column, pattern, input_path, output_path, driver,
+                            workers = 2, creation = crop.TILED)
+
+    for filename in filenames:
+        with rasterio.open(filename) as source:
+            profile = source.profile
+
+        assert profile['tiled']
+        assert profile['compress'] == 'deflate'
+
+def test_multiples_skipped():
+    """
+    Test the multiples crops skipping the features outside the raster.
+    """
+    input_path = 'data'
+    output_path = 'data/output'
+    pattern = 'hotspots_projected.tif'
+    vector = 'data/regions.shp'
+    driver = 'GTiff'
+    column = 'REGION'
+
+    raster = 'data/hotspots_projected.tif'
+    subrasters = ["data/output/hotspots_projected_mid-west.tif",
+                  "data/output/hotspots_projected_northeast.tif",
+                  "data/output/hotspots_projected_southeast.tif",
+                  "data/output/hotspots_projected_south.tif"]
+
+    skipped = []
+    results = crop.multiples(vector, column, pattern, input_path, output_path, driver, skipped = skipped)
+
+    assert list(results) == []
+    assert skipped == [(raster, subraster) for subraster in subrasters]
+
+def test_export_manifest(tmp_path):
+    """
+    Test the multiples crops resumed by the completion manifest.
+    """
+    input_path = 'data/relatives'
+    output_path = str(tmp_path / 'output')
+    manifest = str(tmp_path / 'manifest.jsonl')
+    pattern = '*.tif'
+    vector = 'data/regions.shp'
+    driver = 'GTiff'
+    column = 'REGION'
+
+    filenames = crop.export(vector, column, pattern, input_path, output_path, driver, manifest = manifest)
+
+    # Remove an output, just this is cropped again
+    os.remove(filenames[0])
+
+    results = crop.export(vector, column, pattern, input_path, output_path, driver, manifest = manifest)
+
+    assert len(filenames) == 48
+    assert results == filenames[:1]
+
+def test_multiples_catalog(tmp_path):
+    """
+    Test the multiples crops with the rasters from the files discovery index.
+    """
+    input_path = 'data/relatives'
+    output_path = 'data/output'
+    catalog = str(tmp_path / 'catalog.db')
+    pattern = 'forest_1*.tif'
+    vector = 'data/regions.shp'
+    driver = 'GTiff'
+    column = 'REGION'
+
+    expected = crop.multiples(vector, column, pattern, input_path, output_path, driver)
+    results = crop.multiples(vector, column, pattern, input_path, output_path, driver, catalog = catalog)
+
+    expected = {output_file: data for data, _, output_file in expected}
+    results = {output_file: data for data, _, output_file in results}
+
+    assert sorted(results) == sorted(expected)
+
+    for output_file, data in results.items():
+        assert (data == expected[output_file]).all()
+
+def test_multiples_catalog_skipped(tmp_path):
+    """
+    Test the multiples crops skipping the features outside the indexed raster bounds.
+    """
+    input_path = 'data'
+    output_path = 'data/output'
+    catalog = str(tmp_path / 'catalog.db')
+    pattern = 'hotspots_projected.tif'
+    vector = 'data/regions.shp'
+    driver = 'GTiff'
+    column = 'REGION'
+
+    skipped = []
+    results = crop.multiples(vector, column, pattern, input_path, output_path, driver,
+                             skipped = skipped, catalog = catalog)
+
+    assert list(results) == []
+    assert len(skipped) == 4
+
+def test_features():
+    """
+    Test vector geometries and columns read once, the same as geometries and properties.
+    """
+    vector = 'data/regions.shp'
+    column = 'REGION'
+
+    geoms, columns = crop.features(vector, [column])
+
+    assert geoms == list(crop.geometries(vector))
+    assert list(columns) == [column]
+    assert list(columns[column]) == [values[column] for values in crop.properties(vector)]
+
+def test_features_filter():
+    """
+    Test vector features filtered by attribute and by bounding box.
+    """
+    vector = 'data/regions.shp'
+    column = 'REGION'
+
+    _, selected = crop.features(vector, [column], where = "REGION = 'south'")
+    geoms, _ = crop.features(vector, [column], bbox = (-50, -30, -49, -29))
+
+    assert [value.lower() for value in selected[column]] == ['south']
+    assert len(geoms) == 1
+
+def test_features_invalid_column():
+    """
+    Test vector columns with an invalid column name.
+    """
+    vector = 'data/regions.shp'
+
+    with pytest.raises(ValueError, match = '.*column.*'):
+        crop.features(vector, ['Region'])
+
+def test_masked():
+    """
+    Test the feature mask reused by the rasters with the same grid, the same crop as without reuse.
+    """
+    rasters = ['data/relatives/forest_111.tif', 'data/relatives/forest_112.tif']
+    geometries = list(crop.geometries('data/regions.shp'))[:1]
+    key = ('regions', 0)
+    cache = crop.Masks()
+
+    for raster in rasters:
+        with rasterio.open(raster) as source:
+            expected, _ = crop.extract(geometries, source)
+            result, _ = crop.extract(geometries, source, key = key, cache = cache)
+            grid = crop.signature(source)
+
+        assert (result.mask == expected.mask).all()
+        assert (result == expected).all()
+
+    assert (key, grid) in cache
+    assert len(cache) == 1
+
+def test_masks_capacity():
+    """
+    Test the feature masks evicted over the capacity, the least recently used first.
+    """
+    geometries = list(crop.geometries('data/regions.shp'))[:2]
+
+    with rasterio.open('data/relatives/forest_111.tif') as source:
+        first = crop.window(geometries[:1], source)
+        second = crop.window(geometries[1:], source)
+
+    cache = crop.Masks(max(first[0].nbytes, second[0].nbytes))
+    cache.put('first', first)
+    cache.put('second', second)
+
+    assert 'first' not in cache
+    assert cache.get('second') is second
+    assert cache.size == second[0].nbytes
+
+    cache = crop.Masks(0)
+    cache.put('first', first)
+
+    assert len(cache) == 0
+
+def test_multiples_masks(tmp_path):
+    """
+    Test the multiples crops with the features masks persisted.
+    """
+    input_path = 'data/relatives'
+    output_path = 'data/output'
+    masks = str(tmp_path / 'masks')
+    pattern = 'forest_1*.tif'
+    vector = 'data/regions.shp'
+    driver = 'GTiff'
+    column = 'REGION'
+
+    expected = crop.multiples(vector, column, pattern, input_path, output_path, driver)
+    expected = {output_file: data for data, _, output_file in expected}
+
+    for _ in range(2):
+        results = crop.multiples(vector, column, pattern, input_path, output_path, driver, masks = masks)
+        results = {output_file: data for data, _, output_file in results}
+
+        assert sorted(results) == sorted(expected)
+        assert len(os.listdir(masks)) > 0
+
+        for output_file, data in results.items():
+            assert (data.mask == expected[output_file].mask).all()
+            assert (data == expected[output_file]).all()
+
+def test_cog():
+    """
+    Test cloud optimized GeoTIFF creation options by data type.
+    """
+    assert crop.cog('uint8')['blockxsize'] == 512
+    assert crop.cog('int16')['predictor'] == 2
+    assert crop.cog('float64')['predictor'] == 3
+    assert crop.cog('float32', compress = 'zstd')['compress'] == 'zstd'
+
+def test_overviews():
+    """
+    Test overviews decimation factors, until the overview fits in a block.
+    """
+    assert crop.overviews(1500, 1200) == [2, 4, 8]
+    assert crop.overviews(200, 100) == []
+
+def test_save_optimized(tmp_path):
+    """
+    Test the raster saved as cloud optimized GeoTIFF, with internal overviews.
+    """
+    output_file = str(tmp_path / 'optimized.tif')
+    profile = {'driver': 'GTiff',
+               'height': 600,
+               'width': 300,
+               'count': 1,
+               'dtype': 'int16',
+               'crs': 'EPSG:4674',
+               'transform': affine.Affine(0.01, 0.0, -50.0, 0.0, -0.01, -10.0),
+               'nodata': -1}
+    values = np.arange(600 * 300, dtype = 'int16').reshape(1, 600, 300) % 100 - 1
+    data = np.ma.masked_equal(values, -1)
+
+    crop.save(data, profile, output_file, optimized = True)
+
+    with rasterio.open(output_file) as source:
+        result = source.read(masked = True)
+        structure = source.tags(ns = 'IMAGE_STRUCTURE')
+
+        assert source.block_shapes == [(256, 256)]
+        assert source.overviews(1) == [2, 4]
+
+    assert structure['LAYOUT'] == 'COG'
+    assert structure['COMPRESSION'] == 'DEFLATE'
+    assert (result.mask == data.mask).all()
+    assert (result == data).all()
+
+def test_save_optimized_driver(tmp_path):
+    """
+    Test the cloud optimized layout with another driver.
+    """
+    output_file = str(tmp_path / 'optimized.asc')
+
+    with rasterio.open('data/forest.tif') as source:
+        data = source.read(masked = True)
+        profile = dict(source.profile, driver = 'AAIGrid')
+
+    with pytest.raises(ValueError, match = '.*GeoTIFF.*'):
+        crop.save(data, profile, output_file, optimized = True)
+
+def test_amultiples():
+    """
+    Test the multiples crops asynchronously, the same crops in the same order.
+    """
+    input_path = 'data/relatives'
+    output_path = 'data/output'
+    pattern = 'forest_1*.tif'
+    vector = 'data/regions.shp'
+    driver = 'GTiff'
+    column = 'REGION'
+
+    async def collect():
+        return [(data, output_file) async for data, _, output_file in
+                crop.amultiples(vector, column, pattern, input_path, output_path, driver)]
+
+    results = asyncio.run(collect())
+    expected = list(crop.multiples(vector, column, pattern, input_path, output_path, driver))
+
+    assert [output_file for _, output_file in results] == [output_file for _, _, output_file in expected]
+
+    for (data, _), (other, _, _) in zip(results, expected):
+        assert (data == other).all()
@@ -24,6 +24,14 @@ def test_valid_driver():
 
     assert result is not None
 
+def test_valid_driver_case():
+    """
+    Test valid driver code, case insensitive like GDAL.
+    """
+    result = drivers.validate('gtiff')
+
+    assert result.code == 'GTiff'
+
 def test_invalid_driver():
     """
     Test invalid driver.
@@ -97,3 +105,28 @@ def test_valid_extension_list():
     results = drivers.extension(code, main = False)
 
     assert extension in results
+
+def test_registry_cached():
+    """
+    Test drivers registry is built once and is read only.
+    """
+    registry = drivers.registry()
+
+    assert drivers.registry() is registry
+
+    with pytest.raises(TypeError):
+        registry['GTiff'] = None
+
+def test_capabilities():
+    """
+    Test driver capabilities from the registry.
+    """
+    code = 'GTiff'
+
+    result = drivers.validate(code)
+
+    assert result.raster
+    assert result.create
+    assert result.createcopy
+    assert 'TILED' in result.options
+    assert 'DEFLATE' in result.compressions
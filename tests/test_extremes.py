@@ -8,11 +8,15 @@
     :synopsis: Tests of the raster extremes.
 .. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
 """
+import os
+import shutil
+import asyncio
 import rasterio
 import numpy as np
 import numpy.ma as ma
 
 from src.rocha import paths
+from src.rocha import caches
 from src.rocha import extremes
 
 def test_hotspot():
@@ -34,6 +38,102 @@ def test_hotspot():
 
     assert result.all() == data.all()
 
+def test_hotspot_copy():
+    """
+    Test hotspot of raster dataset keeps the raster data.
+    """
+    raster = 'data/atlantic_forest.tif'
+    threshold = 0.6996560782009352
+
+    with rasterio.open(raster) as source:
+        dataset = source.read(masked = True)
+        nodata = source.nodata
+
+    expected = dataset.copy()
+
+    extremes.hotspots(dataset, '>', threshold, nodata)
+
+    assert (dataset.data == expected.data).all()
+    assert (dataset.mask == expected.mask).all()
+
+def test_hotspot_out():
+    """
+    Test hotspot of raster dataset to an output array, equals to the in place hotspot.
+    """
+    raster = 'data/atlantic_forest.tif'
+    threshold = 0.6996560782009352
+
+    with rasterio.open(raster) as source:
+        dataset = source.read(masked = True)
+        nodata = source.nodata
+
+    out = ma.empty_like(dataset)
+
+    result = extremes.hotspots(dataset, '>', threshold, nodata, out = out)
+    expected = extremes.hotspots(dataset, '>', threshold, nodata, copy = False)
+
+    assert (result.data == expected.data).all()
+    assert (result.mask == expected.mask).all()
+    assert (out.data == expected.data).all()
+
+def test_hotspot_out_plain():
+    """
+    Test hotspot of raster dataset to a plain output array, filled with the hotspot raster data.
+    """
+    raster = 'data/atlantic_forest.tif'
+    threshold = 0.6996560782009352
+
+    with rasterio.open(raster) as source:
+        dataset = source.read(masked = True)
+        nodata = source.nodata
+
+    out = np.empty(dataset.shape, dtype = dataset.dtype)
+
+    result = extremes.hotspots(dataset, '>', threshold, nodata, out = out)
+    expected = extremes.hotspots(dataset, '>', threshold, nodata)
+
+    assert (result.mask == expected.mask).all()
+    assert (out == expected.data).all()
+
+def test_classify():
+    """
+    Test hotspots levels for multiples thresholds, equals to the hotspot for each threshold.
+    """
+    raster = 'data/atlantic_forest.tif'
+    thresholds = [0.8, 0.4, 0.6996560782009352]
+
+    with rasterio.open(raster) as source:
+        dataset = source.read(1, masked = True)
+        nodata = source.nodata
+
+    levels = extremes.classify(dataset, thresholds, '>')
+
+    for index, threshold in enumerate(sorted(thresholds)):
+        expected = extremes.hotspots(dataset, '>', threshold, nodata)
+        result = ma.masked_where(levels <= index, levels)
+
+        assert (ma.getmaskarray(result) == ma.getmaskarray(expected)).all()
+
+def test_sweep():
+    """
+    Test hotspots quantities for multiples thresholds, from the raster file and the raster data.
+    """
+    raster = 'data/atlantic_forest.tif'
+    thresholds = [0.8, 0.4, 0.6996560782009352, 1.0]
+
+    with rasterio.open(raster) as source:
+        dataset = source.read(1, masked = True)
+        nodata = source.nodata
+
+    for relate in ['>', '>=', '<', '<=', '==', '!=']:
+        expected = [extremes.hotspots(dataset, relate, threshold, nodata).count() for threshold in thresholds]
+
+        results = extremes.sweep(raster, thresholds, relate)
+        arrays = extremes.sweep(dataset, thresholds, relate)
+
+        assert list(results) == expected
+        assert list(arrays) == expected
+
 def test_area_geographic():
     """
     Test area for geographic coordinate system as square degrees.
@@ -137,6 +237,52 @@ def test_total_reprojected():
 
     assert result == total
 
+def test_total_blocks():
+    """
+    Test total valid area counted by the raster blocks, equals to the full raster count.
+    """
+    raster = 'data/relatives/forest_111.tif'
+
+    with rasterio.open(raster) as source:
+        dataset = source.read(masked = True)
+
+    total = dataset.count() * extremes.area(raster)
+
+    result = extremes.total(raster)
+
+    assert result == total
+
+def test_total_dataset():
+    """
+    Test total valid area from an opened raster dataset, equals to the raster filename.
+    """
+    raster = 'data/hotspots_projected.tif'
+    total = 317882510388.0774
+
+    with rasterio.open(raster) as source:
+        result = extremes.total(source)
+        closed = source.closed
+
+    assert result == total
+    assert not closed
+
+def test_transform_memoized():
+    """
+    Test affine transformation memoized by the raster file and coordinate reference system.
+    """
+    raster = 'data/geographic.tif'
+
+    # Reproject SIRGAS 2000 Project 23S
+    crs = 'EPSG:31983'
+
+    with rasterio.open(raster) as source:
+        expected = extremes.transform(source, crs)
+
+    result = extremes.transform(raster, crs)
+
+    assert result == expected
+    assert extremes.transform(raster, crs) is result
+
 def test_limits():
     """
     Test rasters minimum and maximum values for each file.
@@ -193,4 +339,195 @@ def test_min_max():
     result_min, result_max = extremes.min_max(rasters)
 
     np.testing.assert_allclose(result_min, value_min)
-    np.testing.assert_allclose(result_max, value_max)
\ No newline at end of file
+    np.testing.assert_allclose(result_max, value_max)
+
+def test_statistics():
+    """
+    Test raster statistics by blocks, equals to the full raster statistics.
+    """
+    raster = 'data/relatives/forest_111.tif'
+
+    with rasterio.open(raster) as source:
+        dataset = source.read(1, masked = True)
+
+    result = extremes.statistics(raster)
+
+    assert result.minimum == np.min(dataset)
+    assert result.maximum == np.max(dataset)
+    assert result.count == dataset.count()
+    assert result.size == dataset.size
+    np.testing.assert_allclose(result.sum, np.sum(dataset))
+    np.testing.assert_allclose(result.mean, np.mean(dataset))
+    np.testing.assert_allclose(result.variance, np.var(dataset))
+
+def test_summary_workers():
+    """
+    Test rasters statistics read in parallel, equals to the sequential read.
+    """
+    path = 'data/relatives'
+    pattern = '*.tif'
+
+    rasters = sorted(paths.find(path, pattern))
+
+    expected = list(extremes.summary(rasters))
+    results = list(extremes.summary(rasters, workers = 4))
+
+    assert results == expected
+
+def test_reduce():
+    """
+    Test global statistics from all rasters, equals to the statistics of all values.
+    """
+    path = 'data/relatives'
+    pattern = '*.tif'
+
+    rasters = sorted(paths.find(path, pattern))
+
+    values = []
+
+    for raster in rasters:
+        with rasterio.open(raster) as source:
+            values.append(source.read(1, masked = True).compressed())
+
+    values = np.concatenate(values)
+
+    result = extremes.reduce(extremes.summary(rasters))
+
+    assert result.minimum == np.min(values)
+    assert result.maximum == np.max(values)
+    assert result.count == values.size
+    np.testing.assert_allclose(result.mean, np.mean(values))
+    np.testing.assert_allclose(result.variance, np.var(values))
+
+def test_summary_cache(tmp_path):
+    """
+    Test rasters statistics from the cache, equals to the rasters statistics.
+    """
+    database = str(tmp_path / 'cache.db')
+    path = 'data/relatives'
+    pattern = '*.tif'
+
+    rasters = sorted(paths.find(path, pattern))
+
+    expected = list(extremes.summary(rasters))
+    cached = list(extremes.summary(rasters, cache = database))
+    results = list(extremes.summary(rasters, workers = 4, cache = database))
+
+    assert cached == expected
+    assert results == expected
+
+def test_min_max_cache(tmp_path):
+    """
+    Test rasters minimum and maximum values for all files, from the cache.
+    """
+    database = str(tmp_path / 'cache.db')
+    value_min = -81.968584509983
+    value_max = 94.044943529601
+
+    path = 'data/relatives'
+    pattern = '*.tif'
+
+    rasters = list(paths.find(path, pattern))
+
+    extremes.min_max(rasters, cache = database)
+    result_min, result_max = extremes.min_max(rasters, cache = database)
+
+    np.testing.assert_allclose(result_min, value_min)
+    np.testing.assert_allclose(result_max, value_max)
+
+def test_limits_cache_exact(tmp_path):
+    """
+    Test rasters minimum and maximum values from the cache, exactly as without the cache.
+    """
+    database = str(tmp_path / 'cache.db')
+    rasters = ['data/forest.tif', 'data/atlantic_forest.tif']
+
+    expected = list(extremes.limits(rasters))
+
+    list(extremes.limits(rasters, cache = database))
+    result = list(extremes.limits(rasters, cache = database))
+
+    assert result == expected
+    assert [type(value) for values in result for value in values] == \
+           [type(value) for values in expected for value in values]
+    assert extremes.min_max(rasters, cache = database) == extremes.min_max(rasters)
+
+def test_total_cache_shared(tmp_path, monkeypatch):
+    """
+    Test the total area from the statistics cached by the minimum and maximum, without reading again.
+    """
+    database = str(tmp_path / 'cache.db')
+    raster = 'data/forest.tif'
+
+    expected = extremes.total(raster)
+
+    extremes.min_max([raster], cache = database)
+
+    def statistics(*arguments, **keywords):
+        raise AssertionError('Raster read again.')
+
+    monkeypatch.setattr(extremes, 'statistics', statistics)
+
+    assert extremes.total(raster, cache = database) == expected
+
+def test_min_max_cache_invalid(tmp_path):
+    """
+    Test rasters without valid values, masked extremes with and without the cache.
+    """
+    database = str(tmp_path / 'cache.db')
+    raster = str(tmp_path / 'invalid.tif')
+
+    with rasterio.open('data/forest.tif') as source:
+        profile = source.profile
+        data = np.full((source.count, source.height, source.width), source.nodata, dtype = source.dtypes[0])
+
+    with rasterio.open(raster, 'w', **profile) as destiny:
+        destiny.write(data)
+
+    expected = extremes.min_max([raster])
+
+    extremes.min_max([raster], cache = database)
+
+    assert expected == (ma.masked, ma.masked)
+    assert extremes.min_max([raster], cache = database) == expected
+    assert extremes.min_max([raster], auxiliary = True) == expected
+
+def test_limits_auxiliary(tmp_path):
+    """
+    Test rasters minimum and maximum values from the GDAL auxiliary files, just when requested.
+    """
+    database = str(tmp_path / 'cache.db')
+    raster = str(tmp_path / 'forest.tif')
+
+    # The auxiliary file newer than the raster
+    shutil.copy('data/forest.tif', raster)
+    shutil.copy('data/forest.tif.aux.xml', f'{raster}.aux.xml')
+    status = os.stat(raster)
+    os.utime(f'{raster}.aux.xml', ns = (status.st_atime_ns, status.st_mtime_ns + 10 ** 9))
+
+    auxiliary = caches.auxiliary(raster)
+    expected = list(extremes.limits([raster]))
+
+    assert auxiliary is not None
+    assert list(extremes.limits([raster], cache = database)) == expected
+    assert list(extremes.limits([raster], auxiliary = True)) == [auxiliary]
+
+def test_amin_max():
+    """
+    Test rasters global minimum and maximum values asynchronously, the same as synchronously.
+    """
+    rasters = ['data/relatives/forest_111.tif',
+               'data/relatives/forest_112.tif',
+               'data/relatives/forest_113.tif',
+               'data/hotspots_projected.tif']
+
+    async def collect():
+        individuals = [item async for item in extremes.alimits(rasters, concurrency = 2)]
+        result = await extremes.amin_max(rasters, concurrency = 2)
+
+        return individuals, result
+
+    individuals, result = asyncio.run(collect())
+
+    assert sorted(raster for raster, _, _ in individuals) == sorted(rasters)
+    assert result == extremes.min_max(rasters)
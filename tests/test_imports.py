@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`imports` -- Tests imports
+===============================
+
+.. module:: imports
+    :platform: Unix, Windows
+    :synopsis: Tests of the import budget and the lazy heavy dependencies.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+"""
+import sys
+import subprocess
+
+import pytest
+
+# Dependencies out of the import budget by module, the import time is the rocha.import benchmark
+BUDGET = {'src.rocha': ['numpy', 'rasterio', 'fiona', 'affine', 'src.rocha.paths'],
+          'src.rocha.paths': ['numpy', 'rasterio', 'fiona', 'affine']}
+
+HEAVY = ['matplotlib', 'mpl_toolkits', 'osgeo', 'fiona', 'rasterio.plot']
+
+def imported(module):
+    """
+    Modules imported with a module, in a new interpreter.
+
+    Parameters
+    ----------
+    module : str
+        Module name.
+
+    Returns
+    -------
+    imported : list of str
+        Modules in `sys.modules` after the import.
+    """
+    code = f'import sys, {module}; print(*sorted(sys.modules))'
+    process = subprocess.run([sys.executable, '-c', code],
+                             capture_output = True, text = True, check = True)
+
+    return process.stdout.split()
+
+@pytest.mark.parametrize('module', sorted(BUDGET))
+def test_import_budget(module):
+    """
+    Test the module imports are in the budget.
+    """
+    modules = imported(module)
+
+    assert not [name for name in BUDGET[module] if name in modules]
+
+@pytest.mark.parametrize('module', ['src.rocha', 'src.rocha.paths', 'src.rocha.drivers',
+                                    'src.rocha.crop', 'src.rocha.extremes', 'src.rocha.plots'])
+def test_lazy_heavy(module):
+    """
+    Test the heavy dependencies aren't imported with the module.
+    """
+    modules = imported(module)
+
+    assert not [name for name in HEAVY if name in modules]
+
+@pytest.mark.parametrize('module', ['src.rocha.crop', 'src.rocha.extremes'])
+def test_lazy_streams(module):
+    """
+    Test the asynchronous streams, and asyncio, aren't imported with the synchronous modules.
+    """
+    modules = imported(module)
+
+    assert 'src.rocha.streams' not in modules
+    assert 'asyncio' not in modules
+
+def test_lazy_submodule():
+    """
+    Test the package submodules are imported on the first access.
+    """
+    code = 'import sys, src.rocha as rocha; assert "src.rocha.crop" not in sys.modules; rocha.crop.bounds'
+    subprocess.run([sys.executable, '-c', code], check = True)
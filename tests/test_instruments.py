@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`instruments` -- Tests hot path instrumentation
+====================================================
+
+.. module:: instruments
+    :platform: Unix, Windows
+    :synopsis: Tests of the stages events, summaries and memory peaks.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+"""
+import numpy as np
+
+from src.rocha import crop
+from src.rocha import extremes
+from src.rocha import instruments
+
+def test_stage_disabled():
+    """
+    Test the stages without observers don't record events.
+    """
+    assert not instruments.enabled()
+
+    with instruments.stage('test.disabled') as fields:
+        fields.update(pixels = 10)
+        fields['nbytes'] = 80
+
+    assert instruments.stage('test.disabled') is instruments.stage('test.other')
+    assert dict(fields) == {}
+
+def test_observe():
+    """
+    Test the stages events and summary by stage, nested stages included.
+    """
+    with instruments.observe() as recorder:
+        assert instruments.enabled()
+
+        for _ in range(3):
+            with instruments.stage('test.outer', 'unit') as fields:
+                with instruments.stage('test.inner'):
+                    pass
+
+                fields.update(pixels = 100, nbytes = 400)
+
+    assert not instruments.enabled()
+    assert [event.stage for event in recorder.events] == ['test.inner', 'test.outer'] * 3
+    assert all(event.peak is None for event in recorder.events)
+
+    summary = recorder.summary()
+
+    assert list(summary) == ['test.inner', 'test.outer']
+    assert summary['test.outer'].count == 3
+    assert summary['test.outer'].pixels == 300
+    assert summary['test.outer'].nbytes == 1200
+    assert summary['test.outer'].total >= summary['test.inner'].total
+    assert 'test.outer' in recorder.report()
+
+def test_observe_memory():
+    """
+    Test the memory peaks by stage, the enclosing stage peak includes the nested stage.
+    """
+    with instruments.observe(memory = True) as recorder:
+        with instruments.stage('test.outer'):
+            with instruments.stage('test.inner'):
+                data = np.ones(1 << 20)
+
+            del data
+
+    inner, outer = recorder.events
+
+    assert inner.peak >= 8 * (1 << 20)
+    assert outer.peak >= inner.peak
+
+def test_observe_callback():
+    """
+    Test a callback observer, and the stages instrumented in the crop and extremes.
+    """
+    events = []
+    geometries = list(crop.geometries('data/regions.shp'))[:1]
+
+    with instruments.observe(events.append) as observer:
+        data, _ = crop.mask(geometries, 'data/forest.tif')
+        extremes.hotspots(data, '>', 0, -9999)
+
+    assert observer == events.append
+    assert [event.stage for event in events] == ['crop.open', 'crop.window', 'crop.read', 'crop.remask',
+                                                 'extremes.hotspots']
+
+    read = events[2]
+
+    assert read.unit == 'data/forest.tif'
+    assert read.pixels == data.size
+    assert read.nbytes == data.nbytes
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`manifests` -- Tests completion manifests
+==============================================
+
+.. module:: manifests
+    :platform: Unix, Windows
+    :synopsis: Tests of the finished output files records.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+"""
+import os
+import shutil
+import hashlib
+
+from src.rocha import manifests
+
+def test_checksum():
+    """
+    Test file content checksum.
+    """
+    filename = 'data/forest.tif'
+
+    with open(filename, 'rb') as source:
+        digest = hashlib.sha256(source.read()).hexdigest()
+
+    result = manifests.checksum(filename, size = 1024)
+
+    assert result == digest
+
+def test_sources_vector():
+    """
+    Test vector fingerprint with the sidecar files.
+    """
+    raster = 'data/forest.tif'
+    vector = 'data/regions.shp'
+    driver = 'GTiff'
+    files = ['data/regions.cpg',
+             'data/regions.dbf',
+             'data/regions.prj',
+             'data/regions.qpj',
+             'data/regions.shp',
+             'data/regions.shx']
+
+    result = manifests.sources(raster, vector, driver)
+
+    assert result['raster'][0] == raster
+    assert [file for file, _, _ in result['vector']] == files
+    assert result['driver'] == driver
+
+def test_sources_unrelated(tmp_path):
+    """
+    Test vector fingerprint without the unrelated files with the same name.
+    """
+    vector = str(tmp_path / 'regions.shp')
+
+    for extension in ['shp', 'shx', 'dbf', 'prj', 'shp.bak', 'json', 'gpkg-wal', 'manifest.json']:
+        open(str(tmp_path / f'regions.{extension}'), 'w').close()
+
+    result = manifests.sources('data/forest.tif', vector, 'GTiff')
+
+    assert [os.path.basename(file) for file, _, _ in result['vector']] == ['regions.dbf', 'regions.prj',
+                                                                           'regions.shp', 'regions.shx']
+
+def test_load_missing(tmp_path):
+    """
+    Test load a manifest file that doesn't exist.
+    """
+    manifest = str(tmp_path / 'manifest.jsonl')
+
+    result = manifests.load(manifest)
+
+    assert result == {}
+
+def test_record(tmp_path):
+    """
+    Test record and load an output file.
+    """
+    manifest = str(tmp_path / 'manifest.jsonl')
+    output_file = str(tmp_path / 'forest.tif')
+    shutil.copy('data/forest.tif', output_file)
+
+    sources = manifests.sources('data/forest.tif', 'data/regions.shp', 'GTiff')
+    entry = manifests.record(manifest, output_file, sources)
+
+    records = manifests.load(manifest)
+
+    assert records == {output_file: entry}
+    assert manifests.current(records, output_file, sources)
+    assert manifests.current(records, output_file, sources, verify = True)
+
+def test_current_changed(tmp_path):
+    """
+    Test output file not current, after the output or the sources changes.
+    """
+    manifest = str(tmp_path / 'manifest.jsonl')
+    output_file = str(tmp_path / 'forest.tif')
+    shutil.copy('data/forest.tif', output_file)
+
+    sources = manifests.sources('data/forest.tif', 'data/regions.shp', 'GTiff')
+    manifests.record(manifest, output_file, sources)
+    records = manifests.load(manifest)
+
+    changed = manifests.sources('data/forest.tif', 'data/regions.shp', 'AAIGrid')
+    assert not manifests.current(records, output_file, changed)
+
+    with open(output_file, 'ab') as destiny:
+        destiny.write(b'\0')
+
+    assert not manifests.current(records, output_file, sources)
+    assert not manifests.current(records, output_file, sources, verify = True)
+
+    os.remove(output_file)
+    assert not manifests.current(records, output_file, sources)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`memmaps` -- Tests decoded rasters cache
+=============================================
+
+.. module:: memmaps
+    :platform: Unix, Windows
+    :synopsis: Tests of the raster bands decoded to memory mapped files.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+"""
+import os
+import glob
+import shutil
+
+import pytest
+import numpy as np
+import rasterio
+
+from src.rocha import memmaps
+from src.rocha import extremes
+
+def test_read(tmp_path):
+    """
+    Test the decoded band equals the raster band, backed by memory mapped files.
+    """
+    raster = 'data/forest.tif'
+    directory = str(tmp_path / 'decoded')
+
+    data, profile = memmaps.read(raster, directory = directory)
+
+    with rasterio.open(raster) as source:
+        expected = source.read(1, masked = True)
+
+        assert profile['transform'] == source.transform
+        assert profile['crs'] == source.crs
+        assert profile['nodata'] == source.nodata
+
+    assert isinstance(data.data, np.memmap)
+    assert not data.data.flags.writeable
+    assert (data.mask == expected.mask).all()
+    assert (data == expected).all()
+
+def test_read_reused(tmp_path):
+    """
+    Test the decoded band reused while the raster is unchanged, and decoded again after changes.
+    """
+    raster = str(tmp_path / 'forest.tif')
+    directory = str(tmp_path / 'decoded')
+    shutil.copy('data/forest.tif', raster)
+
+    memmaps.read(raster, directory = directory)
+    decoded, = glob.glob(os.path.join(directory, '*[0-9a-f].npy'))
+    before = os.stat(decoded).st_mtime_ns
+
+    memmaps.read(raster, directory = directory)
+
+    assert os.stat(decoded).st_mtime_ns == before
+
+    status = os.stat(raster)
+    os.utime(raster, ns = (status.st_atime_ns, status.st_mtime_ns + 10 ** 9))
+
+    memmaps.read(raster, directory = directory)
+
+    assert os.stat(decoded).st_mtime_ns != before
+
+def test_evict(tmp_path):
+    """
+    Test the least recently used entries evicted over the capacity, the new entry kept.
+    """
+    directory = str(tmp_path / 'decoded')
+    rasters = ['data/forest.tif', 'data/atlantic_forest.tif']
+
+    memmaps.read(rasters[0], directory = directory)
+    memmaps.read(rasters[1], directory = directory, capacity = 0)
+
+    assert len(glob.glob(os.path.join(directory, '*.json'))) == 1
+    assert memmaps.evict(directory, 0) == 1
+    assert os.listdir(directory) == []
+
+def test_read_directory():
+    """
+    Test the decoded rasters cache without directory.
+    """
+    with pytest.raises(ValueError):
+        memmaps.read('data/forest.tif')
+
+def test_extremes_decoded(tmp_path):
+    """
+    Test the statistics and total area from the decoded bands, the same as from the raster.
+    """
+    raster = 'data/forest.tif'
+    directory = str(tmp_path / 'decoded')
+
+    expected = extremes.statistics(raster)
+    result = extremes.statistics(raster, decoded = directory)
+
+    assert result.count == expected.count
+    assert result.minimum == expected.minimum
+    assert result.maximum == expected.maximum
+    assert result.sum == pytest.approx(expected.sum)
+    assert extremes.total(raster, decoded = directory) == extremes.total(raster)
@@ -9,6 +9,7 @@
 .. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
 """
 import os
+import asyncio
 from src.rocha import paths
 
 def test_full_path():
@@ -158,4 +159,99 @@ def test_output_same_extension():
 
     result = paths.output(input_file, input_path, output_path, change = False, output_extension = extension)
 
-    assert result == output_file
\ No newline at end of file
+    assert result == output_file
+
+def test_fingerprint():
+    """
+    Test file fingerprint from the size and modification time.
+    """
+    filename = 'data/forest.tif'
+    status = os.stat(filename)
+
+    result = paths.fingerprint(filename)
+
+    assert result == (status.st_size, status.st_mtime_ns)
+
+
+def test_find_walk_order():
+    """
+    Test find files in the same order as the directory walk.
+    """
+    path = 'data'
+    pattern = '*.tif'
+    filenames = [os.sep.join([root, name]) for (root, _, files) in os.walk(path)
+                 for name in files if name.endswith('.tif')]
+
+    results = paths.find(path, pattern)
+
+    assert list(results) == filenames
+
+def test_find_patterns():
+    """
+    Test find files from multiples include and exclude patterns.
+    """
+    path = 'data'
+    pattern = ['*region*.shp', 'forest_1*.tif']
+    exclude = ['*_south*', 'regions.*']
+    filenames = ['data/output/region_mid-west.shp',
+                 'data/output/region_northeast.shp',
+                 'data/relatives/forest_111.tif',
+                 'data/relatives/forest_112.tif',
+                 'data/relatives/forest_113.tif',
+                 'data/relatives/forest_121.tif',
+                 'data/relatives/forest_122.tif',
+                 'data/relatives/forest_123.tif']
+
+    results = paths.find(path, pattern, exclude = exclude)
+
+    assert sorted(results) == filenames
+
+def test_find_depth():
+    """
+    Test find files only in the root directory.
+    """
+    path = 'data'
+    pattern = '*.tif'
+    filenames = sorted(os.sep.join([path, name]) for name in os.listdir(path) if name.endswith('.tif'))
+
+    results = paths.find(path, pattern, depth = 0)
+
+    assert sorted(results) == filenames
+
+def test_find_prune():
+    """
+    Test find files without the pruned directories.
+    """
+    path = 'data'
+    pattern = '*.tif'
+
+    results = list(paths.find(path, pattern, prune = ['output', 'relatives']))
+
+    assert len(results) > 0
+    assert all(os.path.dirname(name) == path for name in results)
+
+def test_find_workers():
+    """
+    Test find files walking the subtrees by threads.
+    """
+    path = 'data'
+    pattern = '*.tif'
+
+    expected = paths.find(path, pattern, relative = False)
+    results = paths.find(path, pattern, relative = False, workers = 4)
+
+    assert sorted(results) == sorted(expected)
+
+def test_afind():
+    """
+    Test find files asynchronously, the same files in the same order.
+    """
+    path = 'data'
+    pattern = '*.tif'
+
+    async def collect():
+        return [name async for name in paths.afind(path, pattern, chunk = 4)]
+
+    results = asyncio.run(collect())
+
+    assert results == list(paths.find(path, pattern))
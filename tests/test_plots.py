@@ -9,6 +9,9 @@
 .. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
 """
 
+import pytest
+import rasterio
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.testing.decorators import image_comparison
 
@@ -42,4 +45,109 @@ def test_plot():
     rows = 3
     cols = 4
 
-    plots.maps(rasters, rows, cols, color, title, subtitles, labels)
\ No newline at end of file
+    plots.maps(rasters, rows, cols, color, title, subtitles, labels)
+
+def test_resolution():
+    """
+    Test raster shape to fill the axis pixels, without upsampling.
+    """
+    figure, axes = plt.subplots(2, 2, figsize = (12, 12))
+
+    with rasterio.open('data/atlantic_forest.tif') as source:
+        small = plots.resolution(figure, axes[0, 0], source)
+
+    figure, axes = plt.subplots(1, 1, figsize = (0.5, 0.5))
+
+    with rasterio.open('data/atlantic_forest.tif') as source:
+        shape = source.shape
+        decimated = plots.resolution(figure, axes, source)
+
+    plt.close('all')
+
+    assert small == shape
+    assert decimated[0] < shape[0] and decimated[1] < shape[1]
+
+def test_decimate():
+    """
+    Test raster data decimated, with the same bounds.
+    """
+    with rasterio.open('data/atlantic_forest.tif') as source:
+        height, width = source.shape
+        shape = (height // 2, width // 2)
+        bounds = source.bounds
+
+        data, transform = plots.decimate(source, 1, shape)
+
+    assert data.shape == shape
+    assert transform * (0, 0) == (bounds.left, bounds.top)
+    assert transform * (shape[1], shape[0]) == pytest.approx((bounds.right, bounds.bottom))
+
+def test_stride():
+    """
+    Test raster data decimated by strides, as a view with the origin kept.
+    """
+    with rasterio.open('data/atlantic_forest.tif') as source:
+        data = source.read(1, masked = True)
+        transform = source.transform
+
+    height, width = data.shape
+    result, decimated = plots.stride(data, transform, (height // 2, width // 2))
+
+    assert np.shares_memory(result.data, data.data)
+    assert result.shape[0] <= height // 2 + 1 and result.shape[1] <= width // 2 + 1
+    assert (result == data[::2, ::2]).all()
+    assert decimated * (0, 0) == transform * (0, 0)
+    assert decimated * (1, 1) == transform * (2, 2)
+
+def test_limits():
+    """
+    Test global minimum and maximum values, without the masked arrays.
+    """
+    datasets = [np.ma.masked_array([1.0, 5.0, 9.0], mask = [False, False, True]),
+                np.ma.masked_array([3.0, -2.0], mask = [False, False]),
+                np.ma.masked_array([7.0], mask = [True])]
+
+    result = plots.limits(datasets)
+
+    assert result == (-2.0, 5.0)
+
+def test_maps_single_read():
+    """
+    Test the rasters maps, with the color scale from the data read once.
+    """
+    rasters = ['data/relatives/forest_111.tif',
+               'data/relatives/forest_112.tif',
+               'data/relatives/forest_121.tif',
+               'data/relatives/forest_122.tif']
+
+    figure = plots.maps(rasters, 2, 2, 'Forest', ['1', '2'], ['1', '2'], 'viridis', 'last', workers = 2)
+
+    with rasterio.open(rasters[0]) as source:
+        expected = source.read(1, masked = True)
+
+    datasets = [plots.load(figure, raster, axis) for raster, axis in zip(rasters, figure.axes)]
+    value_min, value_max = plots.limits(data for data, _ in datasets)
+    images = [axis.images[0] for axis in figure.axes[:4]]
+
+    plt.close(figure)
+
+    assert (images[0].get_array() == expected).all()
+    assert images[0].norm.vmin == value_min
+    assert images[0].norm.vmax == value_max
+
+def test_maps_invalid(tmp_path):
+    """
+    Test the rasters maps without valid values.
+    """
+    raster = str(tmp_path / 'invalid.tif')
+
+    with rasterio.open('data/relatives/forest_111.tif') as source:
+        profile = source.profile
+        profile.update({'nodata': -9999})
+        data = np.full((source.count, source.height, source.width), -9999, dtype = source.dtypes[0])
+
+    with rasterio.open(raster, 'w', **profile) as destiny:
+        destiny.write(data)
+
+    with pytest.raises(ValueError, match = 'without valid values'):
+        plots.maps([raster], 2, 2, 'Forest', ['1', '2'], ['1', '2'], 'viridis', 'last')
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`streams` -- Tests asynchronous streams
+============================================
+
+.. module:: streams
+    :platform: Unix, Windows
+    :synopsis: Tests of the blocking work run from asyncio.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+"""
+import asyncio
+import threading
+
+import pytest
+
+from src.rocha import streams
+
+def test_iterate():
+    """
+    Test asynchronous iteration of a blocking generator, by chunks.
+    """
+    async def collect():
+        return [item async for item in streams.iterate(range(10), chunk = 3)]
+
+    results = asyncio.run(collect())
+
+    assert results == list(range(10))
+
+def test_iterate_backpressure():
+    """
+    Test the blocking generator isn't advanced beyond the prefetched item, and is closed.
+    """
+    produced = []
+    closed = threading.Event()
+
+    def generator():
+        try:
+            for item in range(100):
+                produced.append(item)
+                yield item
+        finally:
+            closed.set()
+
+    async def consume():
+        items = streams.iterate(generator())
+
+        async for item in items:
+            if item == 2:
+                break
+
+        await items.aclose()
+
+    asyncio.run(consume())
+
+    assert len(produced) <= 4
+    assert closed.is_set()
+
+def test_completed():
+    """
+    Test blocking function results as completed, with bounded concurrency.
+    """
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def square(value):
+        with lock:
+            running.append(value)
+            peak.append(len(running))
+
+        threading.Event().wait(0.01)
+
+        with lock:
+            running.remove(value)
+
+        return value * value
+
+    async def collect():
+        return [item async for item in streams.completed(square, range(12), concurrency = 3)]
+
+    results = asyncio.run(collect())
+
+    assert sorted(results) == [(value, value * value) for value in range(12)]
+    assert max(peak) <= 3
+
+def test_completed_error():
+    """
+    Test blocking function error raised to the consumer.
+    """
+    def invalid(value):
+        raise ValueError('Invalid value.', value)
+
+    async def collect():
+        return [item async for item in streams.completed(invalid, range(3))]
+
+    with pytest.raises(ValueError, match = '.*Invalid.*'):
+        asyncio.run(collect())
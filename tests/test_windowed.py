@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`windowed` -- Tests lazy windowed rasters
+==============================================
+
+.. module:: windowed
+    :platform: Unix, Windows
+    :synopsis: Tests of the raster slices as windowed reads, and the chunks.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+"""
+import pytest
+import numpy as np
+import rasterio
+
+from src.rocha import crop
+from src.rocha import extremes
+from src.rocha import windowed
+
+def test_attributes():
+    """
+    Test the raster attributes, without reading the data.
+    """
+    with rasterio.open('data/forest.tif') as source:
+        lazy = windowed.Raster(source)
+        band = windowed.Raster(source, band = 1)
+
+        assert lazy.shape == (source.count, source.height, source.width)
+        assert band.shape == source.shape
+        assert band.dtype == np.dtype(source.dtypes[0])
+        assert band.transform == source.transform
+        assert band.nodata == source.nodata
+
+        lazy.close()
+
+        assert not source.closed
+
+@pytest.mark.parametrize('key', [np.s_[10:20, 5:9], np.s_[-3:, ::7], np.s_[4, 3:40:3], np.s_[::-5, 2],
+                                 np.s_[5:5, :]])
+def test_getitem(key):
+    """
+    Test the slices read as windows, the same as the slices of the whole raster data.
+    """
+    with windowed.Raster('data/forest.tif', band = 1) as lazy:
+        expected = lazy.read()[key]
+        result = lazy[key]
+
+    assert result.shape == expected.shape
+    assert (np.ma.getmaskarray(result) == np.ma.getmaskarray(expected)).all()
+    assert (result.filled(0) == expected.filled(0)).all()
+
+def test_getitem_pixel():
+    """
+    Test a pixel as a scalar like numpy, masked as numpy.ma.masked.
+    """
+    with rasterio.open('data/forest.tif') as source:
+        data = source.read(masked = True)
+
+    rows, cols = np.nonzero(~np.ma.getmaskarray(data[0]))
+    masked_rows, masked_cols = np.nonzero(np.ma.getmaskarray(data[0]))
+
+    with windowed.Raster('data/forest.tif', band = 1) as lazy:
+        valid = lazy[rows[0], cols[0]]
+        masked = lazy[masked_rows[0], masked_cols[0]]
+
+    with windowed.Raster('data/forest.tif') as lazy:
+        band = lazy[0, rows[0], cols[0]]
+
+    assert not isinstance(valid, np.ma.MaskedArray)
+    assert valid == data[0][rows[0], cols[0]]
+    assert band == valid
+    assert masked is np.ma.masked
+
+def test_getitem_invalid():
+    """
+    Test the indices out of the raster, and not integers nor slices.
+    """
+    with windowed.Raster('data/forest.tif', band = 1) as lazy:
+        with pytest.raises(IndexError):
+            lazy[1000, 0]
+
+        with pytest.raises(IndexError):
+            lazy[[1, 2]]
+
+        with pytest.raises(IndexError):
+            lazy[0, 0, 0]
+
+def test_chunks():
+    """
+    Test the chunks aligned with the internal blocks, covering the raster.
+    """
+    with windowed.Raster('data/forest.tif', band = 1) as lazy:
+        chunks = list(lazy.chunks())
+        pixels = sum(data.size for _, data in chunks)
+
+        assert pixels == lazy.size
+        assert all(data.shape == (window.height, window.width) for window, data in chunks)
+
+def test_windows_striped(tmp_path):
+    """
+    Test the windows of a raster with one row strips, stacked as rows bands covering the raster.
+    """
+    raster = str(tmp_path / 'striped.tif')
+
+    with rasterio.open('data/forest.tif') as source:
+        profile = source.profile
+        data = source.read()
+
+    profile.update({'tiled': False, 'blockysize': 1})
+    profile.pop('blockxsize', None)
+
+    with rasterio.open(raster, 'w', **profile) as destiny:
+        destiny.write(data)
+
+    with rasterio.open(raster) as source:
+        assert source.block_shapes[0][0] == 1
+
+        windows = list(windowed.windows(source, size = 16 * source.width))
+
+        assert sum(window.height for window in windows) == source.height
+        assert all(window.width == source.width for window in windows)
+        assert windows[0].height == min(16, source.height)
+
+    assert extremes.statistics(raster) == extremes.statistics('data/forest.tif')
+    assert extremes.total(raster) == extremes.total('data/forest.tif')
+
+def test_hotspots():
+    """
+    Test the hotspots from a lazy raster by chunks, the same as from the raster data.
+    """
+    with windowed.Raster('data/forest.tif', band = 1) as lazy:
+        expected = extremes.hotspots(lazy.read(), '>', 0.5, lazy.nodata)
+        result = extremes.hotspots(lazy, '>', 0.5, lazy.nodata)
+
+    assert (result.mask == expected.mask).all()
+    assert (result.filled() == expected.filled()).all()
+
+def test_total_limits():
+    """
+    Test the total area and the limits from a lazy raster.
+    """
+    raster = 'data/forest.tif'
+
+    with windowed.Raster(raster, band = 1) as lazy:
+        assert extremes.total(lazy) == extremes.total(raster)
+        assert list(extremes.limits([lazy])) == list(extremes.limits([raster]))
+
+def test_crop_mask():
+    """
+    Test the crop of a lazy raster, the same as from the raster filename.
+    """
+    geometries = list(crop.geometries('data/regions.shp'))[:1]
+
+    expected, _ = crop.mask(geometries, 'data/forest.tif')
+
+    with windowed.Raster('data/forest.tif') as lazy:
+        result, _ = crop.mask(geometries, lazy)
+
+    assert (result.mask == expected.mask).all()
+    assert (result == expected).all()
+
+@pytest.fixture
+def bands(tmp_path):
+    """
+    Raster with two bands, the second with the first values doubled.
+    """
+    raster = str(tmp_path / 'bands.tif')
+
+    with rasterio.open('data/forest.tif') as source:
+        profile = source.profile
+        data = source.read(1, masked = True)
+
+    profile.update({'count': 2})
+
+    with rasterio.open(raster, 'w', **profile) as destiny:
+        destiny.write(data.filled(profile['nodata']), 1)
+        destiny.write((data * 2).filled(profile['nodata']), 2)
+
+    return raster
+
+def test_band_statistics(bands):
+    """
+    Test the statistics and limits of a lazy raster band, the same as of the raster band.
+    """
+    with windowed.Raster(bands, band = 2) as lazy:
+        assert extremes.statistics(lazy) == extremes.statistics(bands, 2)
+        assert list(extremes.limits([lazy])) == list(extremes.limits([bands], 2))
+        assert extremes.min_max([lazy]) == extremes.min_max([bands], 2)
+        assert extremes.statistics(lazy, 2) == extremes.statistics(bands, 2)
+
+        with pytest.raises(ValueError):
+            extremes.statistics(lazy, 1)
+
+        with pytest.raises(ValueError):
+            list(extremes.limits([lazy], 1))
+
+def test_band_crop_mask(bands):
+    """
+    Test the crop of a lazy raster band, just the band.
+    """
+    geometries = list(crop.geometries('data/regions.shp'))[:1]
+
+    expected, _ = crop.mask(geometries, bands)
+
+    with windowed.Raster(bands, band = 2) as lazy:
+        result, profile = crop.mask(geometries, lazy)
+
+    assert result.shape == (1, *expected.shape[1:])
+    assert profile['count'] == 1
+    assert (result.mask == expected.mask[1:]).all()
+    assert (result == expected[1:]).all()
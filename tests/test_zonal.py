@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`zonal` -- Tests zonal statistics
+======================================
+
+.. module:: zonal
+    :platform: Unix, Windows
+    :synopsis: Tests of the raster statistics by the vector features.
+.. moduleauthor:: Andre Rocha <rocha.matcomp@gmail.com>
+"""
+import numpy as np
+import numpy.ma as ma
+
+from src.rocha import crop
+from src.rocha import zonal
+from src.rocha import extremes
+
+def test_zones():
+    """
+    Test zones from the column values, the same values are the same zone.
+    """
+    column = np.array(['south', 'north', 'south'])
+
+    keys, labels = zonal.zones(column)
+
+    assert list(keys) == ['north', 'south']
+    assert list(labels) == [2, 1, 2]
+
+def test_statistics():
+    """
+    Test zonal statistics, the same as the reduced crops of each feature.
+    """
+    vector = 'data/regions.shp'
+    raster = 'data/atlantic_forest.tif'
+    column = 'REGION'
+
+    geometries, columns = crop.features(vector, [column])
+
+    table = zonal.statistics(geometries, columns[column], raster)
+
+    assert sorted(table) == sorted(columns[column])
+
+    for geometry, key in zip(geometries, columns[column]):
+        data, _ = crop.mask([geometry], raster)
+        zone = table[key]
+
+        assert zone.count == data.count()
+        assert np.isclose(zone.sum, data.sum(dtype = np.float64))
+        assert np.isclose(zone.mean, data.mean(dtype = np.float64))
+        assert zone.minimum == data.min()
+        assert zone.maximum == data.max()
+        assert zone.area == zone.count * extremes.area(raster)
+
+def test_statistics_outside():
+    """
+    Test zonal statistics of the zones outside the raster.
+    """
+    vector = 'data/regions.shp'
+    raster = 'data/hotspots_projected.tif'
+    column = 'REGION'
+
+    geometries, columns = crop.features(vector, [column])
+
+    table = zonal.statistics(geometries, columns[column], raster)
+
+    for zone in table.values():
+        assert zone.count == 0
+        assert np.isnan(zone.mean)
+        assert zone.minimum is ma.masked
+
+def test_multiples():
+    """
+    Test zonal statistics of the multiples rasters, with the label images reused.
+    """
+    vector = 'data/regions.shp'
+    input_path = 'data/relatives'
+    pattern = '*.tif'
+    column = 'REGION'
+
+    geometries, columns = crop.features(vector, [column])
+
+    for raster, table in zonal.multiples(vector, column, pattern, input_path):
+        expected = zonal.statistics(geometries, columns[column], raster)
+
+        assert table == expected